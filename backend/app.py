@@ -8,12 +8,17 @@ from routes.auth_routes import auth_bp
 from routes.sensor_routes import sensor_bp
 from routes.ml_routes import ml_bp
 from routes.lstm_predict_routes import lstm_predict_bp
+from routes.health_routes import health_bp
+from routes.model_routes import model_bp
+from model_registry import warmup_from_env
+import metrics
+from monitoring_archive import start_maintenance_thread
 
 # 1. Import blueprint FAQ yang baru
 from routes.faq_routes import faq_bp
 
 app = Flask(__name__)
-CORS(app, supports_credentials=True, expose_headers=["Authorization"])
+CORS(app, supports_credentials=True, expose_headers=["Authorization", "X-Next-Cursor"])
 
 # Daftarkan blueprint yang sudah ada
 app.register_blueprint(user_bp, url_prefix='/api')
@@ -22,12 +27,22 @@ app.register_blueprint(auth_bp, url_prefix='/api/auth')
 app.register_blueprint(sensor_bp, url_prefix='/api/sensors')
 app.register_blueprint(ml_bp, url_prefix='/api/ml')
 app.register_blueprint(lstm_predict_bp, url_prefix='/api/predict')
+app.register_blueprint(health_bp, url_prefix='/api/health')
+app.register_blueprint(model_bp, url_prefix='/api/models')
 
 # 2. Daftarkan blueprint FAQ yang baru
 app.register_blueprint(faq_bp, url_prefix='/api')
 
+# Metrik Prometheus: latensi per endpoint, durasi query, dan GET /metrics
+metrics.init_app(app)
 
-print(app.url_map)
+# Model dimuat saat dipakai pertama kali; MODEL_WARMUP memuatnya di sini
+warmup_from_env()
 
+# Partisi monitoring bulan depan, dan arsip partisi lama jika diaktifkan
+# (opt-in: MONITORING_MAINTENANCE_INTERVAL, MONITORING_ARCHIVE_ENABLED)
+start_maintenance_thread()
+
+# Server pengembangan; untuk ribuan subscriber SSE/poller jalankan mode ASGI (asgi.py)
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
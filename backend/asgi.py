@@ -0,0 +1,156 @@
+"""
+Mode serving ASGI untuk seluruh API (butuh uvicorn dan a2wsgi):
+
+    uvicorn asgi:application --host 0.0.0.0 --port 5000
+
+URL map dan kontrak JSON tetap milik aplikasi Flask di app.py:
+- GET /api/sensors/stream dilayani langsung di event loop. Setiap subscriber
+  SSE hanya berupa coroutine yang menunggu AsyncSubscription, jadi ribuan
+  subscriber tidak memakan ribuan thread (batas SSE_MAX_ASYNC_SUBSCRIBERS).
+- Request lain diteruskan ke Flask lewat adapter WSGI a2wsgi.WSGIMiddleware,
+  yang menjalankan aplikasi di thread pool terbatas dan mengalirkan body
+  request per chunk. Query mysql.connector tetap blocking, tetapi hanya di
+  thread pool; request yang menunggu giliran, termasuk poller, hanya berupa
+  coroutine. ASGI_WSGI_THREADS sebaiknya tidak jauh di atas DB_POOL_SIZE.
+- Endpoint inferensi (/api/ml, /api/predict) memakai adapter dengan pool
+  terpisah (ASGI_INFERENCE_THREADS) agar request model yang berat tidak
+  menghabiskan thread untuk endpoint baca biasa.
+
+Hook Flask (CORS, metrik) tidak berjalan untuk stream native; header CORS
+ditulis sendiri dengan aturan yang sama seperti CORS(app, supports_credentials=True).
+"""
+import asyncio
+import json
+import os
+import sys
+from urllib.parse import parse_qs
+
+from a2wsgi import WSGIMiddleware
+
+from app import app
+from broadcaster import sensor_broadcaster
+from routes.sensor_routes import (
+    SSE_HEARTBEAT,
+    SSE_HEARTBEAT_SECONDS,
+    _ensure_sensor_snapshot,
+    sse_message,
+    sse_opening,
+)
+
+ASGI_WSGI_THREADS = int(os.getenv('ASGI_WSGI_THREADS', '32'))
+ASGI_INFERENCE_THREADS = int(os.getenv('ASGI_INFERENCE_THREADS', '8'))
+INFERENCE_PREFIXES = ('/api/ml/', '/api/predict/')
+
+
+def _header_dict(scope):
+    return {name.decode('latin1').lower(): value.decode('latin1') for name, value in scope['headers']}
+
+
+def _cors_headers(headers):
+    origin = headers.get('origin')
+    if not origin:
+        return []
+    return [
+        (b'access-control-allow-origin', origin.encode('latin1')),
+        (b'access-control-allow-credentials', b'true'),
+        (b'vary', b'Origin'),
+    ]
+
+
+async def _wait_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def sensor_stream(scope, receive, send, executor):
+    """Versi async GET /api/sensors/stream dengan event dan format yang sama seperti sensor_routes."""
+    headers = _header_dict(scope)
+    query = parse_qs(scope['query_string'].decode('latin1'))
+    last_event_id = headers.get('last-event-id') or (query.get('last_event_id') or [None])[0]
+    cors = _cors_headers(headers)
+    loop = asyncio.get_running_loop()
+
+    subscription, replay = sensor_broadcaster.subscribe(last_event_id, loop=loop)
+    if subscription is None:
+        body = json.dumps({"error": "Jumlah koneksi stream sensor sudah mencapai batas"}).encode('utf-8')
+        await send({'type': 'http.response.start', 'status': 503,
+                    'headers': [(b'content-type', b'application/json')] + cors})
+        await send({'type': 'http.response.body', 'body': body})
+        return
+
+    disconnected = asyncio.ensure_future(_wait_disconnect(receive))
+    try:
+        if replay is None:
+            try:
+                await loop.run_in_executor(executor, _ensure_sensor_snapshot)
+            except Exception as e:
+                print(f"Error saat mengambil snapshot sensor: {e}")
+
+        await send({'type': 'http.response.start', 'status': 200, 'headers': [
+            (b'content-type', b'text/event-stream; charset=utf-8'),
+            (b'cache-control', b'no-cache'),
+            (b'x-accel-buffering', b'no'),
+        ] + cors})
+        for message in sse_opening(replay):
+            await send({'type': 'http.response.body', 'body': message.encode('utf-8'), 'more_body': True})
+
+        while True:
+            waiting = asyncio.ensure_future(subscription.get(SSE_HEARTBEAT_SECONDS))
+            await asyncio.wait({waiting, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+            if disconnected.done():
+                waiting.cancel()
+                return
+            item = waiting.result()
+            message = SSE_HEARTBEAT if item is None else sse_message(item)
+            await send({'type': 'http.response.body', 'body': message.encode('utf-8'), 'more_body': True})
+    finally:
+        disconnected.cancel()
+        sensor_broadcaster.unsubscribe(subscription)
+
+
+# (method, path) yang dilayani native di event loop; sisanya lewat WsgiBridge
+NATIVE_ROUTES = {
+    ('GET', '/api/sensors/stream'): sensor_stream,
+}
+
+
+class AsgiApp:
+    def __init__(self, wsgi_app):
+        self.wsgi = WSGIMiddleware(wsgi_app, workers=ASGI_WSGI_THREADS)
+        self.inference = WSGIMiddleware(wsgi_app, workers=ASGI_INFERENCE_THREADS)
+        # Snapshot sensor untuk stream native dibaca di thread pool yang sama dengan request biasa
+        self.executor = self.wsgi.executor
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.wsgi.executor.shutdown(wait=False)
+                self.inference.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+        if scope['type'] != 'http':
+            return
+        handler = NATIVE_ROUTES.get((scope['method'], scope['path']))
+        if handler is not None:
+            return await handler(scope, receive, send, self.executor)
+        adapter = self.inference if scope['path'].startswith(INFERENCE_PREFIXES) else self.wsgi
+        return await adapter(scope, receive, send)
+
+
+application = AsgiApp(app)
+
+
+if __name__ == '__main__':
+    try:
+        import uvicorn
+    except ImportError:
+        print("ERROR: Mode ASGI butuh server ASGI, mis. pip install uvicorn")
+        sys.exit(1)
+    uvicorn.run(application, host='0.0.0.0', port=int(os.getenv('PORT', '5000')))
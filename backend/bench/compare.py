@@ -0,0 +1,80 @@
+"""
+Membandingkan dua file hasil bench.run (mis. sebelum dan sesudah sebuah commit).
+
+    python -m bench.compare bench/results/A.json bench/results/B.json [--fail-over 10]
+
+Perubahan ditulis dalam persen terhadap file pertama. --fail-over N membuat
+exit code 1 jika p95 salah satu skenario naik lebih dari N persen.
+"""
+import argparse
+import json
+import sys
+
+
+def _pct(before, after):
+    if not before:
+        return None
+    return (after - before) / before * 100.0
+
+
+def _fmt(change):
+    return '     -' if change is None else f"{change:+6.1f}%"
+
+
+def compare(base, head):
+    """Baris perbandingan (scenario, concurrency, metrik before/after) untuk run yang ada di kedua file."""
+    rows = []
+    for name, base_runs in base["scenarios"].items():
+        head_runs = {run["concurrency"]: run for run in head["scenarios"].get(name, [])}
+        for before in base_runs:
+            after = head_runs.get(before["concurrency"])
+            if after is None or "latency_ms" not in before or "latency_ms" not in after:
+                continue
+            rows.append({
+                "scenario": name,
+                "concurrency": before["concurrency"],
+                "throughput": (before["throughput_rps"], after["throughput_rps"]),
+                "p50": (before["latency_ms"]["p50"], after["latency_ms"]["p50"]),
+                "p95": (before["latency_ms"]["p95"], after["latency_ms"]["p95"]),
+                "p99": (before["latency_ms"]["p99"], after["latency_ms"]["p99"]),
+                "errors": (before["errors"], after["errors"]),
+            })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bandingkan dua hasil benchmark.")
+    parser.add_argument('base')
+    parser.add_argument('head')
+    parser.add_argument('--fail-over', type=float, help="batas kenaikan p95 (persen) sebelum dianggap regresi")
+    args = parser.parse_args(argv)
+
+    with open(args.base, encoding='utf-8') as f:
+        base = json.load(f)
+    with open(args.head, encoding='utf-8') as f:
+        head = json.load(f)
+
+    print(f"base: {base['meta'].get('git_commit')} {base['meta'].get('label', '')}")
+    print(f"head: {head['meta'].get('git_commit')} {head['meta'].get('label', '')}")
+    print(f"{'skenario':<18}{'conc':>5}{'req/s':>18}{'p50 ms':>20}{'p95 ms':>20}{'p99 ms':>20}{'error':>10}")
+
+    regressions = []
+    for row in compare(base, head):
+        cells = []
+        for key in ("throughput", "p50", "p95", "p99"):
+            before, after = row[key]
+            cells.append(f"{after:>10.2f} {_fmt(_pct(before, after))}")
+        print(f"{row['scenario']:<18}{row['concurrency']:>5}" + "".join(f"{cell:>20}" for cell in cells)
+              + f"{row['errors'][0]:>5}>{row['errors'][1]:<4}")
+        change = _pct(*row["p95"])
+        if args.fail_over is not None and change is not None and change > args.fail_over:
+            regressions.append(f"{row['scenario']}@{row['concurrency']} p95 {change:+.1f}%")
+
+    if regressions:
+        print("ERROR: Regresi p95: " + ", ".join(regressions))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
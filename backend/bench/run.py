@@ -0,0 +1,290 @@
+"""
+Load driver benchmark: menjalankan skenario per endpoint terhadap server yang
+sedang berjalan dan menulis hasil JSON yang bisa dibandingkan antar commit.
+
+Urutan pemakaian (dari folder backend, database sudah diisi bench.seed):
+    python app.py                                   # atau gunicorn, di terminal lain
+    python -m bench.run --concurrency 16 --duration 20
+    python -m bench.run --scenarios monitoring_me,trend_me --concurrency 1,8,32
+    python -m bench.compare bench/results/A.json bench/results/B.json
+
+Setiap skenario dijalankan `--duration` detik per level concurrency (setelah
+`--warmup` detik yang tidak dihitung). Latensi diukur di sisi klien, dari
+request dikirim sampai body selesai dibaca.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import requests
+
+from bench.seed import ADMIN_EMAIL
+from bench.synthetic import BENCH_PASSWORD
+
+BENCH_BASE_URL = os.getenv('BENCH_BASE_URL', 'http://127.0.0.1:5000')
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+_RISK_INPUT = {
+    "gender": 1, "age": 54, "hypertension": 1, "heart_disease": 0, "smoking_history": 2,
+    "berat": 82.5, "tinggi": 168.0, "hba1c_level": 7.1, "blood_glucose": 160.0,
+}
+
+
+class Scenario:
+    """
+    Satu endpoint yang diuji. build(rng, ctx) mengembalikan dict argumen
+    requests (method, path, json, headers); ctx berisi token dan id pasien.
+    """
+
+    def __init__(self, name, build, expected=(200,)):
+        self.name = name
+        self.build = build
+        self.expected = set(expected)
+
+
+def _patient(rng, ctx):
+    return ctx["patients"][int(rng.integers(len(ctx["patients"])))]
+
+def _auth(token):
+    return {"Authorization": f"Bearer {token}"}
+
+def _reading(rng):
+    return round(float(rng.normal(140, 35)), 1), round(float(rng.normal(78, 8)))
+
+
+def _login(rng, ctx):
+    patient = _patient(rng, ctx)
+    return {"method": "POST", "path": "/api/auth/login",
+            "json": {"email": patient["email"], "password": BENCH_PASSWORD}}
+
+def _monitoring_me(rng, ctx):
+    return {"method": "GET", "path": "/api/monitoring/me?limit=100",
+            "headers": _auth(_patient(rng, ctx)["token"])}
+
+def _monitoring_admin(rng, ctx):
+    return {"method": "GET", "path": "/api/monitoring?limit=100", "headers": _auth(ctx["admin_token"])}
+
+def _series_me(rng, ctx):
+    return {"method": "GET", "path": "/api/monitoring/me/series?points=300",
+            "headers": _auth(_patient(rng, ctx)["token"])}
+
+def _monitoring_save(rng, ctx):
+    glucose, heart_rate = _reading(rng)
+    return {"method": "POST", "path": "/api/monitoring/save",
+            "json": {"glucose_level": glucose, "heart_rate": heart_rate},
+            "headers": _auth(_patient(rng, ctx)["token"])}
+
+def _sensor_update(rng, ctx):
+    glucose, heart_rate = _reading(rng)
+    return {"method": "PATCH", "path": "/api/sensors/update",
+            "json": {"glucose": glucose, "heart_rate": heart_rate, "user_id": _patient(rng, ctx)["id"]}}
+
+def _sensor_latest(rng, ctx):
+    return {"method": "GET", "path": "/api/sensors/latest"}
+
+def _risk_predict(rng, ctx):
+    return {"method": "POST", "path": "/api/ml/predict",
+            "json": dict(_RISK_INPUT, age=int(rng.integers(18, 80)), blood_glucose=round(float(rng.normal(140, 30)), 1))}
+
+def _risk_batch(rng, ctx):
+    return {"method": "POST", "path": "/api/ml/predict/batch",
+            "json": [dict(_RISK_INPUT, age=int(age)) for age in rng.integers(18, 80, 100)]}
+
+def _trend_predict(rng, ctx):
+    return {"method": "POST", "path": "/api/predict/glucose-trend",
+            "json": {"glucose_readings": [round(float(v), 1) for v in rng.normal(140, 30, 3)]}}
+
+def _trend_me(rng, ctx):
+    return {"method": "GET", "path": "/api/predict/glucose-trend/me",
+            "headers": _auth(_patient(rng, ctx)["token"])}
+
+def _faq(rng, ctx):
+    return {"method": "GET", "path": "/api/faq"}
+
+def _patients(rng, ctx):
+    return {"method": "GET", "path": "/api/patients", "headers": _auth(ctx["admin_token"])}
+
+
+SCENARIOS = {s.name: s for s in [
+    Scenario("login", _login),
+    Scenario("faq", _faq),
+    Scenario("patients", _patients),
+    Scenario("monitoring_me", _monitoring_me),
+    Scenario("monitoring_admin", _monitoring_admin),
+    Scenario("series_me", _series_me),
+    Scenario("monitoring_save", _monitoring_save, expected=(201, 202)),
+    Scenario("sensor_update", _sensor_update),
+    Scenario("sensor_latest", _sensor_latest),
+    Scenario("risk_predict", _risk_predict),
+    Scenario("risk_batch", _risk_batch),
+    Scenario("trend_predict", _trend_predict),
+    Scenario("trend_me", _trend_me),
+]}
+
+
+def _git_revision():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain'], capture_output=True, text=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def prepare_context(base_url, users):
+    """Login admin dan `users` pasien benchmark; token dipakai ulang oleh semua skenario."""
+    session = requests.Session()
+
+    def login(email):
+        response = session.post(f"{base_url}/api/auth/login", json={"email": email, "password": BENCH_PASSWORD}, timeout=10)
+        if response.status_code != 200:
+            raise RuntimeError(f"Login {email} gagal ({response.status_code}); sudah menjalankan bench.seed?")
+        body = response.json()
+        return body["token"], body["user"]["id"]
+
+    admin_token, _ = login(ADMIN_EMAIL)
+    patients = []
+    for i in range(users):
+        email = f"bench.patient{i + 1}@example.com"
+        token, user_id = login(email)
+        patients.append({"email": email, "token": token, "id": user_id})
+    return {"admin_token": admin_token, "patients": patients}
+
+
+def _worker(base_url, scenario, ctx, seed, stop_at, record_from, samples, statuses):
+    session = requests.Session()
+    rng = np.random.default_rng(seed)
+    while True:
+        spec = scenario.build(rng, ctx)
+        started = time.perf_counter()
+        if started >= stop_at:
+            return
+        try:
+            response = session.request(
+                spec["method"], base_url + spec["path"],
+                json=spec.get("json"), headers=spec.get("headers"), timeout=30
+            )
+            status = response.status_code
+        except requests.RequestException:
+            status = "error"
+        finished = time.perf_counter()
+        if started >= record_from:
+            samples.append(finished - started)
+            statuses.append(status)
+
+
+def run_scenario(base_url, scenario, ctx, concurrency, duration, warmup, seed=0):
+    """Menjalankan satu skenario pada satu level concurrency; mengembalikan ringkasan."""
+    start = time.perf_counter()
+    record_from = start + warmup
+    stop_at = record_from + duration
+    per_thread = [([], []) for _ in range(concurrency)]
+    threads = [
+        threading.Thread(
+            target=_worker,
+            args=(base_url, scenario, ctx, [seed, i], stop_at, record_from, samples, statuses),
+            daemon=True,
+        )
+        for i, (samples, statuses) in enumerate(per_thread)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencies = np.array([s for samples, _ in per_thread for s in samples], dtype=np.float64)
+    statuses = [st for _, sts in per_thread for st in sts]
+    status_counts = {}
+    for status in statuses:
+        status_counts[str(status)] = status_counts.get(str(status), 0) + 1
+    errors = sum(1 for status in statuses if status not in scenario.expected)
+    summary = {
+        "concurrency": concurrency,
+        "duration": duration,
+        "requests": len(statuses),
+        "errors": errors,
+        "status_counts": status_counts,
+        "throughput_rps": round(len(statuses) / duration, 2),
+    }
+    if len(latencies):
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+        summary["latency_ms"] = {
+            "p50": round(float(p50), 3),
+            "p95": round(float(p95), 3),
+            "p99": round(float(p99), 3),
+            "mean": round(float(latencies.mean() * 1000), 3),
+            "max": round(float(latencies.max() * 1000), 3),
+        }
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark endpoint backend GlucoSense.")
+    parser.add_argument('--base-url', default=BENCH_BASE_URL)
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help="daftar nama skenario, dipisah koma")
+    parser.add_argument('--concurrency', default='8', help="satu atau beberapa level, mis. 1,8,32")
+    parser.add_argument('--duration', type=float, default=10.0, help="detik yang diukur per skenario/level")
+    parser.add_argument('--warmup', type=float, default=2.0)
+    parser.add_argument('--users', type=int, default=50, help="jumlah pasien benchmark yang login")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--label', default='', help="label bebas yang ikut disimpan di hasil")
+    parser.add_argument('--output', help="path file hasil (default bench/results/<waktu>-<commit>.json)")
+    args = parser.parse_args(argv)
+
+    names = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"Skenario tidak dikenal: {', '.join(unknown)} (tersedia: {', '.join(SCENARIOS)})")
+    levels = [int(level) for level in args.concurrency.split(',')]
+
+    ctx = prepare_context(args.base_url, args.users)
+    commit, dirty = _git_revision()
+    results = {
+        "meta": {
+            "label": args.label,
+            "git_commit": commit,
+            "git_dirty": dirty,
+            "started_at": datetime.now().isoformat(timespec='seconds'),
+            "base_url": args.base_url,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "users": args.users,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "scenarios": {},
+    }
+
+    print(f"{'skenario':<18}{'conc':>5}{'req/s':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'error':>7}")
+    for name in names:
+        runs = []
+        for level in levels:
+            summary = run_scenario(args.base_url, SCENARIOS[name], ctx, level, args.duration, args.warmup, args.seed)
+            runs.append(summary)
+            latency = summary.get("latency_ms", {})
+            print(f"{name:<18}{level:>5}{summary['throughput_rps']:>10.1f}"
+                  f"{latency.get('p50', 0):>10.2f}{latency.get('p95', 0):>10.2f}{latency.get('p99', 0):>10.2f}"
+                  f"{summary['errors']:>7}")
+        results["scenarios"][name] = runs
+
+    output = args.output
+    if not output:
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        output = os.path.join(RESULTS_DIR, f"{stamp}-{(commit or 'nogit')[:8]}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"SUCCESS: Hasil ditulis ke {output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
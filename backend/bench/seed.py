@@ -0,0 +1,110 @@
+"""
+Mengisi database benchmark dengan pasien dan riwayat CGM sintetis.
+
+Dijalankan dari folder backend terhadap database yang diatur lewat DB_* di .env.
+Gunakan database khusus benchmark, jangan database produksi:
+    python -m bench.seed --schema --patients 1000 --days 30
+
+1000 pasien x 30 hari x 288 pembacaan/hari = ~8,6 juta baris monitoring.
+Pasien dan admin benchmark dikenali dari email bench.*@example.com; pasien yang
+sudah ada tidak diisi ulang sehingga seed bisa dilanjutkan setelah terputus.
+"""
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from mysql.connector import Error
+
+from db import get_connection
+from migrate import migrate
+from monitoring_archive import ensure_partitions
+from models.monitoring_model import add_monitoring_records_model
+from models.risk_model import upsert_risk_inputs_model
+from models.risk_scoring import parse_record
+from models.rollup_model import backfill_rollups_model
+from bench.synthetic import BENCH_PASSWORD, make_patients, monitoring_rows, risk_inputs
+
+ADMIN_EMAIL = 'bench.admin@example.com'
+INSERT_CHUNK = 5000
+
+
+def seed_users(cursor, patients):
+    """Memasukkan admin dan pasien benchmark; mengembalikan {email: id}."""
+    rows = [("Admin Bench", None, ADMIN_EMAIL, None, None, BENCH_PASSWORD, "admin")]
+    rows += [(p["name"], p["age"], p["email"], p["gender"], p["address"], p["password"], p["role"]) for p in patients]
+    cursor.executemany("""
+        INSERT IGNORE INTO users (name, age, email, gender, address, password, role)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+    """, rows)
+    cursor.execute("SELECT id, email FROM users WHERE email LIKE %s", ('bench.%@example.com',))
+    return {email: user_id for user_id, email in cursor.fetchall()}
+
+
+def _seeded_user_ids(cursor, user_ids):
+    placeholders = ", ".join(["%s"] * len(user_ids))
+    cursor.execute(f"SELECT DISTINCT user_id FROM monitoring WHERE user_id IN ({placeholders})", list(user_ids))
+    return {row[0] for row in cursor.fetchall()}
+
+
+def seed(patients_count, days, seed_value, with_schema):
+    conn = get_connection()
+    if conn is None:
+        print("ERROR: Koneksi database gagal")
+        return False
+    cursor = conn.cursor()
+    started = time.monotonic()
+    try:
+        if with_schema:
+            migrate(conn)
+        # Partisi bulanan dibuat sebelum insert agar data tidak menumpuk di p_future
+        ensure_partitions(cursor, since=datetime.now() - timedelta(days=days))
+
+        patients = make_patients(patients_count, seed=seed_value)
+        ids = seed_users(cursor, patients)
+        conn.commit()
+
+        user_ids = [ids[p["email"]] for p in patients]
+        done = _seeded_user_ids(cursor, user_ids)
+        pending = [(index, uid, p) for index, (uid, p) in enumerate(zip(user_ids, patients)) if uid not in done]
+        print(f"INFO: {len(done)} pasien sudah berisi data, {len(pending)} pasien akan diisi.")
+
+        total_rows = 0
+        for index, uid, patient in pending:
+            rng = np.random.default_rng([seed_value, index, 1])
+            upsert_risk_inputs_model(cursor, uid, parse_record(risk_inputs(uid, patient, rng)))
+
+        series = monitoring_rows([(uid, p["profile"], index) for index, uid, p in pending], days, seed=seed_value)
+        for done_count, (uid, rows) in enumerate(series, start=1):
+            for i in range(0, len(rows), INSERT_CHUNK):
+                add_monitoring_records_model(cursor, rows[i:i + INSERT_CHUNK])
+            backfill_rollups_model(cursor, uid)
+            conn.commit()
+            total_rows += len(rows)
+            if done_count % 50 == 0 or done_count == len(pending):
+                rate = total_rows / max(time.monotonic() - started, 1e-9)
+                print(f"INFO: {done_count}/{len(pending)} pasien, {total_rows} baris ({rate:.0f} baris/detik).")
+        print(f"SUCCESS: Seed selesai: {total_rows} baris monitoring dalam {time.monotonic() - started:.1f} detik.")
+        return True
+    except Error as e:
+        conn.rollback()
+        print(f"ERROR: Seed gagal: {e}")
+        return False
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Seed data sintetis untuk benchmark backend.")
+    parser.add_argument('--patients', type=int, default=1000)
+    parser.add_argument('--days', type=float, default=30)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--schema', action='store_true', help="jalankan migrate.py sebelum mengisi data")
+    args = parser.parse_args(argv)
+    return 0 if seed(args.patients, args.days, args.seed, args.schema) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+Generator data sintetis untuk benchmark: pasien dan deret CGM yang realistis.
+
+Setiap pasien punya profil sendiri (glukosa basal, sensitivitas makan, diabetes
+atau tidak) dan deretnya dibangun dari:
+- basal + irama sirkadian dan fenomena fajar (naik menjelang pagi),
+- lonjakan setelah makan (kurva gamma, puncak ~45-60 menit, 3 kali sehari dengan
+  jam yang bergeser acak) dan sesekali camilan,
+- drift AR(1) yang lambat ditambah noise sensor,
+- detak jantung yang mengikuti siklus tidur/aktivitas.
+
+Semua angka berasal dari np.random.default_rng(seed), jadi data yang sama
+dihasilkan ulang untuk seed yang sama.
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+
+# Cadence sensor CGM umum: satu pembacaan per 5 menit
+DEFAULT_INTERVAL_MINUTES = 5
+
+BENCH_PASSWORD = "bench-password"
+
+
+def make_patients(count, seed=0):
+    """Daftar dict pasien (kolom tabel users) plus profil glukosa untuk generator."""
+    rng = np.random.default_rng(seed)
+    diabetic = rng.random(count) < 0.35
+    patients = []
+    for i in range(count):
+        patients.append({
+            "name": f"Pasien Bench {i + 1}",
+            "email": f"bench.patient{i + 1}@example.com",
+            "age": int(rng.integers(18, 80)),
+            "gender": "Laki-laki" if rng.random() < 0.5 else "Perempuan",
+            "address": f"Jl. Sintetis No. {i + 1}",
+            "password": BENCH_PASSWORD,
+            "role": "patient",
+            "profile": {
+                "basal": float(rng.normal(150 if diabetic[i] else 95, 12)),
+                "meal_gain": float(rng.uniform(70, 140) if diabetic[i] else rng.uniform(25, 55)),
+                "resting_hr": float(rng.normal(72, 7)),
+            },
+        })
+    return patients
+
+
+def _meal_curve(minutes_since):
+    """Respons glukosa ternormalisasi (puncak 1.0) terhadap makan, bentuk gamma k=2."""
+    t = np.clip(minutes_since, 0, None) / 50.0
+    return np.where(minutes_since >= 0, t * np.exp(1 - t), 0.0)
+
+
+def cgm_series(profile, start, length, interval_minutes=DEFAULT_INTERVAL_MINUTES, rng=None):
+    """
+    Deret (timestamps, glucose, heart_rate) sepanjang `length` pembacaan mulai
+    dari `start`. Glukosa dibatasi 40-400 mg/dL seperti rentang sensor CGM.
+    """
+    rng = rng or np.random.default_rng()
+    minutes = np.arange(length, dtype=np.float64) * interval_minutes
+    start_minute = start.hour * 60 + start.minute
+    clock = (start_minute + minutes) % 1440          # menit dalam hari
+    day = ((start_minute + minutes) // 1440).astype(np.int64)
+
+    glucose = np.full(length, profile["basal"])
+    # Fenomena fajar: naik pelan antara 03:00 dan 08:00
+    glucose += 12 * np.exp(-((clock - 390) / 100.0) ** 2)
+
+    n_days = int(day[-1]) + 1
+    for base_hour in (7.0, 12.5, 19.0):
+        meal_minute = (base_hour + rng.normal(0, 0.6, n_days)) * 60
+        gain = profile["meal_gain"] * rng.uniform(0.6, 1.3, n_days)
+        glucose += gain[day] * _meal_curve(clock - meal_minute[day])
+    snacks = rng.random(n_days) < 0.4
+    snack_minute = rng.uniform(14.5, 22.0, n_days) * 60
+    glucose += np.where(snacks[day], 0.4 * profile["meal_gain"] * _meal_curve(clock - snack_minute[day]), 0.0)
+
+    # Drift lambat AR(1) + noise sensor
+    drift = np.empty(length)
+    shocks = rng.normal(0, 2.0, length)
+    drift[0] = shocks[0]
+    for i in range(1, length):
+        drift[i] = 0.97 * drift[i - 1] + shocks[i]
+    glucose += drift + rng.normal(0, 3.0, length)
+    glucose = np.clip(glucose, 40, 400)
+
+    asleep = (clock < 360) | (clock >= 1380)
+    heart_rate = profile["resting_hr"] + np.where(asleep, -8.0, 6.0) + rng.normal(0, 4.0, length)
+    heart_rate = np.clip(heart_rate, 40, 180)
+
+    timestamps = [start + timedelta(minutes=float(m)) for m in minutes]
+    return timestamps, np.round(glucose, 1), np.round(heart_rate, 0)
+
+
+def monitoring_rows(patients, days, end=None, interval_minutes=DEFAULT_INTERVAL_MINUTES, seed=0):
+    """
+    patients: iterable (user_id, profile, index); index (urutan di make_patients)
+    menentukan stream acak sehingga hasil seed yang dilanjutkan tetap sama.
+    Menghasilkan (user_id, baris) dengan baris (user_id, glucose, heart_rate,
+    timestamp) siap untuk executemany, days * 1440 / interval baris per pasien.
+    """
+    end = (end or datetime.now()).replace(second=0, microsecond=0)
+    length = int(days * 1440 // interval_minutes)
+    start = end - timedelta(minutes=interval_minutes * length)
+    for user_id, profile, index in patients:
+        rng = np.random.default_rng([seed, index])
+        timestamps, glucose, heart_rate = cgm_series(profile, start, length, interval_minutes, rng)
+        yield user_id, [
+            (user_id, float(g), float(h), ts.strftime("%Y-%m-%d %H:%M:%S"))
+            for g, h, ts in zip(glucose, heart_rate, timestamps)
+        ]
+
+
+def risk_inputs(user_id, patient, rng):
+    """Input model risiko (field INPUT_FIELDS) yang konsisten dengan profil pasien."""
+    profile = patient["profile"]
+    diabetic = profile["basal"] > 125
+    return {
+        "user_id": user_id,
+        "gender": 1 if patient["gender"] == "Laki-laki" else 0,
+        "age": patient["age"],
+        "hypertension": int(rng.random() < (0.35 if diabetic else 0.12)),
+        "heart_disease": int(rng.random() < (0.15 if diabetic else 0.05)),
+        "smoking_history": int(rng.integers(0, 5)),
+        "berat": round(float(rng.normal(82 if diabetic else 68, 10)), 1),
+        "tinggi": round(float(rng.normal(165, 8)), 1),
+        "hba1c_level": round(float(rng.normal(7.4 if diabetic else 5.4, 0.5)), 1),
+        "blood_glucose": round(profile["basal"] + float(rng.normal(0, 10)), 1),
+    }
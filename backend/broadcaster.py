@@ -0,0 +1,202 @@
+import asyncio
+import itertools
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+
+class Subscription:
+    """Antrean event milik satu subscriber."""
+
+    def __init__(self, queue_size):
+        self._queue = queue.Queue(maxsize=queue_size)
+
+    def put(self, event):
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            # Subscriber lambat: buang event tertua, yang terbaru lebih penting
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            self._queue.put_nowait(event)
+
+    def get(self, timeout):
+        """Mengambil event berikutnya, atau None jika timeout (waktunya heartbeat)."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class AsyncSubscription:
+    """
+    Antrean event untuk subscriber di event loop asyncio (mode ASGI).
+    put() dipanggil dari thread publisher, jadi event diteruskan lewat
+    call_soon_threadsafe; subscriber tidak memegang thread selama menunggu.
+    """
+
+    def __init__(self, loop, queue_size):
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=queue_size)
+
+    def _put_local(self, event):
+        if self._queue.full():
+            # Sama seperti Subscription: event tertua dibuang
+            self._queue.get_nowait()
+        self._queue.put_nowait(event)
+
+    def put(self, event):
+        try:
+            self._loop.call_soon_threadsafe(self._put_local, event)
+        except RuntimeError:
+            # Event loop sudah ditutup; subscriber akan dilepas oleh handler-nya
+            pass
+
+    async def get(self, timeout):
+        """Event berikutnya, atau None jika timeout (waktunya heartbeat)."""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class Broadcaster:
+    """
+    Penyiar event di dalam proses: publish() mengirim event ke semua subscriber
+    tanpa query database. Riwayat pendek disimpan untuk replay saat klien
+    reconnect dengan Last-Event-ID.
+    """
+
+    def __init__(self, name, max_subscribers=100, history_size=256, queue_size=64, max_async_subscribers=10000):
+        self.name = name
+        self.max_subscribers = max_subscribers
+        self.max_async_subscribers = max_async_subscribers
+        self.queue_size = queue_size
+        # Prefix boot membuat id dari proses sebelumnya dikenali sebagai kedaluwarsa
+        self._boot = format(int(time.time()), 'x')
+        self._counter = itertools.count(1)
+        self._history = deque(maxlen=history_size)
+        self._subscribers = set()
+        self._async_subscribers = 0
+        self._lock = threading.Lock()
+        # Menyerialkan publisher agar state gabungan dan urutan pengiriman konsisten
+        self._publish_lock = threading.Lock()
+        self.latest = None
+        self.latest_id = None
+        self._published = 0
+
+    def _next_id(self):
+        return f"{self._boot}-{next(self._counter)}"
+
+    def publish(self, event, data, snapshot=True):
+        """
+        Mengirim event ke semua subscriber.
+        snapshot=True berarti data adalah state lengkap dan disimpan sebagai 'latest'.
+        """
+        with self._publish_lock:
+            return self._publish(event, data, snapshot)
+
+    def publish_merge(self, event, values, complete=False):
+        """
+        Menggabungkan values ke state terakhir lalu menyiarkan hasilnya, atomik
+        terhadap publish lain (dua update parsial serentak tidak saling menimpa).
+        Jika belum ada state, hasilnya baru disimpan sebagai 'latest' bila complete.
+        """
+        with self._publish_lock:
+            with self._lock:
+                base = self.latest
+            state = dict(base or {})
+            state.update(values)
+            return self._publish(event, state, snapshot=base is not None or complete)
+
+    def _publish(self, event, data, snapshot):
+        with self._lock:
+            event_id = self._next_id()
+            item = (event_id, event, data)
+            self._history.append(item)
+            if snapshot:
+                self.latest = data
+                self.latest_id = event_id
+            self._published += 1
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.put(item)
+        return event_id
+
+    def prime(self, data):
+        """Mengisi state awal (mis. dari database) jika belum ada publish sama sekali."""
+        with self._publish_lock, self._lock:
+            if self.latest is None:
+                self.latest = data
+                self.latest_id = self._next_id()
+
+    def snapshot(self):
+        """Pasangan (id, data) state terakhir yang dibaca secara atomik."""
+        with self._lock:
+            return self.latest_id, self.latest
+
+    def subscribe(self, last_event_id=None, loop=None):
+        """
+        Mendaftarkan subscriber baru.
+        Mengembalikan (subscription, replay) atau (None, None) jika kapasitas penuh.
+        replay berisi event setelah last_event_id, atau None jika klien perlu snapshot.
+        Dengan `loop`, subscriber berupa AsyncSubscription yang dibatasi
+        max_async_subscribers, bukan max_subscribers (batas thread).
+        """
+        with self._lock:
+            if loop is None:
+                if len(self._subscribers) - self._async_subscribers >= self.max_subscribers:
+                    return None, None
+                subscription = Subscription(self.queue_size)
+            else:
+                if self._async_subscribers >= self.max_async_subscribers:
+                    return None, None
+                subscription = AsyncSubscription(loop, self.queue_size)
+                self._async_subscribers += 1
+            self._subscribers.add(subscription)
+            replay = self._replay_after(last_event_id)
+        return subscription, replay
+
+    def _replay_after(self, last_event_id):
+        if not last_event_id or not last_event_id.startswith(self._boot + '-'):
+            return None
+        ids = [item[0] for item in self._history]
+        if last_event_id not in ids:
+            return None
+        return list(self._history)[ids.index(last_event_id) + 1:]
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+                if isinstance(subscription, AsyncSubscription):
+                    self._async_subscribers -= 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "async_subscribers": self._async_subscribers,
+                "max_subscribers": self.max_subscribers,
+                "max_async_subscribers": self.max_async_subscribers,
+                "published": self._published,
+                "latest_id": self.latest_id,
+            }
+
+
+def format_sse(event_id, event, payload):
+    """Format satu event Server-Sent Events."""
+    return f"id: {event_id}\nevent: {event}\ndata: {payload}\n\n"
+
+
+# Broadcaster nilai sensor terbaru (glukosa dan detak jantung)
+sensor_broadcaster = Broadcaster(
+    'sensors',
+    max_subscribers=int(os.getenv('SSE_MAX_SUBSCRIBERS', '100')),
+    max_async_subscribers=int(os.getenv('SSE_MAX_ASYNC_SUBSCRIBERS', '10000')),
+    history_size=int(os.getenv('SSE_HISTORY_SIZE', '256'))
+)
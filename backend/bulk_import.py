@@ -0,0 +1,214 @@
+"""
+Impor massal riwayat CGM (timestamp, glukosa, detak jantung) satu pasien dari
+file CSV atau JSON-lines. Parsing, validasi, deduplikasi, dan agregasi rollup
+dijalankan per kolom dengan pandas/NumPy, bukan per baris di Python.
+
+pandas di-import saat impor pertama, bukan saat aplikasi start.
+"""
+import io
+import os
+
+import numpy as np
+
+from models.rollup_model import RESOLUTIONS
+
+# Batas ukuran upload (byte), jumlah baris per file, dan rentang nilai yang dianggap masuk akal
+IMPORT_MAX_BYTES = int(os.getenv('IMPORT_MAX_BYTES', str(128 * 1024 * 1024)))
+IMPORT_MAX_ROWS = int(os.getenv('IMPORT_MAX_ROWS', '2000000'))
+IMPORT_GLUCOSE_RANGE = (
+    float(os.getenv('IMPORT_GLUCOSE_MIN', '10')),
+    float(os.getenv('IMPORT_GLUCOSE_MAX', '1000')),
+)
+IMPORT_HEART_RATE_RANGE = (
+    float(os.getenv('IMPORT_HEART_RATE_MIN', '20')),
+    float(os.getenv('IMPORT_HEART_RATE_MAX', '300')),
+)
+# Jumlah contoh baris yang ditolak yang dikirim balik ke klien
+IMPORT_ERROR_SAMPLES = 20
+
+# Nama kolom yang diterima -> nama kolom internal
+_ALIASES = {
+    "timestamp": "timestamp", "time": "timestamp", "datetime": "timestamp",
+    "glucose": "glucose", "glucose_level": "glucose",
+    "heart_rate": "heart_rate", "heartrate": "heart_rate",
+}
+_REQUIRED = ("timestamp", "glucose", "heart_rate")
+
+
+class ImportFormatError(ValueError):
+    """File tidak bisa dibaca atau kolom wajib tidak ada; pesannya aman dikirim ke klien."""
+
+
+def detect_format(filename, mimetype):
+    """'csv' atau 'jsonl' dari ekstensi file, atau dari Content-Type jika nama file tidak ada."""
+    name = (filename or "").lower()
+    if name.endswith((".jsonl", ".ndjson", ".json")):
+        return "jsonl"
+    if name.endswith(".csv"):
+        return "csv"
+    if mimetype in ("application/x-ndjson", "application/jsonl", "application/json"):
+        return "jsonl"
+    return "csv"
+
+
+def read_upload(stream, file_format):
+    """
+    Membaca stream biner menjadi DataFrame kolom timestamp/glucose/heart_rate
+    (masih berupa teks mentah). Parsing berhenti satu baris setelah
+    IMPORT_MAX_ROWS, jadi file yang terlalu panjang ditolak tanpa dibaca seluruhnya.
+    """
+    import pandas as pd
+
+    nrows = IMPORT_MAX_ROWS + 1
+    try:
+        if file_format == "jsonl":
+            frame = pd.read_json(stream, lines=True, dtype=False, nrows=nrows)
+        else:
+            frame = pd.read_csv(
+                io.TextIOWrapper(stream, encoding="utf-8-sig"), dtype=str, skipinitialspace=True, nrows=nrows
+            )
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ImportFormatError(f"File {file_format} tidak bisa dibaca: {e}")
+
+    frame = frame.rename(columns=lambda column: _ALIASES.get(str(column).strip().lower(), column))
+    missing = [column for column in _REQUIRED if column not in frame.columns]
+    if missing:
+        raise ImportFormatError(f"Kolom wajib tidak ada: {', '.join(missing)}.")
+    if len(frame) > IMPORT_MAX_ROWS:
+        raise ImportFormatError(f"File berisi lebih dari {IMPORT_MAX_ROWS} baris.")
+    return frame[list(_REQUIRED)]
+
+
+def _parse_timestamps(values, now):
+    """
+    Teks timestamp -> datetime naif waktu lokal server (seperti timestamp dari
+    writer). Nilai dengan zona waktu eksplisit (Z / +07:00) dikonversi; nilai
+    tanpa zona dianggap sudah waktu lokal. Nilai yang tidak valid menjadi NaT.
+    """
+    import pandas as pd
+
+    # Angka (mis. epoch dari JSON) tidak ditebak satuannya; menjadi teks dan ditolak bila bukan tanggal
+    values = values.astype(object).where(values.isna(), values.astype(str))
+    try:
+        # Jalur cepat: semua nilai tanpa zona, atau semua dengan zona
+        return _local(_to_datetime(values, utc=False), now)
+    except ValueError:
+        pass
+    # Campuran nilai dengan dan tanpa zona waktu: diproses terpisah
+    aware = values.astype("string").str.contains(r"(?:Z|[+-]\d{2}:?\d{2})\s*$", regex=True, na=False)
+    parsed = pd.Series(pd.NaT, index=values.index, dtype="datetime64[ns]")
+    parsed[~aware] = _to_datetime(values[~aware], utc=False)
+    parsed[aware] = _local(_to_datetime(values[aware], utc=True), now)
+    return parsed
+
+
+def _to_datetime(values, utc):
+    import pandas as pd
+
+    # Parser ISO 8601 tervektorisasi dulu; format lain (jauh lebih lambat) hanya untuk sisanya
+    parsed = pd.to_datetime(values, errors="coerce", format="ISO8601", utc=utc).dt.as_unit("ns")
+    retry = parsed.isna() & values.notna()
+    if retry.any():
+        parsed[retry] = pd.to_datetime(values[retry], errors="coerce", format="mixed", utc=utc).dt.as_unit("ns")
+    return parsed
+
+
+def _local(parsed, now):
+    if parsed.dt.tz is None:
+        return parsed
+    return parsed.dt.tz_convert(now.astimezone().tzinfo).dt.tz_localize(None)
+
+
+def validate(frame, now):
+    """
+    Mengembalikan (data bersih, laporan). Data bersih berisi kolom ts
+    (datetime64[s]), glucose, dan heart_rate, sudah unik per timestamp dan
+    urut naik. Nomor baris di laporan dihitung dari 1 (tanpa header).
+    """
+    import pandas as pd
+
+    data = pd.DataFrame({
+        "ts": _parse_timestamps(frame["timestamp"], now).dt.floor("s"),
+        "glucose": pd.to_numeric(frame["glucose"], errors="coerce"),
+        "heart_rate": pd.to_numeric(frame["heart_rate"], errors="coerce"),
+    })
+
+    reasons = [
+        ("timestamp_invalid", data["ts"].isna()),
+        ("timestamp_future", data["ts"] > pd.Timestamp(now)),
+        ("glucose_invalid", ~data["glucose"].between(*IMPORT_GLUCOSE_RANGE)),
+        ("heart_rate_invalid", ~data["heart_rate"].between(*IMPORT_HEART_RATE_RANGE)),
+    ]
+    rejected = np.zeros(len(data), dtype=bool)
+    counts = {}
+    samples = []
+    for reason, mask in reasons:
+        # Setiap baris dihitung sekali, pada alasan pertama yang cocok
+        mask = mask.to_numpy() & ~rejected
+        counts[reason] = int(mask.sum())
+        for row in np.flatnonzero(mask)[:IMPORT_ERROR_SAMPLES - len(samples)]:
+            samples.append({"row": int(row) + 1, "error": reason})
+        rejected |= mask
+
+    data = data[~rejected]
+    before = len(data)
+    data = data.drop_duplicates("ts", keep="first").sort_values("ts", kind="stable")
+    report = {
+        "received": len(frame),
+        "rejected": counts,
+        "rejected_total": int(rejected.sum()),
+        "duplicates_in_file": before - len(data),
+        "errors": sorted(samples, key=lambda sample: sample["row"]),
+    }
+    return data.reset_index(drop=True), report
+
+
+def seconds(timestamps):
+    """Kolom datetime pandas -> ndarray int64 detik (untuk perbandingan dengan timestamp database)."""
+    return timestamps.to_numpy(dtype="datetime64[s]").astype(np.int64)
+
+
+def drop_existing(data, existing):
+    """Membuang baris yang timestamp-nya (detik) sudah ada di database untuk pasien ini."""
+    if not len(existing):
+        return data, 0
+    keep = ~np.isin(seconds(data["ts"]), np.asarray(existing, dtype=np.int64))
+    return data[keep], int((~keep).sum())
+
+
+def records(user_id, data):
+    """Tuple (user_id, glucose, heart_rate, timestamp) untuk add_monitoring_records_model."""
+    timestamps = data["ts"].dt.strftime("%Y-%m-%d %H:%M:%S").tolist()
+    return list(zip(
+        [user_id] * len(data),
+        data["glucose"].astype(float).tolist(),
+        data["heart_rate"].astype(float).tolist(),
+        timestamps,
+    ))
+
+
+_FLOOR = {"minute": "min", "hour": "h", "day": "D"}
+
+
+def rollup_rows(user_id, data):
+    """
+    Baris rollup semua resolusi untuk data yang diimpor, dengan bentuk yang
+    sama seperti aggregate_records (upsert_rollups_model menambahkannya ke
+    bucket yang sudah ada), tetapi dihitung dengan groupby.
+    """
+    rows = []
+    for resolution in RESOLUTIONS:
+        grouped = data.groupby(data["ts"].dt.floor(_FLOOR[resolution])).agg(
+            sample_count=("glucose", "size"),
+            glucose_min=("glucose", "min"),
+            glucose_max=("glucose", "max"),
+            glucose_sum=("glucose", "sum"),
+            heart_rate_min=("heart_rate", "min"),
+            heart_rate_max=("heart_rate", "max"),
+            heart_rate_sum=("heart_rate", "sum"),
+        )
+        buckets = grouped.index.to_pydatetime().tolist()
+        values = grouped.astype(float).to_numpy().tolist()
+        for bucket, (count, *aggregates) in zip(buckets, values):
+            rows.append((user_id, resolution, bucket, int(count), *aggregates))
+    return rows
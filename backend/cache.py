@@ -0,0 +1,168 @@
+"""
+Cache read-through untuk tabel yang jarang berubah (faq, users).
+
+Backend dipilih lewat CACHE_BACKEND:
+- memory (default): LRU + TTL di dalam proses. Invalidasi hanya berlaku di
+  proses yang menulis; proses lain paling lama basi selama CACHE_TTL detik.
+- redis: store di luar proses (dibagi semua worker), butuh paket redis dan
+  CACHE_REDIS_URL. Klien apa pun dengan get/set(ex=)/delete (mis. stand-in
+  lokal untuk pengembangan) bisa dipasang lewat RedisBackend(client).
+- none: cache dimatikan.
+
+Nilai yang dikembalikan cache dipakai bersama, jadi jangan diubah oleh pemanggil.
+"""
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'memory').lower()
+CACHE_TTL = float(os.getenv('CACHE_TTL', '30'))
+CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', '1024'))
+CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+CACHE_KEY_PREFIX = os.getenv('CACHE_KEY_PREFIX', 'glucosense:')
+
+_MISSING = object()
+
+
+class MemoryBackend:
+    """LRU dengan TTL per entri; entri kedaluwarsa dibuang saat dibaca."""
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return _MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def size(self):
+        with self._lock:
+            return len(self._entries)
+
+
+class RedisBackend:
+    """Store di luar proses; nilai diserialisasi dengan pickle (data internal yang tepercaya)."""
+
+    def __init__(self, client, ttl, prefix):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self.evictions = 0   # eviksi dilakukan oleh server (maxmemory-policy)
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            return _MISSING
+        return pickle.loads(raw)
+
+    def set(self, key, value):
+        self.client.set(self.prefix + key, pickle.dumps(value), ex=max(1, int(self.ttl)))
+
+    def delete(self, keys):
+        if keys:
+            self.client.delete(*[self.prefix + key for key in keys])
+
+    def size(self):
+        return None
+
+
+class Cache:
+    """Lapisan read-through dengan penghitung hit/miss/eviksi/invalidasi."""
+
+    def __init__(self, backend, name):
+        self.backend = backend
+        self.name = name
+        self._stats_lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "sets": 0, "invalidations": 0, "errors": 0}
+
+    def _count(self, key, amount=1):
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    def read_through(self, key, loader):
+        """Nilai dari cache, atau hasil loader() yang lalu disimpan. Gangguan cache tidak menggagalkan baca."""
+        if self.backend is None:
+            return loader()
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            self._count("errors")
+            print(f"WARNING: Cache get '{key}' gagal: {e}")
+            value = _MISSING
+        if value is not _MISSING:
+            self._count("hits")
+            return value
+
+        self._count("misses")
+        value = loader()
+        try:
+            self.backend.set(key, value)
+            self._count("sets")
+        except Exception as e:
+            self._count("errors")
+            print(f"WARNING: Cache set '{key}' gagal: {e}")
+        return value
+
+    def invalidate(self, *keys):
+        """Dipanggil setelah commit penulisan yang mengubah data di balik key tersebut."""
+        if self.backend is None or not keys:
+            return
+        try:
+            self.backend.delete(keys)
+            self._count("invalidations", len(keys))
+        except Exception as e:
+            self._count("errors")
+            print(f"WARNING: Invalidasi cache {keys} gagal: {e}")
+
+    def stats(self):
+        with self._stats_lock:
+            data = dict(self._stats)
+        data["backend"] = self.name
+        if self.backend is not None:
+            data["evictions"] = self.backend.evictions
+            data["entries"] = self.backend.size()
+        total = data["hits"] + data["misses"]
+        data["hit_ratio"] = round(data["hits"] / total, 4) if total else 0.0
+        return data
+
+
+def _build_cache():
+    if CACHE_BACKEND == 'none':
+        return Cache(None, 'none')
+    if CACHE_BACKEND == 'redis':
+        try:
+            import redis
+            client = redis.Redis.from_url(CACHE_REDIS_URL)
+            return Cache(RedisBackend(client, CACHE_TTL, CACHE_KEY_PREFIX), 'redis')
+        except ImportError:
+            print("WARNING: Paket redis tidak terpasang, memakai cache memory.")
+    return Cache(MemoryBackend(CACHE_MAX_ENTRIES, CACHE_TTL), 'memory')
+
+
+cache = _build_cache()
@@ -0,0 +1,61 @@
+import hashlib
+
+from flask import make_response, request
+
+from models.version_model import get_versions_model
+
+
+def _validators(versions, scopes, variant):
+    parts = [f"{scope}={versions.get(scope, (0, None))[0]}" for scope in scopes]
+    parts.append(variant)
+    etag = hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:20]
+    timestamps = [updated_at for _, updated_at in versions.values() if updated_at is not None]
+    last_modified = max(timestamps).replace(microsecond=0) if timestamps else None
+    return etag, last_modified
+
+
+def versioned_key(key, versions, scope):
+    """Key cache yang ikut berganti setiap kali versi `scope` naik."""
+    return f"{key}:v{versions.get(scope, (0, None))[0]}"
+
+
+def _not_modified(etag, last_modified):
+    # If-None-Match diutamakan; If-Modified-Since hanya dipakai jika klien tidak mengirim ETag
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if last_modified is not None and request.if_modified_since is not None:
+        return last_modified <= request.if_modified_since.replace(tzinfo=None)
+    return False
+
+
+def conditional_get(conn, scopes, build, variant="", private=False):
+    """
+    Conditional GET berbasis tabel table_versions.
+    Versi dibaca SEBELUM data, jadi validator tidak pernah lebih baru dari isi
+    respons. Jika klien sudah memegang versi terbaru, 304 dikembalikan tanpa
+    memanggil build() (tanpa query data dan tanpa encoding JSON).
+    build(versions) menerima versi yang sama dengan yang dipakai untuk ETag;
+    data yang di-cache harus memakai versi ini di key-nya (lihat versioned_key)
+    agar isi cache lama tidak pernah dikirim dengan ETag baru.
+    variant membedakan respons dari cakupan yang sama (mis. query string).
+    """
+    cursor = conn.cursor()
+    try:
+        versions = get_versions_model(cursor, scopes)
+    finally:
+        cursor.close()
+
+    etag, last_modified = _validators(versions, scopes, variant or request.full_path)
+    if _not_modified(etag, last_modified):
+        response = make_response("", 304)
+    else:
+        response = make_response(build(versions))
+        if response.status_code != 200:
+            return response
+
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    # Klien boleh menyimpan, tetapi harus selalu memvalidasi ulang
+    response.headers["Cache-Control"] = "private, no-cache" if private else "no-cache"
+    return response
@@ -0,0 +1,100 @@
+"""
+Format ekspor data monitoring yang dikirim bertahap (generator) per batch
+baris, sehingga memori tetap datar berapa pun jumlah barisnya.
+
+- CSV: satu chunk teks per batch.
+- Parquet: satu row group per batch; butuh paket opsional pyarrow
+  (pip install pyarrow). Footer ditulis saat stream selesai.
+"""
+import csv
+import io
+
+EXPORT_COLUMNS = ("id", "user_id", "namaPasien", "glucose_level", "heart_rate", "timestamp")
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+def parquet_available():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def csv_chunks(batches):
+    """Header lalu satu chunk CSV per batch tuple berurutan EXPORT_COLUMNS."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue()
+    for rows in batches:
+        buffer.seek(0)
+        buffer.truncate(0)
+        writer.writerows(rows)
+        yield buffer.getvalue()
+
+
+class _ChunkSink:
+    """
+    Tujuan tulis ParquetWriter yang menyerahkan byte ke generator alih-alih
+    menyimpannya. tell() menghitung total byte agar offset di footer tetap benar.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def parquet_chunks(batches):
+    """File Parquet bertahap: satu row group per batch tuple berurutan EXPORT_COLUMNS."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("id", pa.int64()),
+        ("user_id", pa.int32()),
+        ("namaPasien", pa.string()),
+        ("glucose_level", pa.float32()),
+        ("heart_rate", pa.float32()),
+        ("timestamp", pa.timestamp("s")),
+    ])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema, compression="snappy")
+    try:
+        for rows in batches:
+            columns = list(zip(*rows))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema
+            ))
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.drain()
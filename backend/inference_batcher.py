@@ -0,0 +1,128 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+# Semua batcher yang dibuat, agar statistiknya bisa dibaca dari endpoint health
+_batchers = {}
+_batchers_lock = threading.Lock()
+
+
+class MicroBatcher:
+    """
+    Mengumpulkan permintaan inferensi yang datang bersamaan menjadi satu batch.
+    Worker menunggu paling lama max_wait_ms setelah permintaan pertama, atau
+    sampai max_batch_size terpenuhi, lalu memanggil run_batch(items) sekali.
+    run_batch harus mengembalikan hasil dengan urutan yang sama dengan items.
+    """
+
+    def __init__(self, name, run_batch, max_batch_size=32, max_wait_ms=2.0):
+        self.name = name
+        self.run_batch = run_batch
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self._queue = queue.Queue()
+        self._worker = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "batches": 0,
+            "errors": 0,
+            "queue_wait_total": 0.0,
+            "queue_wait_max": 0.0,
+            "run_time_total": 0.0,
+            "max_batch_size_seen": 0,
+        }
+        self._batch_sizes = {}
+
+        with _batchers_lock:
+            _batchers[name] = self
+
+    def _ensure_worker(self):
+        if self._worker is None:
+            with self._start_lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(
+                        target=self._run, name=f"batcher-{self.name}", daemon=True
+                    )
+                    self._worker.start()
+
+    def submit(self, item):
+        """Memasukkan satu item ke antrean dan mengembalikan Future hasilnya."""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((item, future, time.monotonic()))
+        return future
+
+    def predict(self, item, timeout=None):
+        """Versi blocking dari submit(); melempar TimeoutError jika melewati timeout."""
+        return self.submit(item).result(timeout=timeout)
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            try:
+                # Ambil yang sudah mengantre tanpa menunggu
+                batch.append(self._queue.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.monotonic()
+            items = [item for item, _, _ in batch]
+            futures = [future for _, future, _ in batch]
+            waits = [started - enqueued for _, _, enqueued in batch]
+
+            try:
+                results = self.run_batch(items)
+                for future, result in zip(futures, results):
+                    future.set_result(result)
+                failed = False
+            except Exception as e:
+                print(f"Error saat menjalankan batch '{self.name}': {e}")
+                for future in futures:
+                    future.set_exception(e)
+                failed = True
+
+            elapsed = time.monotonic() - started
+            size = len(batch)
+            with self._stats_lock:
+                self._stats["requests"] += size
+                self._stats["batches"] += 1
+                self._stats["errors"] += 1 if failed else 0
+                self._stats["queue_wait_total"] += sum(waits)
+                self._stats["queue_wait_max"] = max(self._stats["queue_wait_max"], max(waits))
+                self._stats["run_time_total"] += elapsed
+                self._stats["max_batch_size_seen"] = max(self._stats["max_batch_size_seen"], size)
+                self._batch_sizes[size] = self._batch_sizes.get(size, 0) + 1
+
+    def stats(self):
+        with self._stats_lock:
+            data = dict(self._stats)
+            data["batch_size_counts"] = dict(sorted(self._batch_sizes.items()))
+        data["max_batch_size"] = self.max_batch_size
+        data["max_wait_ms"] = self.max_wait * 1000.0
+        data["queue_depth"] = self._queue.qsize()
+        data["avg_batch_size"] = data["requests"] / data["batches"] if data["batches"] else 0.0
+        data["avg_queue_wait"] = data["queue_wait_total"] / data["requests"] if data["requests"] else 0.0
+        return data
+
+
+def get_batcher_stats():
+    """Statistik semua batcher: ukuran batch dan waktu tunggu antrean."""
+    with _batchers_lock:
+        batchers = list(_batchers.values())
+    return {batcher.name: batcher.stats() for batcher in batchers}
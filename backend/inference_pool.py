@@ -0,0 +1,399 @@
+"""
+Pool proses inferensi: model dimuat sekali di proses worker terpisah, sehingga
+predict tidak berebut GIL dan memori dengan thread request di proses web, dan
+inferensi yang lambat tidak menahan endpoint lain seperti /api/auth/login.
+
+- Kernel didaftarkan di INFERENCE_KERNELS sebagai 'modul:fungsi'. Kernel
+  menerima satu ndarray dan mengembalikan ndarray atau tuple ndarray. Modul
+  kernel di-import di worker, jadi loader model_registry-nya ikut terdaftar di
+  sana (termasuk pergantian versi model store).
+- Setiap worker punya satu segmen shared memory (INFERENCE_SHM_BYTES) untuk
+  array input dan output; lewat pipe hanya dikirim nama kernel dan shape/dtype.
+  Array yang tidak muat dikirim lewat pipe (pickle).
+- Batas concurrency per model (INFERENCE_MODEL_CONCURRENCY, mis.
+  "lstm_glucose_trend=2,risk_rf=1"; default jumlah worker) dan batas waktu per
+  permintaan (INFERENCE_TIMEOUT). Worker yang crash atau melewati batas waktu
+  dimatikan lalu diganti proses baru.
+- Start proses worker dan pemuatan model (pertama kali atau setelah versi
+  model store berganti) memakai batas waktu sendiri, INFERENCE_START_TIMEOUT:
+  worker memberi tahu parent ('ready' / 'loading'), sehingga model yang lama
+  dimuat tidak dianggap macet dan worker tidak diganti berulang-ulang.
+- Durasi timed_stage di dalam kernel (scaler, predict, ...) dikirim balik
+  bersama output dan dicatat ke stage_duration_seconds di proses web.
+
+Worker dijalankan saat inferensi pertama. INFERENCE_POOL_WORKERS=0 menjalankan
+kernel langsung di proses web (perilaku sebelum pool ada).
+"""
+import atexit
+import importlib
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from metrics import capture_stages, record_stages
+
+INFERENCE_POOL_WORKERS = int(os.getenv('INFERENCE_POOL_WORKERS', '2'))
+INFERENCE_TIMEOUT = float(os.getenv('INFERENCE_TIMEOUT', '5'))                  # detik per permintaan
+INFERENCE_START_TIMEOUT = float(os.getenv('INFERENCE_START_TIMEOUT', '180'))     # detik start worker / muat model
+INFERENCE_SHM_BYTES = int(os.getenv('INFERENCE_SHM_BYTES', str(4 * 1024 * 1024)))
+INFERENCE_MODEL_CONCURRENCY = os.getenv('INFERENCE_MODEL_CONCURRENCY', '')
+INFERENCE_AVAILABILITY_TTL = float(os.getenv('INFERENCE_AVAILABILITY_TTL', '2'))  # detik cache hasil available()
+
+# Nama model (sama dengan nama di model_registry) -> kernel 'modul:fungsi'
+INFERENCE_KERNELS = {
+    'lstm_glucose_trend': 'routes.lstm_predict_routes:trend_kernel',
+    'risk_rf': 'routes.ml_routes:risk_kernel',
+}
+
+# Offset array output di shared memory dibulatkan ke kelipatan ini
+_ALIGN = 64
+
+
+class ModelUnavailable(Exception):
+    """Model tidak tersedia (file model tidak ada atau gagal dimuat)."""
+
+
+class InferenceError(Exception):
+    """Kernel melempar error, atau worker mati saat memproses permintaan."""
+
+
+def _resolve_kernel(spec):
+    module_name, function_name = spec.split(':')
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def _model_available(name):
+    _resolve_kernel(INFERENCE_KERNELS[name])
+    from model_registry import model_registry
+    return model_registry.get(name) is not None
+
+
+def _needs_load(name):
+    from model_registry import model_registry
+    return model_registry.needs_load(name)
+
+
+def _aligned(offset):
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _write_arrays(buf, arrays):
+    """Menulis arrays berurutan ke buf; mengembalikan [(shape, dtype, offset)] atau None jika tidak muat."""
+    metas = []
+    offset = 0
+    for array in arrays:
+        if offset + array.nbytes > len(buf):
+            return None
+        np.ndarray(array.shape, array.dtype, buffer=buf, offset=offset)[...] = array
+        metas.append((array.shape, array.dtype.str, offset))
+        offset = _aligned(offset + array.nbytes)
+    return metas
+
+
+def _read_arrays(buf, metas):
+    return [np.ndarray(shape, dtype, buffer=buf, offset=offset).copy() for shape, dtype, offset in metas]
+
+
+def _worker_main(conn, shm_name, kernels):
+    """
+    Loop proses worker: menerima (nama, meta input, input inline) dan membalas
+    (status, payload, is_tuple, durasi stage kernel). Sebelum itu 'ready'
+    dikirim sekali setelah modul kernel di-import, dan 'loading' sebelum
+    permintaan yang akan memuat model.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    resolved = {}
+    for name, spec in kernels.items():
+        try:
+            resolved[name] = _resolve_kernel(spec)
+        except Exception as e:
+            # Dilaporkan lagi per permintaan di bawah
+            print(f"WARNING: Kernel inferensi '{name}' gagal di-import: {e}")
+    try:
+        conn.send(('ready', None, None, ()))
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                return
+            if message is None:
+                return
+            name, meta, inline = message
+            try:
+                if _needs_load(name):
+                    conn.send(('loading', None, None, ()))
+                if meta == 'probe':
+                    conn.send(('ok', _model_available(name), None, ()))
+                    continue
+                if name not in resolved:
+                    resolved[name] = _resolve_kernel(kernels[name])
+                array = inline if inline is not None else _read_arrays(shm.buf, [meta])[0]
+                with capture_stages() as stages:
+                    result = resolved[name](array)
+                outputs = [np.ascontiguousarray(item) for item in (result if isinstance(result, tuple) else (result,))]
+                metas = _write_arrays(shm.buf, outputs)
+                if metas is None:
+                    conn.send(('inline', outputs, isinstance(result, tuple), stages))
+                else:
+                    conn.send(('shm', metas, isinstance(result, tuple), stages))
+            except ModelUnavailable as e:
+                conn.send(('unavailable', str(e), None, ()))
+            except Exception as e:
+                conn.send(('error', f"{type(e).__name__}: {e}", None, ()))
+    finally:
+        shm.close()
+
+
+class _Worker:
+    def __init__(self, ctx, index, shm_bytes, kernels):
+        self.index = index
+        self.shm = shared_memory.SharedMemory(create=True, size=shm_bytes)
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_main, args=(child_conn, self.shm.name, kernels),
+            name=f"inference-{index}", daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.started_at = time.time()
+        self.ready = False
+
+    def stop(self, kill=False):
+        if kill:
+            self.process.kill()
+        else:
+            try:
+                self.conn.send(None)
+            except (OSError, ValueError):
+                pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(timeout=1)
+        self.conn.close()
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class InferencePool:
+    """Pool worker inferensi dengan batas concurrency per model, timeout, dan restart otomatis."""
+
+    def __init__(self, workers, kernels, timeout, shm_bytes, concurrency=None, start_timeout=INFERENCE_START_TIMEOUT):
+        self.size = max(0, int(workers))
+        self.kernels = dict(kernels)
+        self.timeout = timeout
+        self.start_timeout = start_timeout
+        self.shm_bytes = shm_bytes
+        concurrency = concurrency or {}
+        default_limit = max(1, self.size)
+        self._limit_values = {name: max(1, concurrency.get(name, default_limit)) for name in self.kernels}
+        self._limits = {name: threading.BoundedSemaphore(limit) for name, limit in self._limit_values.items()}
+        self._ctx = multiprocessing.get_context('spawn')
+        self._idle = queue.Queue()
+        self._workers = {}
+        self._start_lock = threading.Lock()
+        self._started = False
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            name: {"requests": 0, "errors": 0, "timeouts": 0, "unavailable": 0, "run_time_total": 0.0}
+            for name in self.kernels
+        }
+        self.restarts = 0
+        self._availability = {}
+
+    @property
+    def enabled(self):
+        return self.size > 0
+
+    def _count(self, name, key, amount=1):
+        with self._stats_lock:
+            self._stats[name][key] += amount
+
+    def _ensure_started(self):
+        if self._started:
+            return
+        with self._start_lock:
+            if self._started:
+                return
+            for index in range(self.size):
+                worker = _Worker(self._ctx, index, self.shm_bytes, self.kernels)
+                self._workers[index] = worker
+                self._idle.put(worker)
+            self._started = True
+            atexit.register(self.shutdown)
+            print(f"INFO: Pool inferensi berjalan dengan {self.size} worker.")
+
+    def _replace(self, worker, reason):
+        """Mematikan worker yang crash/macet dan menggantinya dengan proses baru."""
+        print(f"WARNING: Worker inferensi {worker.index} diganti ({reason}).")
+        worker.stop(kill=True)
+        replacement = _Worker(self._ctx, worker.index, self.shm_bytes, self.kernels)
+        with self._start_lock:
+            self._workers[worker.index] = replacement
+            self.restarts += 1
+        self._idle.put(replacement)
+
+    def _call(self, name, array, deadline):
+        """Mengirim satu permintaan (array None = cek ketersediaan model) ke worker idle."""
+        self._ensure_started()
+        while True:
+            try:
+                worker = self._idle.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                raise TimeoutError(f"Tidak ada worker inferensi kosong untuk '{name}'")
+            if worker.process.is_alive():
+                break
+            # Worker mati saat idle: diganti sebelum dipakai, permintaan tidak perlu gagal
+            self._replace(worker, f"mati dengan exit code {worker.process.exitcode}")
+
+        if array is None:
+            message = (name, 'probe', None)
+        else:
+            metas = _write_arrays(worker.shm.buf, [array])
+            message = (name, metas[0], None) if metas is not None else (name, None, array)
+        try:
+            worker.conn.send(message)
+            reply = self._receive(worker, deadline)
+        except (EOFError, ConnectionError, BrokenPipeError) as e:
+            self._replace(worker, f"crash: {e}")
+            raise InferenceError(f"Worker inferensi berhenti saat memproses '{name}'")
+        if reply is None:
+            self._replace(worker, "melewati batas waktu")
+            raise TimeoutError(f"Inferensi '{name}' melewati batas waktu")
+        status, payload, is_tuple, stages = reply
+        if status == 'shm':
+            payload = _read_arrays(worker.shm.buf, payload)
+        self._idle.put(worker)
+        record_stages(stages)
+        return status, payload, is_tuple
+
+    def _receive(self, worker, deadline):
+        """
+        Balasan permintaan dari worker, atau None jika melewati batas waktu.
+        Selama worker belum 'ready' atau sedang 'loading' model, batasnya
+        diperpanjang sampai start_timeout alih-alih batas waktu permintaan.
+        """
+        budget = max(0.0, deadline - time.monotonic())
+        if not worker.ready:
+            deadline = max(deadline, time.monotonic() + self.start_timeout)
+        while worker.conn.poll(max(0.0, deadline - time.monotonic())):
+            reply = worker.conn.recv()
+            if reply[0] == 'ready':
+                # Sisa waktu permintaan dihitung lagi dari saat worker siap
+                worker.ready = True
+                deadline = time.monotonic() + budget
+            elif reply[0] == 'loading':
+                deadline = max(deadline, time.monotonic() + self.start_timeout)
+            else:
+                return reply
+        return None
+
+    def run(self, name, array, timeout=None):
+        """
+        Menjalankan kernel `name` untuk `array` di worker. Mengembalikan ndarray
+        (atau tuple ndarray sesuai kernel). Melempar TimeoutError,
+        ModelUnavailable, atau InferenceError.
+        """
+        if not self.enabled:
+            return _resolve_kernel(self.kernels[name])(array)
+
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        limit = self._limits[name]
+        if not limit.acquire(timeout=timeout):
+            self._count(name, "timeouts")
+            raise TimeoutError(f"Batas concurrency model '{name}' penuh")
+        started = time.monotonic()
+        try:
+            status, payload, is_tuple = self._call(name, np.ascontiguousarray(array), deadline)
+        except TimeoutError:
+            self._count(name, "timeouts")
+            raise
+        except InferenceError:
+            self._count(name, "errors")
+            raise
+        finally:
+            limit.release()
+            self._count(name, "requests")
+            self._count(name, "run_time_total", time.monotonic() - started)
+
+        if status == 'unavailable':
+            self._count(name, "unavailable")
+            raise ModelUnavailable(payload)
+        if status == 'error':
+            self._count(name, "errors")
+            raise InferenceError(payload)
+        return tuple(payload) if is_tuple else payload[0]
+
+    def available(self, name):
+        """True jika model `name` bisa dimuat di worker; hasilnya disimpan INFERENCE_AVAILABILITY_TTL detik."""
+        if not self.enabled:
+            return _model_available(name)
+        cached = self._availability.get(name)
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+        try:
+            status, payload, _ = self._call(name, None, time.monotonic() + self.timeout)
+            result = status == 'ok' and bool(payload)
+        except (TimeoutError, InferenceError):
+            return False
+        self._availability[name] = (result, time.monotonic() + INFERENCE_AVAILABILITY_TTL)
+        return result
+
+    def shutdown(self):
+        with self._start_lock:
+            workers = list(self._workers.values())
+            self._workers = {}
+            self._started = False
+        for worker in workers:
+            worker.stop()
+
+    def stats(self):
+        with self._stats_lock:
+            models = {
+                name: dict(data, concurrency=self._limit_values[name],
+                           avg_run_time=data["run_time_total"] / data["requests"] if data["requests"] else 0.0)
+                for name, data in self._stats.items()
+            }
+        with self._start_lock:
+            workers = {
+                index: {"pid": worker.process.pid, "alive": worker.process.is_alive(), "started_at": worker.started_at}
+                for index, worker in self._workers.items()
+            }
+        return {
+            "size": self.size,
+            "started": self._started,
+            "idle": self._idle.qsize(),
+            "restarts": self.restarts,
+            "timeout": self.timeout,
+            "start_timeout": self.start_timeout,
+            "shm_bytes": self.shm_bytes,
+            "workers": workers,
+            "models": models,
+        }
+
+
+def _parse_concurrency(value):
+    limits = {}
+    for part in value.split(','):
+        if '=' in part:
+            name, limit = part.split('=', 1)
+            limits[name.strip()] = int(limit)
+    return limits
+
+
+inference_pool = InferencePool(
+    INFERENCE_POOL_WORKERS,
+    INFERENCE_KERNELS,
+    timeout=INFERENCE_TIMEOUT,
+    shm_bytes=INFERENCE_SHM_BYTES,
+    concurrency=_parse_concurrency(INFERENCE_MODEL_CONCURRENCY),
+)
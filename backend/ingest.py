@@ -0,0 +1,288 @@
+import atexit
+import math
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime
+
+from mysql.connector import DataError, Error, IntegrityError, InterfaceError, OperationalError, ProgrammingError
+
+from db import get_connection
+from models.monitoring_model import add_monitoring_records_model
+from models.rollup_model import record_rollups_model
+from models.version_model import record_monitoring_versions_model
+
+# Konfigurasi write-behind (semua bisa diatur lewat environment)
+INGEST_QUEUE_SIZE = int(os.getenv('INGEST_QUEUE_SIZE', '10000'))
+INGEST_BATCH_SIZE = int(os.getenv('INGEST_BATCH_SIZE', '500'))
+INGEST_FLUSH_INTERVAL = float(os.getenv('INGEST_FLUSH_INTERVAL', '0.2'))   # detik
+INGEST_PUT_TIMEOUT = float(os.getenv('INGEST_PUT_TIMEOUT', '0.5'))         # detik menunggu slot antrean
+INGEST_RETRY_DELAY = float(os.getenv('INGEST_RETRY_DELAY', '1'))           # detik sebelum mencoba flush ulang
+# Rentang nilai yang diterima writer; di luar itu ditolak sebelum masuk antrean
+INGEST_GLUCOSE_MAX = float(os.getenv('INGEST_GLUCOSE_MAX', '2000'))
+INGEST_HEART_RATE_MAX = float(os.getenv('INGEST_HEART_RATE_MAX', '400'))
+
+# Kesalahan koneksi/server yang bisa hilang dengan retry
+_TRANSIENT_ERRORS = (OperationalError, InterfaceError)
+# Kesalahan karena isi baris; batch dipecah per baris agar baris lain tetap tersimpan
+_ROW_ERRORS = (IntegrityError, DataError, ProgrammingError)
+
+
+class IngestQueueFull(Exception):
+    """Antrean ingest penuh; klien sebaiknya mencoba lagi (backpressure)."""
+
+
+def validate_reading(glucose, heart_rate):
+    """
+    Mengubah nilai pembacaan menjadi float dan memeriksa rentangnya.
+    Melempar ValueError untuk nilai bukan angka, NaN/inf, atau di luar rentang,
+    karena nilai seperti itu ditolak MySQL dan tidak akan berhasil meski diulang.
+    """
+    try:
+        glucose = float(glucose)
+        heart_rate = float(heart_rate)
+    except (TypeError, ValueError):
+        raise ValueError("glucose_level dan heart_rate harus berupa angka")
+    if not (math.isfinite(glucose) and math.isfinite(heart_rate)):
+        raise ValueError("glucose_level dan heart_rate harus berupa angka terhingga")
+    if not 0 <= glucose <= INGEST_GLUCOSE_MAX:
+        raise ValueError(f"glucose_level harus di antara 0 dan {INGEST_GLUCOSE_MAX:g}")
+    if not 0 <= heart_rate <= INGEST_HEART_RATE_MAX:
+        raise ValueError(f"heart_rate harus di antara 0 dan {INGEST_HEART_RATE_MAX:g}")
+    return glucose, heart_rate
+
+
+class MonitoringWriter:
+    """
+    Jalur tulis monitoring berbasis antrean terbatas.
+    Satu thread latar belakang mengumpulkan catatan lalu menyimpannya dengan
+    satu executemany dan satu commit per batch (group commit), dipicu oleh
+    ukuran batch atau interval waktu.
+    """
+
+    def __init__(self, queue_size, batch_size, flush_interval, put_timeout):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._worker = None
+        self._start_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._flush_hooks = []
+        self._commit_listeners = []
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "accepted": 0,
+            "rejected": 0,
+            "written": 0,
+            "failed": 0,
+            "batches": 0,
+            "flush_errors": 0,
+            "flush_time_total": 0.0,
+        }
+
+    def _ensure_worker(self):
+        if self._worker is None:
+            with self._start_lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._run, name="monitoring-writer", daemon=True)
+                    self._worker.start()
+
+    def add_flush_hook(self, hook):
+        """
+        hook(cursor, records) dijalankan di dalam transaksi batch, sebelum commit,
+        hanya untuk catatan yang benar-benar tersimpan.
+        """
+        self._flush_hooks.append(hook)
+
+    def _run_flush_hooks(self, cursor, records):
+        for hook in self._flush_hooks:
+            hook(cursor, records)
+
+    def add_commit_listener(self, listener):
+        """
+        listener(records) dijalankan di thread writer setelah batch di-commit,
+        di luar transaksi. Kesalahannya hanya dicatat, tidak menggagalkan batch.
+        """
+        self._commit_listeners.append(listener)
+
+    def _run_commit_listeners(self, records):
+        for listener in self._commit_listeners:
+            try:
+                listener(records)
+            except Exception as e:
+                print(f"Error pada listener commit monitoring: {e}")
+
+    def is_full(self):
+        return self._queue.full()
+
+    def submit(self, user_id, glucose, heart_rate, timestamp=None):
+        """
+        Memasukkan satu pembacaan ke antrean dan mengembalikan Future yang selesai
+        setelah batch-nya di-commit. Melempar IngestQueueFull jika antrean tetap
+        penuh setelah INGEST_PUT_TIMEOUT, atau ValueError jika nilainya tidak valid.
+        """
+        glucose, heart_rate = validate_reading(glucose, heart_rate)
+        if self._stopping.is_set():
+            raise IngestQueueFull("Writer monitoring sedang dimatikan")
+        self._ensure_worker()
+
+        if timestamp is None:
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        future = Future()
+        try:
+            self._queue.put(((user_id, glucose, heart_rate, timestamp), future), timeout=self.put_timeout)
+        except queue.Full:
+            with self._stats_lock:
+                self._stats["rejected"] += 1
+            raise IngestQueueFull("Antrean penyimpanan monitoring penuh")
+
+        with self._stats_lock:
+            self._stats["accepted"] += 1
+        return future
+
+    def _collect(self):
+        """Mengambil satu batch: berhenti saat batch_size tercapai atau flush_interval habis."""
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stopping.is_set():
+            batch = self._collect()
+            if batch:
+                self._flush_with_retry(batch)
+
+    def _flush_with_retry(self, batch):
+        """
+        Data tidak dibuang saat koneksi/server database bermasalah; batch dicoba
+        ulang sampai berhasil. Kesalahan lain tidak akan hilang dengan retry,
+        jadi batch langsung digagalkan agar writer tidak macet untuk semua pasien.
+        """
+        while True:
+            try:
+                self._flush(batch)
+                return
+            except _TRANSIENT_ERRORS as e:
+                with self._stats_lock:
+                    self._stats["flush_errors"] += 1
+                print(f"Error saat flush batch monitoring ({len(batch)} baris): {e}")
+                if self._stopping.is_set():
+                    self._fail(batch, e)
+                    return
+                time.sleep(INGEST_RETRY_DELAY)
+            except Exception as e:
+                # Kesalahan non-transien tidak akan hilang dengan retry
+                print(f"Error tak terduga saat flush batch monitoring: {e}")
+                self._fail(batch, e)
+                return
+
+    def _flush(self, batch):
+        started = time.monotonic()
+        conn = get_connection()
+        if conn is None:
+            raise OperationalError(msg="Koneksi database gagal")
+
+        cursor = conn.cursor()
+        try:
+            records = [record for record, _ in batch]
+            try:
+                add_monitoring_records_model(cursor, records)
+                self._run_flush_hooks(cursor, records)
+                conn.commit()
+                written = batch
+                failed = []
+            except _ROW_ERRORS:
+                # Satu baris buruk (mis. user_id tidak ada, nilai di luar rentang kolom)
+                # tidak boleh menggagalkan seluruh batch
+                conn.rollback()
+                written, failed = self._insert_one_by_one(conn, cursor, batch)
+        finally:
+            cursor.close()
+            conn.close()
+
+        for _, future in written:
+            future.set_result(True)
+        for (_, future), error in failed:
+            future.set_exception(error)
+        if written:
+            self._run_commit_listeners([record for record, _ in written])
+
+        with self._stats_lock:
+            self._stats["batches"] += 1
+            self._stats["written"] += len(written)
+            self._stats["failed"] += len(failed)
+            self._stats["flush_time_total"] += time.monotonic() - started
+
+    def _insert_one_by_one(self, conn, cursor, batch):
+        written = []
+        failed = []
+        for record, future in batch:
+            try:
+                add_monitoring_records_model(cursor, [record])
+                written.append((record, future))
+            except _ROW_ERRORS as e:
+                print(f"Catatan monitoring ditolak {record}: {e}")
+                failed.append(((record, future), e))
+        self._run_flush_hooks(cursor, [record for record, _ in written])
+        conn.commit()
+        return written, failed
+
+    def _fail(self, batch, error):
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+        with self._stats_lock:
+            self._stats["failed"] += len(batch)
+
+    def close(self, timeout=10.0):
+        """Menghentikan writer dan menyimpan seluruh isi antrean (dipanggil saat shutdown)."""
+        if self._worker is None:
+            return
+        self._stopping.set()
+        self._worker.join(timeout)
+
+        remaining = []
+        while True:
+            try:
+                remaining.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        for start in range(0, len(remaining), self.batch_size):
+            chunk = remaining[start:start + self.batch_size]
+            try:
+                self._flush(chunk)
+            except Error as e:
+                print(f"Error saat flush akhir monitoring ({len(chunk)} baris): {e}")
+                self._fail(chunk, e)
+
+    def stats(self):
+        with self._stats_lock:
+            data = dict(self._stats)
+        data["queue_depth"] = self._queue.qsize()
+        data["queue_capacity"] = self._queue.maxsize
+        data["avg_batch_size"] = data["written"] / data["batches"] if data["batches"] else 0.0
+        return data
+
+
+monitoring_writer = MonitoringWriter(
+    queue_size=INGEST_QUEUE_SIZE,
+    batch_size=INGEST_BATCH_SIZE,
+    flush_interval=INGEST_FLUSH_INTERVAL,
+    put_timeout=INGEST_PUT_TIMEOUT
+)
+# Rollup menit/jam/hari diperbarui dalam transaksi yang sama dengan INSERT
+monitoring_writer.add_flush_hook(record_rollups_model)
+# Validator ETag /monitoring dan /monitoring/me ikut berubah saat batch di-commit
+monitoring_writer.add_flush_hook(record_monitoring_versions_model)
+atexit.register(monitoring_writer.close)
@@ -0,0 +1,403 @@
+"""
+Metrik Prometheus untuk backend (format teks exposition 0.0.4, tanpa dependensi).
+
+Yang dicatat:
+- http_request_duration_seconds / http_responses_total per blueprint, endpoint,
+  method (dan status) lewat hook before/after_request.
+- db_query_duration_seconds per fungsi pemanggil (mis. get_all_faqs_model) dan
+  fase execute/fetch, dari cursor yang dibungkus PooledConnection.cursor().
+- db_target_query_duration_seconds per server (primary/replicaN) dan fase, plus
+  status dan failover replika.
+- stage_duration_seconds untuk decode JWT, encode JSON, scaler, dan inferensi model.
+- Gauge pool koneksi, batcher, dan cache dibaca dari stats() saat di-scrape.
+
+Pencatatan hanya berupa penambahan counter di bawah lock per metrik (orde
+mikrodetik); rendering teks baru dikerjakan saat /metrics diminta.
+METRICS_ENABLED=0 mematikan semua pencatatan.
+"""
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', '1') == '1'
+METRICS_PATH = os.getenv('METRICS_PATH', '/metrics')
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{_escape(value)}"' for name, value in extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Counter monoton dengan label; nilai label dikirim sebagai tuple sesuai urutan labelnames."""
+
+    type = 'counter'
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            yield f'{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}'
+
+
+class Histogram:
+    """Histogram dengan bucket tetap; hitungan kumulatif baru dihitung saat render."""
+
+    type = 'histogram'
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}   # labels -> [hitungan per bucket (+Inf di akhir), sum]
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    @contextmanager
+    def time(self, labels=()):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(labels, time.perf_counter() - started)
+
+    def render(self):
+        with self._lock:
+            items = sorted((labels, list(counts), total) for labels, (counts, total) in self._series.items())
+        bounds = self.buckets + (float('inf'),)
+        for labels, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                le = _format_value(bound) if bound == float('inf') else repr(bound)
+                yield f'{self.name}_bucket{_format_labels(self.labelnames, labels, [("le", le)])} {cumulative}'
+            yield f'{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}'
+            yield f'{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}'
+
+
+class Registry:
+    """Kumpulan metrik plus collector yang membaca stats() komponen lain saat scrape."""
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name, help, labelnames=()):
+        metric = Counter(name, help, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        metric = Histogram(name, help, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collect):
+        """
+        collect() mengembalikan list (name, type, help, [(labels_dict, value), ...]).
+        Collector yang gagal dilewati agar satu komponen tidak merusak seluruh scrape.
+        """
+        self._collectors.append(collect)
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            samples = list(metric.render())
+            if not samples:
+                continue
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            lines.extend(samples)
+        for collect in self._collectors:
+            try:
+                families = collect()
+            except Exception as e:
+                print(f"WARNING: Collector metrik {getattr(collect, '__name__', collect)} gagal: {e}")
+                continue
+            for name, kind, help, samples in families:
+                lines.append(f'# HELP {name} {help}')
+                lines.append(f'# TYPE {name} {kind}')
+                for labels, value in samples:
+                    label_text = _format_labels(labels.keys(), labels.values())
+                    lines.append(f'{name}{label_text} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+http_request_duration = registry.histogram(
+    'http_request_duration_seconds', 'Latensi request HTTP sampai respons dikembalikan view.',
+    ('blueprint', 'endpoint', 'method'))
+http_responses = registry.counter(
+    'http_responses_total', 'Jumlah respons HTTP per status.',
+    ('blueprint', 'endpoint', 'method', 'status'))
+db_query_duration = registry.histogram(
+    'db_query_duration_seconds', 'Durasi query per fungsi pemanggil dan fase (execute/fetch).',
+    ('query', 'phase'))
+db_target_query_duration = registry.histogram(
+    'db_target_query_duration_seconds', 'Durasi query per server database (primary/replicaN) dan fase.',
+    ('target', 'phase'))
+stage_duration = registry.histogram(
+    'stage_duration_seconds', 'Durasi tahap pemrosesan (jwt_decode, json_encode, scaler_transform, predict, ...).',
+    ('stage', 'model'))
+
+
+_stage_capture = threading.local()
+
+
+@contextmanager
+def timed_stage(stage, model=''):
+    """Mencatat durasi blok ke stage_duration_seconds (atau ke capture_stages() jika aktif)."""
+    if not METRICS_ENABLED:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        captured = getattr(_stage_capture, 'items', None)
+        if captured is not None:
+            captured.append((stage, model, elapsed))
+        else:
+            stage_duration.observe((stage, model), elapsed)
+
+
+@contextmanager
+def capture_stages():
+    """
+    Mengumpulkan durasi timed_stage di thread ini sebagai list (stage, model,
+    detik) alih-alih mencatatnya. Dipakai worker inferensi, yang registry-nya
+    tidak pernah di-scrape; hasilnya dicatat di proses web lewat record_stages().
+    """
+    items = []
+    _stage_capture.items = items
+    try:
+        yield items
+    finally:
+        _stage_capture.items = None
+
+
+def record_stages(items):
+    if not METRICS_ENABLED:
+        return
+    for stage, model, elapsed in items:
+        stage_duration.observe((stage, model), elapsed)
+
+
+class TimedCursor:
+    """
+    Pembungkus cursor MySQL yang mencatat durasi execute/fetch. Label query adalah
+    nama fungsi yang memanggil execute (fungsi *_model atau view), jadi jumlah
+    label terbatas pada fungsi yang ada di kode dan tidak bergantung pada isi SQL.
+    """
+
+    __slots__ = ('_cursor', '_label', '_target')
+
+    def __init__(self, cursor, target='primary'):
+        self._cursor = cursor
+        self._label = 'unknown'
+        self._target = target
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._cursor.close()
+        return False
+
+    def _run(self, phase, method, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            db_query_duration.observe((self._label, phase), elapsed)
+            db_target_query_duration.observe((self._target, phase), elapsed)
+
+    def execute(self, *args, **kwargs):
+        self._label = sys._getframe(1).f_code.co_qualname
+        return self._run('execute', self._cursor.execute, *args, **kwargs)
+
+    def executemany(self, *args, **kwargs):
+        self._label = sys._getframe(1).f_code.co_qualname
+        return self._run('execute', self._cursor.executemany, *args, **kwargs)
+
+    def fetchone(self):
+        return self._run('fetch', self._cursor.fetchone)
+
+    def fetchmany(self, *args, **kwargs):
+        return self._run('fetch', self._cursor.fetchmany, *args, **kwargs)
+
+    def fetchall(self):
+        return self._run('fetch', self._cursor.fetchall)
+
+
+def wrap_cursor(cursor, target='primary'):
+    return TimedCursor(cursor, target) if METRICS_ENABLED else cursor
+
+
+# --- Collector untuk komponen yang sudah punya stats() -------------------------
+
+def _collect_pool():
+    from db import get_pool_stats
+    stats = get_pool_stats()
+    return [
+        ('db_pool_size', 'gauge', 'Ukuran maksimum pool koneksi.', [({}, stats['size'])]),
+        ('db_pool_connections', 'gauge', 'Koneksi pool per state.',
+         [({'state': 'in_use'}, stats['in_use']), ({'state': 'idle'}, stats['idle'])]),
+        ('db_pool_checkouts_total', 'counter', 'Jumlah checkout koneksi.', [({}, stats['checkouts'])]),
+        ('db_pool_waits_total', 'counter', 'Checkout yang harus menunggu koneksi kosong.', [({}, stats['waits'])]),
+        ('db_pool_wait_seconds_total', 'counter', 'Total waktu menunggu koneksi.', [({}, stats['wait_time_total'])]),
+        ('db_pool_timeouts_total', 'counter', 'Checkout yang gagal karena pool penuh.', [({}, stats['timeouts'])]),
+        ('db_pool_connect_errors_total', 'counter', 'Kegagalan membuka koneksi baru.', [({}, stats['connect_errors'])]),
+    ]
+
+
+def _collect_replicas():
+    from db import get_replica_stats
+    stats = get_replica_stats()
+    replicas = stats['replicas']
+    return [
+        ('db_replica_up', 'gauge', 'Replika dianggap sehat (1) atau sedang dilewati (0).',
+         [({'target': name}, int(data['healthy'])) for name, data in replicas.items()]),
+        ('db_replica_reads_total', 'counter', 'Koneksi baca yang dilayani replika.',
+         [({'target': name}, data['reads']) for name, data in replicas.items()]),
+        ('db_replica_failovers_total', 'counter', 'Checkout replika yang gagal sehingga dialihkan.',
+         [({'target': name}, data['failovers']) for name, data in replicas.items()]),
+        ('db_read_primary_total', 'counter', 'Koneksi baca yang diarahkan ke primary.',
+         [({'reason': 'sticky'}, stats['sticky_reads']), ({'reason': 'fallback'}, stats['primary_fallbacks'])]),
+    ]
+
+
+def _collect_batchers():
+    from inference_batcher import get_batcher_stats
+    stats = get_batcher_stats()
+    return [
+        ('batcher_requests_total', 'counter', 'Item inferensi yang diproses batcher.',
+         [({'batcher': name}, data['requests']) for name, data in stats.items()]),
+        ('batcher_batches_total', 'counter', 'Batch inferensi yang dijalankan.',
+         [({'batcher': name}, data['batches']) for name, data in stats.items()]),
+        ('batcher_queue_depth', 'gauge', 'Item yang sedang mengantre.',
+         [({'batcher': name}, data['queue_depth']) for name, data in stats.items()]),
+    ]
+
+
+def _collect_inference_pool():
+    from inference_pool import inference_pool
+    stats = inference_pool.stats()
+    models = stats['models']
+    return [
+        ('inference_pool_requests_total', 'counter', 'Permintaan yang dikirim ke pool proses inferensi.',
+         [({'model': name}, data['requests']) for name, data in models.items()]),
+        ('inference_pool_timeouts_total', 'counter', 'Permintaan pool inferensi yang melewati batas waktu.',
+         [({'model': name}, data['timeouts']) for name, data in models.items()]),
+        ('inference_pool_errors_total', 'counter', 'Permintaan pool inferensi yang gagal.',
+         [({'model': name}, data['errors']) for name, data in models.items()]),
+        ('inference_pool_workers_alive', 'gauge', 'Worker inferensi yang hidup.',
+         [({}, sum(1 for worker in stats['workers'].values() if worker['alive']))]),
+        ('inference_pool_restarts_total', 'counter', 'Worker inferensi yang diganti karena crash atau timeout.',
+         [({}, stats['restarts'])]),
+    ]
+
+
+def _collect_cache():
+    from cache import cache
+    stats = cache.stats()
+    labels = {'backend': stats['backend']}
+    return [
+        (f'cache_{key}_total', 'counter', f'Jumlah {key} cache read-through.', [(labels, stats[key])])
+        for key in ('hits', 'misses', 'invalidations', 'errors')
+    ]
+
+
+registry.add_collector(_collect_pool)
+registry.add_collector(_collect_replicas)
+registry.add_collector(_collect_batchers)
+registry.add_collector(_collect_inference_pool)
+registry.add_collector(_collect_cache)
+
+
+# --- Integrasi Flask -----------------------------------------------------------
+
+def _json_provider_class(base):
+    class TimedJSONProvider(base):
+        def dumps(self, obj, **kwargs):
+            with timed_stage('json_encode'):
+                return super().dumps(obj, **kwargs)
+    return TimedJSONProvider
+
+
+def init_app(app):
+    """Memasang hook latensi request, timer encode JSON, dan endpoint METRICS_PATH."""
+    from flask import Response, g, request
+
+    @app.route(METRICS_PATH, methods=['GET'])
+    def metrics():
+        return Response(registry.render(), content_type=CONTENT_TYPE)
+
+    if not METRICS_ENABLED:
+        return
+
+    app.json_provider_class = _json_provider_class(app.json_provider_class)
+    app.json = app.json_provider_class(app)
+
+    @app.before_request
+    def _start_timer():
+        g._metrics_started = time.perf_counter()
+
+    @app.after_request
+    def _record_request(response):
+        started = g.pop('_metrics_started', None)
+        if started is not None:
+            endpoint = request.endpoint or 'not_found'
+            blueprint = request.blueprint or ''
+            method = request.method
+            http_request_duration.observe((blueprint, endpoint, method), time.perf_counter() - started)
+            http_responses.inc((blueprint, endpoint, method, str(response.status_code)))
+        return response
@@ -0,0 +1,170 @@
+"""
+Migrasi skema database berversi (folder migrations/).
+
+- NNNN_nama.sql dijalankan statement demi statement,
+- NNNN_nama.py harus punya fungsi upgrade(cursor).
+
+Versi yang sudah diterapkan dicatat di tabel schema_migrations beserta
+checksum file, jadi setiap migrasi hanya berjalan sekali; file yang berubah
+setelah diterapkan dilaporkan sebagai peringatan. DDL MySQL melakukan commit
+implisit sehingga migrasi tidak bisa di-rollback, maka migrasi ditulis agar
+aman diulang jika terputus (IF NOT EXISTS, error "sudah ada" diabaikan,
+migrasi Python memeriksa keadaan dulu). Hal ini juga membuat database lama
+yang skemanya dibuat manual bisa langsung dimigrasikan.
+
+CLI (dari folder backend):
+    python migrate.py             # terapkan migrasi yang belum dijalankan
+    python migrate.py --status    # daftar migrasi dan statusnya
+    python migrate.py --dry-run   # tampilkan migrasi yang akan dijalankan
+"""
+import hashlib
+import importlib.util
+import os
+import re
+import sys
+
+from mysql.connector import Error
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+
+# Error MySQL yang berarti objek skema sudah ada (tabel, kolom, atau indeks)
+_ALREADY_EXISTS = {1050, 1060, 1061}
+_FILENAME = re.compile(r'^(\d{4})_([a-z0-9_]+)\.(sql|py)$')
+
+
+class Migration:
+    def __init__(self, version, name, path, kind):
+        self.version = version
+        self.name = name
+        self.path = path
+        self.kind = kind
+        with open(path, 'rb') as f:
+            self.checksum = hashlib.sha256(f.read()).hexdigest()
+
+
+def discover(directory=MIGRATIONS_DIR):
+    """Semua migrasi di folder, urut versi. Versi ganda dianggap kesalahan."""
+    migrations = []
+    for entry in sorted(os.listdir(directory)):
+        match = _FILENAME.match(entry)
+        if match:
+            migrations.append(Migration(match.group(1), match.group(2), os.path.join(directory, entry), match.group(3)))
+    versions = [m.version for m in migrations]
+    duplicates = sorted({v for v in versions if versions.count(v) > 1})
+    if duplicates:
+        raise ValueError(f"Versi migrasi ganda: {', '.join(duplicates)}")
+    return migrations
+
+
+def sql_statements(text):
+    """Memecah file SQL per ';' setelah membuang baris komentar penuh."""
+    lines = [line for line in text.splitlines() if not line.lstrip().startswith('--')]
+    return [stmt.strip() for stmt in '\n'.join(lines).split(';') if stmt.strip()]
+
+
+def _ensure_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version VARCHAR(16) NOT NULL PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            checksum CHAR(64) NOT NULL,
+            applied_at DATETIME NOT NULL
+        )
+    """)
+
+
+def get_applied_model(cursor):
+    """{version: checksum} migrasi yang sudah diterapkan."""
+    cursor.execute("SELECT version, checksum FROM schema_migrations")
+    return {version: checksum for version, checksum in cursor.fetchall()}
+
+
+def _run(cursor, migration):
+    if migration.kind == 'sql':
+        with open(migration.path, encoding='utf-8') as f:
+            statements = sql_statements(f.read())
+        for statement in statements:
+            try:
+                cursor.execute(statement)
+            except Error as e:
+                if e.errno not in _ALREADY_EXISTS:
+                    raise
+    else:
+        spec = importlib.util.spec_from_file_location(f"migration_{migration.version}", migration.path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        module.upgrade(cursor)
+
+
+def migrate(conn, dry_run=False):
+    """Menerapkan migrasi yang belum dijalankan, berurutan. Mengembalikan daftar versi yang diterapkan."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT GET_LOCK('schema_migrate', 60)")
+        if cursor.fetchone()[0] != 1:
+            raise Error(msg="Migrasi lain sedang berjalan")
+        try:
+            _ensure_table(cursor)
+            applied = get_applied_model(cursor)
+            done = []
+            for migration in discover():
+                if migration.version in applied:
+                    if applied[migration.version] != migration.checksum:
+                        print(f"WARNING: Migrasi {migration.version}_{migration.name} berubah setelah diterapkan.")
+                    continue
+                if dry_run:
+                    print(f"INFO: Akan menjalankan {migration.version}_{migration.name}.{migration.kind}")
+                    done.append(migration.version)
+                    continue
+                _run(cursor, migration)
+                cursor.execute(
+                    "INSERT INTO schema_migrations (version, name, checksum, applied_at) VALUES (%s, %s, %s, NOW())",
+                    (migration.version, migration.name, migration.checksum)
+                )
+                conn.commit()
+                done.append(migration.version)
+                print(f"SUCCESS: Migrasi {migration.version}_{migration.name} diterapkan.")
+            return done
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK('schema_migrate')")
+            cursor.fetchone()
+    finally:
+        cursor.close()
+
+
+def status(conn):
+    cursor = conn.cursor()
+    try:
+        _ensure_table(cursor)
+        applied = get_applied_model(cursor)
+    finally:
+        cursor.close()
+    for migration in discover():
+        if migration.version not in applied:
+            state = "belum"
+        elif applied[migration.version] != migration.checksum:
+            state = "diterapkan (file berubah)"
+        else:
+            state = "diterapkan"
+        print(f"{migration.version}  {migration.name:<28} {state}")
+
+
+if __name__ == '__main__':
+    from db import get_connection
+
+    conn = get_connection()
+    if conn is None:
+        print("ERROR: Koneksi database gagal")
+        sys.exit(1)
+    try:
+        if '--status' in sys.argv[1:]:
+            status(conn)
+        else:
+            applied_now = migrate(conn, dry_run='--dry-run' in sys.argv[1:])
+            if not applied_now:
+                print("INFO: Skema sudah versi terbaru.")
+    except Error as e:
+        print(f"ERROR: Migrasi gagal: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
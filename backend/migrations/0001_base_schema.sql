@@ -0,0 +1,42 @@
+-- Skema dasar tabel yang dipakai backend (users, monitoring, sensors, faq).
+-- IF NOT EXISTS agar database lama yang tabelnya sudah ada bisa di-baseline;
+-- perbedaan skemanya disusulkan oleh migrasi 0006 dan 0007.
+CREATE TABLE IF NOT EXISTS users (
+    id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    age INT NULL,
+    email VARCHAR(255) NOT NULL UNIQUE,
+    gender VARCHAR(20) NULL,
+    address VARCHAR(255) NULL,
+    password VARCHAR(255) NOT NULL,
+    role VARCHAR(20) NOT NULL DEFAULT 'patient',   -- 'admin' atau 'patient'
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Dipartisi per bulan pada timestamp (lihat monitoring_archive.py);
+-- partisi bulanan dibuat oleh job pemeliharaan dari p_future.
+CREATE TABLE IF NOT EXISTS monitoring (
+    id INT NOT NULL AUTO_INCREMENT,
+    user_id INT NOT NULL,
+    glucose_level FLOAT NOT NULL,
+    heart_rate FLOAT NOT NULL,
+    timestamp DATETIME NOT NULL,
+    PRIMARY KEY (id, timestamp)
+)
+PARTITION BY RANGE COLUMNS (timestamp) (
+    PARTITION p_future VALUES LESS THAN (MAXVALUE)
+);
+
+-- Dua baris tetap: 1 = glukosa, 2 = detak jantung (lihat SENSOR_FIELDS di sensor_routes.py)
+CREATE TABLE IF NOT EXISTS sensors (
+    sensor_id INT NOT NULL PRIMARY KEY,
+    sensor_value VARCHAR(32) NOT NULL DEFAULT '0'
+);
+
+CREATE TABLE IF NOT EXISTS faq (
+    id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    judul VARCHAR(255) NOT NULL,
+    deskripsi TEXT NOT NULL
+);
+
+INSERT IGNORE INTO sensors (sensor_id, sensor_value) VALUES (1, '0'), (2, '0');
@@ -0,0 +1,11 @@
+-- Indeks komposit untuk keyset pagination /api/monitoring dan /api/monitoring/me.
+-- Kolom yang dipilih ikut dimasukkan agar query menjadi index-only range scan
+-- (ORDER BY timestamp DESC, id DESC dibaca mundur dari indeks, tanpa filesort).
+
+-- /api/monitoring/me dan filter user_id di /api/monitoring
+CREATE INDEX idx_monitoring_user_ts
+    ON monitoring (user_id, timestamp, id, glucose_level, heart_rate);
+
+-- /api/monitoring (admin) tanpa filter user_id
+CREATE INDEX idx_monitoring_ts
+    ON monitoring (timestamp, id, user_id, glucose_level, heart_rate);
@@ -0,0 +1,15 @@
+-- Rollup time-series per pasien untuk grafik riwayat (lihat models/rollup_model.py).
+-- Satu baris per (user_id, resolusi, awal bucket); rata-rata = *_sum / sample_count.
+CREATE TABLE IF NOT EXISTS monitoring_rollup (
+    user_id INT NOT NULL,
+    resolution ENUM('minute', 'hour', 'day') NOT NULL,
+    bucket_start DATETIME NOT NULL,
+    sample_count INT NOT NULL,
+    glucose_min DOUBLE NOT NULL,
+    glucose_max DOUBLE NOT NULL,
+    glucose_sum DOUBLE NOT NULL,
+    heart_rate_min DOUBLE NOT NULL,
+    heart_rate_max DOUBLE NOT NULL,
+    heart_rate_sum DOUBLE NOT NULL,
+    PRIMARY KEY (user_id, resolution, bucket_start)
+);
@@ -0,0 +1,28 @@
+-- Input terakhir dan skor risiko prakomputasi per pasien (lihat risk_job.py).
+-- Job hanya menilai ulang pasien yang inputs_updated_at atau model_version-nya berbeda.
+CREATE TABLE IF NOT EXISTS patient_risk_inputs (
+    user_id INT NOT NULL PRIMARY KEY,
+    gender TINYINT NOT NULL,
+    age INT NOT NULL,
+    hypertension TINYINT NOT NULL,
+    heart_disease TINYINT NOT NULL,
+    smoking_history TINYINT NOT NULL,
+    berat DOUBLE NOT NULL,
+    tinggi DOUBLE NOT NULL,
+    hba1c_level DOUBLE NOT NULL,
+    blood_glucose DOUBLE NOT NULL,
+    updated_at DATETIME(6) NOT NULL,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS risk_scores (
+    user_id INT NOT NULL PRIMARY KEY,
+    prediction_code TINYINT NOT NULL,
+    probability DOUBLE NOT NULL,
+    risk_factors TEXT NOT NULL,
+    model_version VARCHAR(64) NOT NULL,
+    inputs_updated_at DATETIME(6) NOT NULL,
+    scored_at DATETIME NOT NULL,
+    INDEX idx_risk_scores_probability (probability),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
@@ -0,0 +1,8 @@
+-- Penghitung versi per cakupan data untuk validator ETag / Last-Modified (lihat conditional.py).
+-- Cakupan: 'faq', 'users', 'monitoring', 'monitoring:user:<id>'.
+-- Dinaikkan di dalam transaksi yang sama dengan penulisan datanya.
+CREATE TABLE IF NOT EXISTS table_versions (
+    scope VARCHAR(64) NOT NULL PRIMARY KEY,
+    version BIGINT NOT NULL,
+    updated_at DATETIME(6) NOT NULL
+);
@@ -0,0 +1,35 @@
+"""
+Indeks users untuk predikat yang sering dipakai:
+- login: WHERE email = %s (database baru sudah punya UNIQUE dari 0001),
+- daftar pasien: WHERE role = 'patient', dengan created_at untuk urutan pendaftaran.
+"""
+from mysql.connector import Error
+
+
+def _has_leading_index(cursor, table, columns):
+    """True jika ada indeks yang kolom-kolom awalnya persis `columns`."""
+    cursor.execute("""
+        SELECT INDEX_NAME, COLUMN_NAME
+        FROM INFORMATION_SCHEMA.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        ORDER BY INDEX_NAME, SEQ_IN_INDEX
+    """, (table,))
+    indexes = {}
+    for index_name, column in cursor.fetchall():
+        indexes.setdefault(index_name, []).append(column)
+    return any(found[:len(columns)] == list(columns) for found in indexes.values())
+
+
+def upgrade(cursor):
+    if not _has_leading_index(cursor, 'users', ['email']):
+        try:
+            cursor.execute("CREATE UNIQUE INDEX uq_users_email ON users (email)")
+        except Error as e:
+            if e.errno != 1062:
+                raise
+            # Data lama berisi email ganda: login tetap perlu indeks walau tidak unik
+            print("WARNING: users.email berisi duplikat, memakai indeks non-unik.")
+            cursor.execute("CREATE INDEX idx_users_email ON users (email)")
+
+    if not _has_leading_index(cursor, 'users', ['role', 'created_at']):
+        cursor.execute("CREATE INDEX idx_users_role_created ON users (role, created_at)")
@@ -0,0 +1,43 @@
+"""
+Mengubah tabel monitoring lama (dari sebelum 0001 berpartisi) menjadi tabel
+berpartisi per bulan pada timestamp. Database baru sudah berpartisi dan
+migrasi ini tidak melakukan apa-apa.
+
+MySQL mensyaratkan kolom partisi ada di setiap unique key dan tidak mendukung
+foreign key pada tabel berpartisi, jadi foreign key ke users dihapus (user
+dihapus beserta monitoring-nya di delete_user_model) dan primary key menjadi
+(id, timestamp). Semua data awalnya masuk p_future lalu dipecah menjadi
+partisi bulanan mulai dari bulan data tertua.
+"""
+from models.partition_model import get_partitions_model
+from monitoring_archive import ensure_partitions
+
+
+def upgrade(cursor):
+    if get_partitions_model(cursor):
+        return
+
+    cursor.execute("""
+        SELECT CONSTRAINT_NAME
+        FROM INFORMATION_SCHEMA.REFERENTIAL_CONSTRAINTS
+        WHERE CONSTRAINT_SCHEMA = DATABASE() AND TABLE_NAME = 'monitoring'
+    """)
+    for (constraint,) in cursor.fetchall():
+        cursor.execute(f"ALTER TABLE monitoring DROP FOREIGN KEY `{constraint}`")
+
+    cursor.execute("""
+        SELECT COLUMN_NAME
+        FROM INFORMATION_SCHEMA.KEY_COLUMN_USAGE
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'monitoring' AND CONSTRAINT_NAME = 'PRIMARY'
+        ORDER BY ORDINAL_POSITION
+    """)
+    if [row[0] for row in cursor.fetchall()] != ['id', 'timestamp']:
+        cursor.execute("ALTER TABLE monitoring DROP PRIMARY KEY, ADD PRIMARY KEY (id, timestamp)")
+
+    cursor.execute("""
+        ALTER TABLE monitoring
+        PARTITION BY RANGE COLUMNS (timestamp) (
+            PARTITION p_future VALUES LESS THAN (MAXVALUE)
+        )
+    """)
+    ensure_partitions(cursor)
@@ -0,0 +1,4 @@
+-- Menandai input risiko yang gagal divalidasi job skor (lihat risk_job.py).
+-- Berisi nilai updated_at dari input yang ditolak; run incremental melewati
+-- baris yang invalid_updated_at = updated_at sampai inputnya diperbarui lagi.
+ALTER TABLE patient_risk_inputs ADD COLUMN invalid_updated_at DATETIME(6) NULL;
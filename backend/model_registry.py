@@ -0,0 +1,177 @@
+import os
+import sys
+import threading
+import time
+
+from model_store import active_version
+
+# Daftar model yang dimuat saat startup: kosong (default, semua lazy), "all",
+# atau nama dipisah koma, mis. "lstm_glucose_trend,risk_rf"
+MODEL_WARMUP = os.getenv('MODEL_WARMUP', '')
+# Seberapa sering (detik) versi aktif model store diperiksa ulang
+MODEL_VERSION_CHECK_INTERVAL = float(os.getenv('MODEL_VERSION_CHECK_INTERVAL', '2'))
+
+
+def _current_rss_bytes():
+    """RSS proses saat ini dari /proc (Linux) atau psutil jika terpasang; None jika tidak bisa dibaca."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        return None
+
+
+def _peak_rss_bytes():
+    """Puncak RSS proses dari getrusage (tidak ada di Windows: None)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss dalam byte di macOS, dalam KiB di Linux
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class _Entry:
+    def __init__(self, loader):
+        self.loader = loader
+        self.lock = threading.Lock()
+        self.loaded = False
+        self.value = None
+        self.error = None
+        self.load_time = None
+        self.rss_delta = None
+        self.loaded_at = None
+        self.version = None
+
+
+class ModelRegistry:
+    """
+    Memuat model dan scaler saat pertama kali dipakai (atau lewat warmup),
+    bukan saat modul route di-import. Setiap loader hanya dijalankan sekali;
+    waktu muat dan pertambahan memori dicatat per model.
+
+    Jika version_source dipasang, versi aktif diperiksa berkala; saat berubah,
+    semua entri diganti baru sehingga permintaan berikutnya memuat versi baru,
+    sementara permintaan yang sedang berjalan tetap memakai objek lamanya.
+    """
+
+    def __init__(self, version_source=None, check_interval=MODEL_VERSION_CHECK_INTERVAL):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._version_source = version_source
+        self._check_interval = check_interval
+        self._last_check = 0.0
+        self.version = version_source() if version_source else None
+        self.reloads = 0
+
+    def register(self, name, loader):
+        """loader() mengembalikan objek model, atau None jika model tidak tersedia."""
+        with self._lock:
+            self._entries[name] = _Entry(loader)
+
+    def refresh(self, force=False):
+        """Memeriksa versi aktif; jika berubah, model dimuat ulang saat dipakai berikutnya."""
+        if self._version_source is None:
+            return False
+        now = time.monotonic()
+        if not force and now - self._last_check < self._check_interval:
+            return False
+        self._last_check = now
+        try:
+            version = self._version_source()
+        except Exception as e:
+            print(f"WARNING: Gagal membaca versi model aktif: {e}")
+            return False
+        if version == self.version:
+            return False
+        with self._lock:
+            if version == self.version:
+                return False
+            self._entries = {name: _Entry(entry.loader) for name, entry in self._entries.items()}
+            print(f"INFO: Versi model aktif berubah {self.version!r} -> {version!r}, model akan dimuat ulang.")
+            self.version = version
+            self.reloads += 1
+        return True
+
+    def needs_load(self, name):
+        """True jika get(name) berikutnya akan menjalankan loader (belum dimuat untuk versi aktif)."""
+        self.refresh()
+        entry = self._entries.get(name)
+        return entry is not None and not entry.loaded
+
+    def get(self, name):
+        """Objek hasil loader, atau None jika model gagal dimuat / tidak tersedia."""
+        self.refresh()
+        entry = self._entries[name]
+        if entry.loaded:
+            return entry.value
+        with entry.lock:
+            if not entry.loaded:
+                self._load(name, entry)
+        return entry.value
+
+    def _load(self, name, entry):
+        entry.version = self.version
+        rss_before = _current_rss_bytes()
+        started = time.perf_counter()
+        try:
+            entry.value = entry.loader()
+        except Exception as e:
+            entry.value = None
+            entry.error = str(e)
+            print(f"ERROR: Gagal memuat model '{name}': {e}")
+        entry.load_time = time.perf_counter() - started
+        rss_after = _current_rss_bytes()
+        entry.rss_delta = rss_after - rss_before if rss_before is not None and rss_after is not None else None
+        entry.loaded_at = time.time()
+        entry.loaded = True
+        memory = f" (+{entry.rss_delta / (1024 * 1024):.1f} MB RSS)" if entry.rss_delta is not None else ""
+        print(f"INFO: Model '{name}' dimuat dalam {entry.load_time:.3f} detik{memory}.")
+
+    def warmup(self, names=None):
+        """Memuat model yang disebut (semua jika None) sebelum request pertama."""
+        for name in (names if names is not None else list(self._entries)):
+            if name not in self._entries:
+                print(f"WARNING: Model '{name}' untuk warmup tidak terdaftar.")
+                continue
+            self.get(name)
+
+    def stats(self):
+        data = {}
+        for name, entry in list(self._entries.items()):
+            data[name] = {
+                "loaded": entry.loaded,
+                "available": entry.value is not None,
+                "error": entry.error,
+                "load_time": entry.load_time,
+                "rss_delta_bytes": entry.rss_delta,
+                "loaded_at": entry.loaded_at,
+                "version": entry.version,
+            }
+        return {
+            "active_version": self.version,
+            "reloads": self.reloads,
+            "models": data,
+            "rss_bytes": _current_rss_bytes(),
+            "peak_rss_bytes": _peak_rss_bytes(),
+        }
+
+
+model_registry = ModelRegistry(version_source=active_version)
+
+
+def warmup_from_env():
+    """Menjalankan warmup sesuai MODEL_WARMUP (dipanggil sekali dari app.py)."""
+    value = MODEL_WARMUP.strip()
+    if not value:
+        return
+    if value.lower() == 'all':
+        model_registry.warmup()
+    else:
+        model_registry.warmup([name.strip() for name in value.split(',') if name.strip()])
@@ -0,0 +1,234 @@
+"""
+Model store berversi.
+
+Tata letak:
+    <MODEL_STORE_DIR>/<versi>/manifest.json
+    <MODEL_STORE_DIR>/<versi>/<nama_model>.<array>.npy
+    <MODEL_STORE_DIR>/ACTIVE              (berisi nama versi yang aktif)
+
+Bobot disimpan sebagai file .npy terpisah lalu dibuka dengan mmap_mode='r',
+sehingga semua worker prefork berbagi halaman memori yang sama dari page cache
+OS. Pergantian versi hanya menulis ulang file ACTIVE dengan os.replace (atomik);
+setiap worker mendeteksinya dan memuat versi baru saat permintaan berikutnya.
+
+CLI (dijalankan dari folder backend):
+    python model_store.py publish <versi> [--activate]
+    python model_store.py activate <versi>
+    python model_store.py list
+"""
+import json
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+
+from models.forest_engine import FlatForest
+from models.lstm_engine import LSTMEngine, ArrayScaler
+
+MODEL_STORE_DIR = os.getenv(
+    'MODEL_STORE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models', 'store')
+)
+ACTIVE_FILE = 'ACTIVE'
+MANIFEST_FILE = 'manifest.json'
+
+# Jenis model yang bisa disimpan: kelas model untuk masing-masing
+MODEL_KINDS = {
+    'lstm': LSTMEngine,
+    'forest': FlatForest,
+}
+
+
+class ModelStoreError(Exception):
+    """Versi tidak ada, manifest rusak, atau file bobot hilang."""
+
+
+def _version_dir(version):
+    if not version or os.sep in version or version.startswith('.'):
+        raise ModelStoreError(f"Nama versi tidak valid: {version!r}")
+    return os.path.join(MODEL_STORE_DIR, version)
+
+
+def active_version():
+    """Nama versi aktif, atau None jika store belum dipakai."""
+    try:
+        with open(os.path.join(MODEL_STORE_DIR, ACTIVE_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def read_manifest(version):
+    path = os.path.join(_version_dir(version), MANIFEST_FILE)
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        raise ModelStoreError(f"Versi '{version}' tidak ditemukan di store")
+    except ValueError as e:
+        raise ModelStoreError(f"Manifest versi '{version}' rusak: {e}")
+
+
+def list_versions():
+    if not os.path.isdir(MODEL_STORE_DIR):
+        return []
+    active = active_version()
+    versions = []
+    for name in sorted(os.listdir(MODEL_STORE_DIR)):
+        if not os.path.isfile(os.path.join(MODEL_STORE_DIR, name, MANIFEST_FILE)):
+            continue
+        manifest = read_manifest(name)
+        versions.append({
+            "version": name,
+            "created_at": manifest.get("created_at"),
+            "models": sorted(manifest.get("models", {})),
+            "active": name == active,
+        })
+    return versions
+
+
+def _validate(version):
+    """Memastikan manifest terbaca dan semua file bobot ada sebelum versi diaktifkan."""
+    manifest = read_manifest(version)
+    directory = _version_dir(version)
+    for name, entry in manifest.get("models", {}).items():
+        if entry.get("kind") not in MODEL_KINDS:
+            raise ModelStoreError(f"Jenis model '{entry.get('kind')}' untuk '{name}' tidak dikenal")
+        files = list(entry["arrays"].values()) + list(entry["scaler"].values())
+        for filename in files:
+            if not os.path.isfile(os.path.join(directory, filename)):
+                raise ModelStoreError(f"File bobot '{filename}' tidak ada di versi '{version}'")
+    return manifest
+
+
+def activate(version):
+    """Menjadikan versi aktif secara atomik (tulis file sementara lalu os.replace)."""
+    _validate(version)
+    tmp_path = os.path.join(MODEL_STORE_DIR, f".{ACTIVE_FILE}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w') as f:
+        f.write(version + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, os.path.join(MODEL_STORE_DIR, ACTIVE_FILE))
+    print(f"SUCCESS: Versi model '{version}' diaktifkan.")
+
+
+def publish(version, models):
+    """
+    Menulis versi baru. models: {nama: (kind, model, scaler)}.
+    Versi ditulis ke direktori sementara lalu di-rename, jadi tidak pernah terlihat setengah jadi.
+    """
+    final_dir = _version_dir(version)
+    if os.path.exists(final_dir):
+        raise ModelStoreError(f"Versi '{version}' sudah ada; versi bersifat immutable")
+    tmp_dir = os.path.join(MODEL_STORE_DIR, f".{version}.tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    manifest = {"version": version, "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "models": {}}
+    for name, (kind, model, scaler) in models.items():
+        if kind == 'lstm':
+            spec, arrays = model.to_arrays()
+        else:
+            spec, arrays = {}, model.to_arrays()
+        entry = {"kind": kind, "spec": spec, "arrays": {}, "scaler": {}}
+        for section, values in (("arrays", arrays), ("scaler", scaler.to_arrays())):
+            for key, value in values.items():
+                filename = f"{name}.{section}.{key}.npy"
+                np.save(os.path.join(tmp_dir, filename), np.asarray(value, order="C"), allow_pickle=False)
+                entry[section][key] = filename
+        manifest["models"][name] = entry
+
+    with open(os.path.join(tmp_dir, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.rename(tmp_dir, final_dir)
+    print(f"SUCCESS: Versi model '{version}' ditulis ke {final_dir}")
+    return manifest
+
+
+def _open_arrays(directory, files):
+    # np.asarray melepas subclass memmap tetapi tetap memakai buffer yang sama
+    return {
+        key: np.asarray(np.load(os.path.join(directory, filename), mmap_mode='r', allow_pickle=False))
+        for key, filename in files.items()
+    }
+
+
+def load_model(name, version=None):
+    """
+    Memuat (model, scaler) dari versi aktif (atau versi yang diminta).
+    Mengembalikan None jika store belum aktif atau versi tidak memuat model ini.
+    """
+    version = version or active_version()
+    if version is None:
+        return None
+    manifest = read_manifest(version)
+    entry = manifest.get("models", {}).get(name)
+    if entry is None:
+        return None
+
+    directory = _version_dir(version)
+    arrays = _open_arrays(directory, entry["arrays"])
+    scaler = ArrayScaler.from_arrays(_open_arrays(directory, entry["scaler"]))
+    if entry["kind"] == 'lstm':
+        model = LSTMEngine.from_arrays(entry["spec"], arrays)
+    elif entry["kind"] == 'forest':
+        model = FlatForest.from_arrays(arrays)
+    else:
+        raise ModelStoreError(f"Jenis model '{entry['kind']}' untuk '{name}' tidak dikenal")
+    print(f"SUCCESS: Model '{name}' dimuat dari store versi '{version}'.")
+    return model, scaler
+
+
+def _publish_current(version):
+    """Mengemas file model yang sekarang ada di folder models/ menjadi satu versi store."""
+    from routes.lstm_predict_routes import _load_lstm
+    from routes.ml_routes import _load_risk_model
+
+    models = {}
+    lstm = _load_lstm(use_store=False)
+    if lstm is not None:
+        if not isinstance(lstm[0], LSTMEngine):
+            raise ModelStoreError("Model LSTM harus bisa dimuat oleh LSTMEngine untuk disimpan di store")
+        models['lstm_glucose_trend'] = ('lstm', lstm[0], _as_array_scaler(lstm[1]))
+    risk = _load_risk_model(use_store=False)
+    if risk is not None:
+        if not isinstance(risk[0], FlatForest):
+            raise ModelStoreError("Model risiko harus bisa diratakan menjadi FlatForest untuk disimpan di store")
+        models['risk_rf'] = ('forest', risk[0], _as_array_scaler(risk[1]))
+    if not models:
+        raise ModelStoreError("Tidak ada model yang bisa dikemas")
+    return publish(version, models)
+
+
+def _as_array_scaler(scaler):
+    if isinstance(scaler, ArrayScaler):
+        return scaler
+    # StandardScaler (sklearn) dari scaler.joblib
+    return ArrayScaler(
+        scaler.mean_ if getattr(scaler, 'with_mean', True) else 0.0,
+        scaler.scale_ if getattr(scaler, 'with_std', True) else 1.0
+    )
+
+
+if __name__ == '__main__':
+    command = sys.argv[1] if len(sys.argv) > 1 else 'list'
+    try:
+        if command == 'publish' and len(sys.argv) > 2:
+            _publish_current(sys.argv[2])
+            if '--activate' in sys.argv[3:]:
+                activate(sys.argv[2])
+        elif command == 'activate' and len(sys.argv) > 2:
+            activate(sys.argv[2])
+        elif command == 'list':
+            for item in list_versions():
+                marker = '*' if item['active'] else ' '
+                print(f"{marker} {item['version']:<24} {item['created_at']}  {', '.join(item['models'])}")
+        else:
+            print("Penggunaan: python model_store.py [publish <versi> [--activate] | activate <versi> | list]")
+            sys.exit(1)
+    except ModelStoreError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
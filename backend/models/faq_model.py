@@ -1,19 +1,32 @@
-def get_all_faqs_model(conn):
-    """Mengambil semua data dari tabel faq."""
-    cursor = conn.cursor(dictionary=True)
-    query = "SELECT * FROM faq ORDER BY id DESC"
-    cursor.execute(query)
-    faqs = cursor.fetchall()
-    cursor.close()
-    return faqs
+from cache import cache
+from conditional import versioned_key
+from models.version_model import bump_versions_model
+
+FAQ_CACHE_KEY = "faq:all"
+
+def get_all_faqs_model(conn, versions):
+    """
+    Mengambil semua data dari tabel faq (read-through cache).
+    Key cache memuat versi 'faq' dari snapshot yang sama dengan ETag, jadi
+    penulisan tidak perlu meng-invalidasi: versi baru otomatis memakai key baru.
+    """
+    def load():
+        cursor = conn.cursor(dictionary=True)
+        query = "SELECT * FROM faq ORDER BY id DESC"
+        cursor.execute(query)
+        faqs = cursor.fetchall()
+        cursor.close()
+        return faqs
+    return cache.read_through(versioned_key(FAQ_CACHE_KEY, versions, "faq"), load)
 
 def add_faq_model(conn, data):
     """Menambahkan data baru ke tabel faq."""
     cursor = conn.cursor()
     query = "INSERT INTO faq (judul, deskripsi) VALUES (%s, %s)"
     cursor.execute(query, (data['judul'], data['deskripsi']))
-    conn.commit()
     new_id = cursor.lastrowid
+    bump_versions_model(cursor, ["faq"])
+    conn.commit()
     cursor.close()
     return new_id
 
@@ -22,8 +35,10 @@ def update_faq_model(conn, faq_id, data):
     cursor = conn.cursor()
     query = "UPDATE faq SET judul = %s, deskripsi = %s WHERE id = %s"
     cursor.execute(query, (data['judul'], data['deskripsi'], faq_id))
-    conn.commit()
     affected_rows = cursor.rowcount
+    if affected_rows:
+        bump_versions_model(cursor, ["faq"])
+    conn.commit()
     cursor.close()
     return affected_rows
 
@@ -32,7 +47,9 @@ def delete_faq_model(conn, faq_id):
     cursor = conn.cursor()
     query = "DELETE FROM faq WHERE id = %s"
     cursor.execute(query, (faq_id,))
-    conn.commit()
     affected_rows = cursor.rowcount
+    if affected_rows:
+        bump_versions_model(cursor, ["faq"])
+    conn.commit()
     cursor.close()
     return affected_rows
\ No newline at end of file
@@ -0,0 +1,209 @@
+# File: models/forest_engine.py
+#
+# Evaluator random forest berbasis array datar (flat) NumPy.
+# Seluruh pohon di best_rf_model.pkl diratakan menjadi array node yang
+# kontigu, lalu ditelusuri sekaligus untuk semua baris dan semua pohon.
+# Hasil predict / predict_proba identik dengan sklearn.
+
+import numpy as np
+
+TREE_LEAF = -1
+# Jumlah baris yang ditelusuri per langkah agar memori (baris x pohon) tetap kecil
+ROW_CHUNK = 4096
+
+
+class FlatForest:
+    """Random forest klasifikasi dalam bentuk array node datar."""
+
+    def __init__(self, feature, threshold, left, right, missing_left, leaf_proba,
+                 roots, classes, max_depth):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.missing_left = missing_left
+        self.leaf_proba = leaf_proba
+        self.roots = roots
+        self.classes_ = classes
+        self.max_depth = int(max_depth)
+        self.is_leaf = left == np.arange(len(left))
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """Meratakan RandomForestClassifier (single output) menjadi array node."""
+        if getattr(model, 'n_outputs_', 1) != 1:
+            raise ValueError("FlatForest hanya mendukung klasifikasi single output")
+
+        features, thresholds, lefts, rights, missing, probas, roots = [], [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            node_ids = np.arange(n_nodes) + offset
+            is_leaf = tree.children_left == TREE_LEAF
+
+            # Daun menunjuk ke dirinya sendiri sebagai penanda
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold).astype(np.float64))
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left + offset).astype(np.int32))
+            rights.append(np.where(is_leaf, node_ids, tree.children_right + offset).astype(np.int32))
+            if hasattr(tree, 'missing_go_to_left'):
+                missing.append(np.asarray(tree.missing_go_to_left, dtype=bool))
+            else:
+                missing.append(np.zeros(n_nodes, dtype=bool))
+
+            # Normalisasi sama persis dengan DecisionTreeClassifier.predict_proba
+            value = np.array(tree.value[:, 0, :], dtype=np.float64)
+            normalizer = value.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            probas.append(value / normalizer)
+
+            roots.append(offset)
+            offset += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts),
+            right=np.concatenate(rights),
+            missing_left=np.concatenate(missing),
+            leaf_proba=np.concatenate(probas),
+            roots=np.asarray(roots, dtype=np.int32),
+            classes=np.asarray(model.classes_),
+            max_depth=max_depth,
+        )
+
+    def to_arrays(self):
+        """Seluruh array node per nama (dipakai oleh save() dan model store)."""
+        return {
+            "feature": self.feature,
+            "threshold": self.threshold,
+            "left": self.left,
+            "right": self.right,
+            "missing_left": self.missing_left,
+            "leaf_proba": self.leaf_proba,
+            "roots": self.roots,
+            "classes": self.classes_,
+            "max_depth": np.asarray(self.max_depth),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """Kebalikan to_arrays(); arrays boleh berupa array memory-mapped."""
+        return cls(
+            feature=arrays['feature'],
+            threshold=arrays['threshold'],
+            left=arrays['left'],
+            right=arrays['right'],
+            missing_left=arrays['missing_left'],
+            leaf_proba=arrays['leaf_proba'],
+            roots=arrays['roots'],
+            classes=arrays['classes'],
+            max_depth=int(arrays['max_depth']),
+        )
+
+    def save(self, path):
+        """Menyimpan array node ke file .npz."""
+        np.savez(path, **self.to_arrays())
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls.from_arrays({key: data[key] for key in data.files})
+
+    def apply(self, X):
+        """Indeks node daun (global) untuk setiap baris dan pohon, bentuk (n, n_trees)."""
+        # sklearn mengevaluasi pohon dengan X float32, jadi kita lakukan hal yang sama
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        n_rows, n_features = X.shape
+        values_flat = X.ravel()
+
+        # Pasangan (baris, pohon) disimpan datar; hanya yang belum sampai daun
+        # yang ikut dievaluasi pada langkah berikutnya.
+        nodes = np.tile(self.roots, n_rows)
+        row_base = np.repeat(np.arange(n_rows, dtype=np.int64) * n_features, self.n_trees)
+        active = np.flatnonzero(~self.is_leaf[nodes])
+        while active.size:
+            current = nodes[active]
+            values = values_flat[row_base[active] + self.feature[current]]
+            go_left = values <= self.threshold[current]
+            go_left |= np.isnan(values) & self.missing_left[current]
+            following = np.where(go_left, self.left[current], self.right[current])
+            nodes[active] = following
+            active = active[~self.is_leaf[following]]
+        return nodes.reshape(n_rows, self.n_trees)
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+
+        proba = np.zeros((X.shape[0], self.leaf_proba.shape[1]), dtype=np.float64)
+        for start in range(0, X.shape[0], ROW_CHUNK):
+            leaves = self.apply(X[start:start + ROW_CHUNK])
+            chunk = proba[start:start + ROW_CHUNK]
+            # Dijumlahkan berurutan per pohon seperti RandomForestClassifier
+            for t in range(self.n_trees):
+                chunk += self.leaf_proba[leaves[:, t]]
+        proba /= self.n_trees
+        return proba
+
+    def predict(self, X):
+        proba = self.predict_proba(X)
+        return self.classes_.take(np.argmax(proba, axis=1), axis=0)
+
+
+def verify_against_sklearn(model, n_samples=5000, seed=0):
+    """
+    Membandingkan FlatForest dengan sklearn pada set uji regresi:
+    data acak ditambah baris yang nilainya tepat berada di threshold node.
+    Melempar AssertionError jika ada satu pun hasil yang berbeda.
+    """
+    flat = FlatForest.from_sklearn(model)
+    n_features = model.n_features_in_
+    rng = np.random.default_rng(seed)
+
+    X = rng.normal(scale=2.0, size=(n_samples, n_features))
+    # Baris tepat di threshold menguji perbandingan float32 vs float64
+    split_nodes = flat.threshold[np.isfinite(flat.threshold)]
+    split_features = flat.feature[np.isfinite(flat.threshold)]
+    if len(split_nodes):
+        picks = rng.integers(0, len(split_nodes), size=n_samples)
+        edge = rng.normal(scale=2.0, size=(n_samples, n_features))
+        edge[np.arange(n_samples), split_features[picks]] = split_nodes[picks]
+        X = np.vstack([X, edge])
+
+    expected_proba = model.predict_proba(X)
+    actual_proba = flat.predict_proba(X)
+    assert np.array_equal(expected_proba, actual_proba), "predict_proba FlatForest berbeda dengan sklearn"
+    assert np.array_equal(model.predict(X), flat.predict(X)), "predict FlatForest berbeda dengan sklearn"
+    return len(X)
+
+
+if __name__ == '__main__':
+    import os
+    import sys
+    import joblib
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    pkl_path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(base_dir, 'best_rf_model.pkl')
+    npz_path = sys.argv[3] if len(sys.argv) > 3 else os.path.join(base_dir, 'best_rf_model.npz')
+    command = sys.argv[1] if len(sys.argv) > 1 else 'export'
+
+    if command != 'export':
+        # Kesetaraan numerik dengan sklearn diuji di tests/test_forest_engine.py
+        print("Penggunaan: python -m models.forest_engine export [model.pkl] [output.npz]")
+        sys.exit(1)
+    rf_model = joblib.load(pkl_path)
+    # Model produksi tetap dicek sebelum diekspor
+    verify_against_sklearn(rf_model)
+    FlatForest.from_sklearn(rf_model).save(npz_path)
+    print(f"SUCCESS: Forest diekspor ke {npz_path}")
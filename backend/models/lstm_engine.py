@@ -0,0 +1,290 @@
+# File: models/lstm_engine.py
+#
+# Mesin inferensi LSTM ringan berbasis NumPy.
+# Bobot dibaca langsung dari file .h5 Keras dengan h5py, sehingga server
+# tidak perlu mengimpor TensorFlow hanya untuk memprediksi tensor 1x3x1.
+
+import json
+import numpy as np
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+def _linear(x):
+    return x
+
+def _relu(x):
+    return np.maximum(x, 0)
+
+ACTIVATIONS = {
+    'sigmoid': _sigmoid,
+    'tanh': np.tanh,
+    'relu': _relu,
+    'linear': _linear,
+    None: _linear,
+}
+
+# Nama aktivasi untuk serialisasi ke model store
+ACTIVATION_NAMES = {fn: name for name, fn in ACTIVATIONS.items() if name is not None}
+
+def _activation(name):
+    if name not in ACTIVATIONS:
+        raise ValueError(f"Aktivasi '{name}' belum didukung oleh LSTMEngine")
+    return ACTIVATIONS[name]
+
+
+class ArrayScaler:
+    """
+    Pengganti StandardScaler yang cukup menyimpan mean dan scale.
+    Dipakai saat scaler.joblib tidak ada, agar tidak perlu mengimpor sklearn.
+    """
+
+    def __init__(self, mean, scale):
+        self.mean_ = np.asarray(mean, dtype=np.float64)
+        self.scale_ = np.asarray(scale, dtype=np.float64)
+
+    def to_arrays(self):
+        return {"mean": self.mean_, "scale": self.scale_}
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        return cls(arrays["mean"], arrays["scale"])
+
+    @classmethod
+    def fit(cls, values):
+        values = np.asarray(values, dtype=np.float64)
+        scale = values.std(axis=0)
+        scale[scale == 0] = 1.0
+        return cls(values.mean(axis=0), scale)
+
+    def transform(self, X):
+        return (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+
+    def inverse_transform(self, X):
+        return np.asarray(X, dtype=np.float64) * self.scale_ + self.mean_
+
+
+def _read_layer_weights(weights_group, layer_name):
+    """Mengumpulkan dataset bobot sebuah layer, dengan nama tanpa akhiran ':0'."""
+    weights = {}
+    if layer_name not in weights_group:
+        return weights
+
+    def visit(name, obj):
+        if hasattr(obj, 'shape'):
+            key = name.split('/')[-1].split(':')[0]
+            weights[key] = np.array(obj, dtype=np.float32)
+
+    weights_group[layer_name].visititems(visit)
+    return weights
+
+
+class LSTMEngine:
+    """
+    Forward pass model Sequential (LSTM, BatchNormalization, Dropout, Dense)
+    yang divektorkan untuk satu batch jendela sekaligus.
+    """
+
+    def __init__(self, layers, input_shape):
+        self.layers = layers
+        self.input_shape = input_shape
+
+    @classmethod
+    def from_h5(cls, path):
+        import h5py
+
+        with h5py.File(path, 'r') as f:
+            config = f.attrs['model_config']
+            if isinstance(config, bytes):
+                config = config.decode('utf-8')
+            config = json.loads(config)
+            if config.get('class_name') != 'Sequential':
+                raise ValueError("LSTMEngine hanya mendukung model Sequential")
+
+            weights_group = f['model_weights']
+            layers = []
+            input_shape = None
+            for layer in config['config']['layers']:
+                kind = layer['class_name']
+                cfg = layer['config']
+                if kind == 'InputLayer':
+                    shape = cfg.get('batch_shape') or cfg.get('batch_input_shape')
+                    input_shape = tuple(shape[1:])
+                    continue
+                if kind == 'Dropout':
+                    # Dropout tidak aktif saat inferensi
+                    continue
+
+                w = _read_layer_weights(weights_group, cfg['name'])
+                if kind == 'LSTM':
+                    if cfg.get('go_backwards') or cfg.get('stateful'):
+                        raise ValueError("LSTM go_backwards/stateful belum didukung")
+                    bias = w['bias'] if cfg.get('use_bias', True) else np.zeros(w['kernel'].shape[1], np.float32)
+                    layers.append(('lstm', {
+                        'kernel': w['kernel'],
+                        'recurrent_kernel': w['recurrent_kernel'],
+                        'bias': bias,
+                        'units': cfg['units'],
+                        'activation': _activation(cfg.get('activation', 'tanh')),
+                        'recurrent_activation': _activation(cfg.get('recurrent_activation', 'sigmoid')),
+                        'return_sequences': cfg.get('return_sequences', False),
+                    }))
+                elif kind == 'BatchNormalization':
+                    gamma = w['gamma'] if cfg.get('scale', True) else 1.0
+                    beta = w['beta'] if cfg.get('center', True) else 0.0
+                    # Normalisasi inferensi dilipat menjadi satu perkalian dan penjumlahan
+                    scale = gamma / np.sqrt(w['moving_variance'] + cfg.get('epsilon', 1e-3))
+                    offset = beta - w['moving_mean'] * scale
+                    layers.append(('batchnorm', {
+                        'scale': scale.astype(np.float32),
+                        'offset': np.asarray(offset, dtype=np.float32),
+                    }))
+                elif kind == 'Dense':
+                    bias = w['bias'] if cfg.get('use_bias', True) else 0.0
+                    layers.append(('dense', {
+                        'kernel': w['kernel'],
+                        'bias': bias,
+                        'activation': _activation(cfg.get('activation', 'linear')),
+                    }))
+                else:
+                    raise ValueError(f"Layer '{kind}' belum didukung oleh LSTMEngine")
+
+        return cls(layers, input_shape)
+
+    def to_arrays(self):
+        """
+        Memisahkan model menjadi (spec, arrays): spec berisi struktur layer yang
+        bisa ditulis ke JSON, arrays berisi bobot per nama untuk disimpan sebagai .npy.
+        """
+        spec_layers = []
+        arrays = {}
+        for index, (kind, params) in enumerate(self.layers):
+            layer = {"kind": kind, "arrays": {}}
+            for key, value in params.items():
+                if callable(value):
+                    layer[key] = ACTIVATION_NAMES[value]
+                elif isinstance(value, np.ndarray):
+                    name = f"layer{index}_{key}"
+                    arrays[name] = value
+                    layer["arrays"][key] = name
+                elif isinstance(value, (bool, np.bool_)):
+                    layer[key] = bool(value)
+                else:
+                    layer[key] = float(value) if isinstance(value, (float, np.floating)) else value
+            spec_layers.append(layer)
+        spec = {"input_shape": list(self.input_shape) if self.input_shape else None, "layers": spec_layers}
+        return spec, arrays
+
+    @classmethod
+    def from_arrays(cls, spec, arrays):
+        """Kebalikan to_arrays(); arrays boleh berupa array memory-mapped."""
+        layers = []
+        for layer in spec["layers"]:
+            params = {}
+            for key, value in layer.items():
+                if key in ("kind", "arrays"):
+                    continue
+                if key in ("activation", "recurrent_activation"):
+                    params[key] = _activation(value)
+                else:
+                    params[key] = value
+            for key, name in layer["arrays"].items():
+                params[key] = arrays[name]
+            layers.append((layer["kind"], params))
+        input_shape = tuple(spec["input_shape"]) if spec.get("input_shape") else None
+        return cls(layers, input_shape)
+
+    def _lstm_cell(self, params, x_proj, h, c):
+        """Satu timestep LSTM; x_proj = x_t @ kernel + bias. Urutan gate Keras: i, f, c, o."""
+        units = params['units']
+        act = params['activation']
+        rec_act = params['recurrent_activation']
+        z = x_proj + h @ params['recurrent_kernel']
+        i = rec_act(z[:, :units])
+        f = rec_act(z[:, units:2 * units])
+        g = act(z[:, 2 * units:3 * units])
+        o = rec_act(z[:, 3 * units:])
+        c = f * c + i * g
+        h = o * act(c)
+        return h, c
+
+    def _lstm(self, params, x):
+        """Menjalankan satu layer LSTM untuk seluruh batch."""
+        units = params['units']
+        n, timesteps, _ = x.shape
+
+        # Proyeksi input untuk semua timestep dihitung sekaligus
+        xz = x @ params['kernel'] + params['bias']
+        h = np.zeros((n, units), dtype=np.float32)
+        c = np.zeros((n, units), dtype=np.float32)
+        outputs = []
+        for t in range(timesteps):
+            h, c = self._lstm_cell(params, xz[:, t], h, c)
+            if params['return_sequences']:
+                outputs.append(h)
+
+        if params['return_sequences']:
+            return np.stack(outputs, axis=1)
+        return h
+
+    def _streaming_split(self):
+        """
+        Memisahkan layer menjadi (body, head): body dijalankan per timestep sampai
+        LSTM terakhir, head (BatchNorm/Dense setelahnya) hanya dipakai di akhir jendela.
+        """
+        lstm_indices = [i for i, (kind, _) in enumerate(self.layers) if kind == 'lstm']
+        if not lstm_indices:
+            raise ValueError("Model tidak memiliki layer LSTM")
+        last = lstm_indices[-1]
+        for kind, params in self.layers[:last]:
+            if kind == 'lstm' and not params['return_sequences']:
+                raise ValueError("LSTM sebelum layer terakhir harus return_sequences untuk mode streaming")
+        return self.layers[:last + 1], self.layers[last + 1:]
+
+    def state_units(self):
+        """Jumlah unit tiap layer LSTM yang state-nya perlu disimpan saat streaming."""
+        body, _ = self._streaming_split()
+        return [params['units'] for kind, params in body if kind == 'lstm']
+
+    def step(self, states, x_t):
+        """
+        Memajukan state satu timestep. states: list (h, c) per layer LSTM, x_t: (n, fitur).
+        Mengembalikan (states baru, output LSTM terakhir).
+        """
+        body, _ = self._streaming_split()
+        out = np.asarray(x_t, dtype=np.float32)
+        new_states = []
+        for kind, params in body:
+            if kind == 'lstm':
+                h, c = states[len(new_states)]
+                h, c = self._lstm_cell(params, out @ params['kernel'] + params['bias'], h, c)
+                new_states.append((h, c))
+                out = h
+            elif kind == 'batchnorm':
+                out = out * params['scale'] + params['offset']
+            elif kind == 'dense':
+                out = params['activation'](out @ params['kernel'] + params['bias'])
+        return new_states, out
+
+    def head(self, out):
+        """Layer setelah LSTM terakhir, diterapkan pada output step() di akhir jendela."""
+        _, head = self._streaming_split()
+        for kind, params in head:
+            if kind == 'batchnorm':
+                out = out * params['scale'] + params['offset']
+            elif kind == 'dense':
+                out = params['activation'](out @ params['kernel'] + params['bias'])
+        return out
+
+    def predict(self, X, **kwargs):
+        """Sama seperti model.predict Keras: X berbentuk (batch, timesteps, fitur)."""
+        out = np.asarray(X, dtype=np.float32)
+        for kind, params in self.layers:
+            if kind == 'lstm':
+                out = self._lstm(params, out)
+            elif kind == 'batchnorm':
+                out = out * params['scale'] + params['offset']
+            elif kind == 'dense':
+                out = params['activation'](out @ params['kernel'] + params['bias'])
+        return out
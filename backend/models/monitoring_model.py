@@ -1,4 +1,8 @@
-from datetime import datetime
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from monitoring_archive import merge_archived, monitoring_archive
 
 def add_monitoring_record_model(cursor, user_id, glucose, heart_rate):
     """Menyimpan sebuah catatan baru ke tabel monitoring."""
@@ -10,6 +14,52 @@ def add_monitoring_record_model(cursor, user_id, glucose, heart_rate):
     cursor.execute(query, (user_id, glucose, heart_rate, timestamp))
     return cursor.lastrowid
 
+def add_monitoring_records_model(cursor, records):
+    """
+    Menyimpan banyak catatan sekaligus dengan executemany.
+    records berisi tuple (user_id, glucose, heart_rate, timestamp).
+    """
+    query = """
+        INSERT INTO monitoring (user_id, glucose_level, heart_rate, timestamp) 
+        VALUES (%s, %s, %s, %s)
+    """
+    cursor.executemany(query, records)
+    return cursor.rowcount
+
+def get_existing_timestamps_model(cursor, user_id, start, end):
+    """
+    Timestamp pembacaan seorang pasien dalam [start, end] (tabel panas dan
+    arsip), sebagai ndarray int64 detik; dipakai untuk deduplikasi impor massal.
+    """
+    cursor.execute(
+        "SELECT timestamp FROM monitoring WHERE user_id = %s AND timestamp >= %s AND timestamp <= %s",
+        (user_id, start, end)
+    )
+    timestamps = [row[0] for row in cursor.fetchall()]
+    archived = monitoring_archive.read(user_id=user_id, start=start, end=end + timedelta(seconds=1), with_user=False)
+    timestamps.extend(row["timestamp"] for row in archived)
+    return np.asarray(timestamps, dtype='datetime64[s]').astype(np.int64)
+
+def get_latest_readings_model(cursor, user_id, count):
+    """
+    Mengambil `count` pembacaan terbaru seorang pasien, urut dari yang terlama.
+    Memakai indeks (user_id, timestamp, id) sehingga hanya `count` baris yang dibaca.
+    """
+    query = """
+        SELECT id, glucose_level, heart_rate, timestamp
+        FROM monitoring
+        WHERE user_id = %s
+        ORDER BY timestamp DESC, id DESC
+        LIMIT %s
+    """
+    cursor.execute(query, (user_id, count))
+    rows = cursor.fetchall()
+    if len(rows) < count:
+        # Pasien yang lama tidak aktif: pembacaan terakhirnya mungkin sudah diarsipkan
+        rows = merge_archived(rows, count, user_id=user_id, with_user=False)
+    rows.reverse()
+    return rows
+
 def get_all_monitoring_model(cursor):
     """Mengambil semua riwayat monitoring untuk ditampilkan di tabel admin."""
     query = """
@@ -21,8 +71,129 @@ def get_all_monitoring_model(cursor):
     cursor.execute(query)
     return cursor.fetchall()
 
+def iter_monitoring_export_model(cursor, user_id=None, start=None, end=None, batch_size=5000):
+    """
+    Baris ekspor (id, user_id, namaPasien, glucose_level, heart_rate, timestamp)
+    per batch dari cursor biasa (tuple): isi arsip lebih dulu, lalu tabel panas urut naik (timestamp, id).
+    Tabel panas dibaca dengan cursor unbuffered (fetchmany), jadi memori tidak
+    bergantung pada jumlah baris; koneksi tidak bisa dipakai query lain sampai
+    hasilnya habis dibaca.
+    """
+    for rows in monitoring_archive.iter_export(user_id=user_id, start=start, end=end, batch_size=batch_size):
+        # Nama pasien untuk baris arsip; baris milik user yang sudah dihapus dibuang (seperti JOIN)
+        user_ids = sorted({row[1] for row in rows})
+        placeholders = ", ".join(["%s"] * len(user_ids))
+        cursor.execute(f"SELECT id, name FROM users WHERE id IN ({placeholders})", tuple(user_ids))
+        names = dict(cursor.fetchall())
+        rows = [(row[0], row[1], names[row[1]]) + row[2:] for row in rows if row[1] in names]
+        if rows:
+            yield rows
+
+    conditions = []
+    params = []
+    if user_id is not None:
+        conditions.append("m.user_id = %s")
+        params.append(user_id)
+    if start is not None:
+        conditions.append("m.timestamp >= %s")
+        params.append(start)
+    if end is not None:
+        conditions.append("m.timestamp < %s")
+        params.append(end)
+
+    query = """
+        SELECT m.id, m.user_id, u.name, m.glucose_level, m.heart_rate, m.timestamp
+        FROM monitoring m
+        JOIN users u ON m.user_id = u.id
+    """
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY m.timestamp, m.id"
+
+    cursor.execute(query, tuple(params))
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield rows
+
 def delete_monitoring_model(cursor, monitoring_id):
     """Menghapus sebuah catatan monitoring berdasarkan ID-nya."""
     query = "DELETE FROM monitoring WHERE id = %s"
     cursor.execute(query, (monitoring_id,))
-    return cursor.rowcount
\ No newline at end of file
+    return cursor.rowcount
+
+def get_monitoring_page_model(cursor, user_id=None, start=None, end=None,
+                              min_glucose=None, max_glucose=None,
+                              after=None, limit=None, with_name=False):
+    """
+    Mengambil riwayat monitoring dengan keyset pagination pada (timestamp, id).
+    'after' adalah pasangan (timestamp, id) dari baris terakhir halaman sebelumnya.
+    Filter tanggal dan rentang glukosa dijalankan langsung di SQL.
+    """
+    conditions = []
+    params = []
+
+    if user_id is not None:
+        conditions.append("m.user_id = %s")
+        params.append(user_id)
+    if start is not None:
+        conditions.append("m.timestamp >= %s")
+        params.append(start)
+    if end is not None:
+        conditions.append("m.timestamp < %s")
+        params.append(end)
+    if min_glucose is not None:
+        conditions.append("m.glucose_level >= %s")
+        params.append(min_glucose)
+    if max_glucose is not None:
+        conditions.append("m.glucose_level <= %s")
+        params.append(max_glucose)
+    if after is not None:
+        after_ts, after_id = after
+        conditions.append("(m.timestamp < %s OR (m.timestamp = %s AND m.id < %s))")
+        params.extend([after_ts, after_ts, after_id])
+
+    if with_name:
+        query = """
+            SELECT m.id, m.user_id, u.name AS namaPasien, m.heart_rate, m.glucose_level, m.timestamp
+            FROM monitoring m
+            JOIN users u ON m.user_id = u.id
+        """
+    else:
+        query = """
+            SELECT m.id, m.user_id, m.heart_rate, m.glucose_level, m.timestamp
+            FROM monitoring m
+        """
+
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY m.timestamp DESC, m.id DESC"
+    if limit is not None:
+        query += " LIMIT %s"
+        params.append(limit)
+
+    cursor.execute(query, tuple(params))
+    rows = cursor.fetchall()
+    merged = merge_archived(rows, limit, user_id=user_id, start=start, end=end,
+                            min_glucose=min_glucose, max_glucose=max_glucose, after=after)
+    if with_name:
+        merged = _attach_names(cursor, merged)
+    return merged
+
+def _attach_names(cursor, rows):
+    """Menambahkan namaPasien ke baris arsip; baris milik user yang sudah dihapus dibuang (seperti JOIN)."""
+    missing = {row['user_id'] for row in rows if 'namaPasien' not in row}
+    if not missing:
+        return rows
+    placeholders = ", ".join(["%s"] * len(missing))
+    cursor.execute(f"SELECT id, name FROM users WHERE id IN ({placeholders})", tuple(missing))
+    names = {row['id']: row['name'] for row in cursor.fetchall()}
+    result = []
+    for row in rows:
+        if 'namaPasien' not in row:
+            if row['user_id'] not in names:
+                continue
+            row['namaPasien'] = names[row['user_id']]
+        result.append(row)
+    return result
@@ -0,0 +1,88 @@
+# File: models/partition_model.py
+#
+# Partisi bulanan tabel monitoring (RANGE COLUMNS pada timestamp).
+# Partisi bernama pYYYYMM dengan batas atas awal bulan berikutnya, ditambah
+# p_future (MAXVALUE) yang selalu menjadi partisi terakhir.
+
+from datetime import datetime
+
+FUTURE_PARTITION = "p_future"
+
+
+def month_start(value):
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+def add_months(value, months):
+    index = value.year * 12 + value.month - 1 + months
+    return value.replace(year=index // 12, month=index % 12 + 1)
+
+def partition_name(month):
+    """Nama partisi untuk bulan yang dimulai pada `month`."""
+    return f"p{month:%Y%m}"
+
+def partition_month(name):
+    return datetime.strptime(name[1:], "%Y%m")
+
+
+def get_partitions_model(cursor):
+    """
+    Daftar (nama, batas_atas) partisi monitoring sesuai urutan; batas_atas None
+    untuk MAXVALUE. List kosong berarti tabel belum dipartisi.
+    """
+    cursor.execute("""
+        SELECT PARTITION_NAME, PARTITION_DESCRIPTION
+        FROM INFORMATION_SCHEMA.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'monitoring' AND PARTITION_NAME IS NOT NULL
+        ORDER BY PARTITION_ORDINAL_POSITION
+    """)
+    partitions = []
+    for name, description in cursor.fetchall():
+        if description == "MAXVALUE":
+            partitions.append((name, None))
+        else:
+            partitions.append((name, datetime.fromisoformat(description.strip("'"))))
+    return partitions
+
+
+def get_oldest_timestamp_model(cursor):
+    cursor.execute("SELECT MIN(timestamp) FROM monitoring")
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def add_month_partitions_model(cursor, months):
+    """Memecah p_future menjadi partisi bulanan untuk `months` (urut naik, setelah partisi bulanan terakhir)."""
+    if not months:
+        return
+    parts = ", ".join(
+        f"PARTITION {partition_name(month)} VALUES LESS THAN ('{add_months(month, 1):%Y-%m-%d %H:%M:%S}')"
+        for month in months
+    )
+    cursor.execute(
+        f"ALTER TABLE monitoring REORGANIZE PARTITION {FUTURE_PARTITION} INTO "
+        f"({parts}, PARTITION {FUTURE_PARTITION} VALUES LESS THAN (MAXVALUE))"
+    )
+
+
+def iter_partition_rows_model(cursor, name, batch_size=50000):
+    """Baris (id, user_id, glucose_level, heart_rate, timestamp) satu partisi, per batch."""
+    cursor.execute(
+        f"SELECT id, user_id, glucose_level, heart_rate, timestamp FROM monitoring PARTITION ({name}) "
+        "ORDER BY user_id, timestamp, id"
+    )
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield rows
+
+
+def get_partition_checksum_model(cursor, name):
+    """(jumlah baris, jumlah id) partisi; dipakai untuk memastikan arsip lengkap sebelum DROP."""
+    cursor.execute(f"SELECT COUNT(*), COALESCE(SUM(id), 0) FROM monitoring PARTITION ({name})")
+    count, id_sum = cursor.fetchone()
+    return int(count), int(id_sum)
+
+
+def drop_partition_model(cursor, name):
+    cursor.execute(f"ALTER TABLE monitoring DROP PARTITION {name}")
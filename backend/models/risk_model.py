@@ -0,0 +1,142 @@
+# File: models/risk_model.py
+#
+# Query untuk input risiko per pasien dan skor risiko prakomputasi populasi.
+
+import json
+from models.risk_scoring import INPUT_FIELDS
+
+_INPUT_COLUMNS = ", ".join(INPUT_FIELDS)
+
+
+def upsert_risk_inputs_model(cursor, user_id, row):
+    """Menyimpan input terakhir pasien (tuple hasil parse_record); updated_at menandai perubahan."""
+    placeholders = ", ".join(["%s"] * len(INPUT_FIELDS))
+    updates = ", ".join(f"{field} = VALUES({field})" for field in INPUT_FIELDS)
+    query = f"""
+        INSERT INTO patient_risk_inputs (user_id, {_INPUT_COLUMNS}, updated_at)
+        VALUES (%s, {placeholders}, NOW(6))
+        ON DUPLICATE KEY UPDATE {updates}, updated_at = NOW(6)
+    """
+    cursor.execute(query, (user_id, *row))
+
+
+def get_inputs_to_score_model(cursor, model_version, after_user_id, limit, full=False):
+    """
+    Input pasien (urut user_id, keyset) yang belum punya skor, inputnya berubah
+    sejak dinilai, atau dinilai oleh versi model lain. Input yang sudah ditandai
+    tidak valid dilewati sampai berubah. full=True mengambil semuanya.
+    """
+    query = f"""
+        SELECT i.user_id, {", ".join("i." + field for field in INPUT_FIELDS)}, i.updated_at, i.invalid_updated_at
+        FROM patient_risk_inputs i
+        LEFT JOIN risk_scores s ON s.user_id = i.user_id
+        WHERE i.user_id > %s
+    """
+    params = [after_user_id]
+    if not full:
+        query += """
+          AND (i.invalid_updated_at IS NULL OR i.invalid_updated_at <> i.updated_at)
+          AND (s.user_id IS NULL
+               OR s.inputs_updated_at <> i.updated_at
+               OR s.model_version <> %s)
+        """
+        params.append(model_version)
+    query += " ORDER BY i.user_id LIMIT %s"
+    params.append(limit)
+    cursor.execute(query, tuple(params))
+    return cursor.fetchall()
+
+
+def mark_risk_inputs_invalid_model(cursor, records):
+    """
+    Menandai input yang gagal divalidasi; records berisi (user_id, updated_at).
+    Hanya versi input yang dibaca yang ditandai, jadi input yang diperbarui
+    sementara itu tetap dinilai pada run berikutnya.
+    """
+    cursor.executemany(
+        "UPDATE patient_risk_inputs SET invalid_updated_at = updated_at WHERE user_id = %s AND updated_at = %s",
+        records
+    )
+
+
+def clear_risk_inputs_invalid_model(cursor, user_ids):
+    """Menghapus tanda tidak valid dari input yang kini lolos validasi (mis. setelah run full)."""
+    cursor.executemany(
+        "UPDATE patient_risk_inputs SET invalid_updated_at = NULL WHERE user_id = %s",
+        [(user_id,) for user_id in user_ids]
+    )
+
+
+def upsert_risk_scores_model(cursor, rows):
+    """
+    rows: tuple (user_id, prediction_code, probability, risk_factors, model_version, inputs_updated_at).
+    """
+    query = """
+        INSERT INTO risk_scores
+            (user_id, prediction_code, probability, risk_factors, model_version, inputs_updated_at, scored_at)
+        VALUES (%s, %s, %s, %s, %s, %s, NOW())
+        ON DUPLICATE KEY UPDATE
+            prediction_code = VALUES(prediction_code),
+            probability = VALUES(probability),
+            risk_factors = VALUES(risk_factors),
+            model_version = VALUES(model_version),
+            inputs_updated_at = VALUES(inputs_updated_at),
+            scored_at = VALUES(scored_at)
+    """
+    cursor.executemany(query, rows)
+    return cursor.rowcount
+
+
+def get_population_summary_model(cursor, bins=10, top=20):
+    """Ringkasan distribusi risiko populasi dari tabel risk_scores (tanpa inferensi)."""
+    cursor.execute("""
+        SELECT COUNT(*) AS total,
+               SUM(prediction_code = 1) AS high_risk,
+               AVG(probability) AS avg_probability,
+               MAX(scored_at) AS last_scored_at
+        FROM risk_scores
+    """)
+    summary = cursor.fetchone()
+
+    width = 100.0 / bins
+    cursor.execute(
+        """
+        SELECT LEAST(FLOOR(probability / %s), %s) AS bin, COUNT(*) AS count
+        FROM risk_scores
+        GROUP BY bin
+        ORDER BY bin
+        """,
+        (width, bins - 1)
+    )
+    counts = {int(row['bin']): int(row['count']) for row in cursor.fetchall()}
+    histogram = [
+        {"from": round(i * width, 2), "to": round((i + 1) * width, 2), "count": counts.get(i, 0)}
+        for i in range(bins)
+    ]
+
+    cursor.execute("SELECT model_version, COUNT(*) AS count FROM risk_scores GROUP BY model_version")
+    versions = {row['model_version']: int(row['count']) for row in cursor.fetchall()}
+
+    cursor.execute(
+        """
+        SELECT s.user_id, u.name AS namaPasien, s.probability, s.prediction_code, s.risk_factors, s.scored_at
+        FROM risk_scores s
+        JOIN users u ON u.id = s.user_id
+        ORDER BY s.probability DESC
+        LIMIT %s
+        """,
+        (top,)
+    )
+    highest = cursor.fetchall()
+    for row in highest:
+        row['risk_factors'] = json.loads(row['risk_factors'])
+
+    return {
+        "total": int(summary['total'] or 0),
+        "high_risk": int(summary['high_risk'] or 0),
+        "avg_probability": round(float(summary['avg_probability']), 2) if summary['avg_probability'] is not None else None,
+        "last_scored_at": summary['last_scored_at'],
+        "histogram": histogram,
+        "model_versions": versions,
+        "highest_risk": highest,
+    }
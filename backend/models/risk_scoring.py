@@ -0,0 +1,128 @@
+# File: models/risk_scoring.py
+#
+# Perhitungan fitur, prediksi, dan faktor risiko diabetes yang divektorkan,
+# dipakai oleh /api/ml/predict (satu pasien) maupun mode batch.
+
+import numpy as np
+
+from metrics import timed_stage
+
+# Field input dari klien beserta tipe konversinya (sama seperti endpoint lama)
+INT_FIELDS = ["gender", "age", "hypertension", "heart_disease", "smoking_history"]
+FLOAT_FIELDS = ["berat", "tinggi", "hba1c_level", "blood_glucose"]
+INPUT_FIELDS = INT_FIELDS + FLOAT_FIELDS
+
+
+def parse_record(record):
+    """
+    Mengubah satu record (dict) menjadi tuple nilai numerik.
+    Melempar KeyError jika field hilang, ValueError/TypeError jika tipe salah.
+    """
+    values = [int(record[field]) for field in INT_FIELDS]
+    values += [float(record[field]) for field in FLOAT_FIELDS]
+    return tuple(values)
+
+
+def build_features(rows):
+    """
+    Membangun matriks fitur (n, 8) dari tuple hasil parse_record.
+    Urutan kolom: gender, age, hypertension, heart_disease, smoking_history, bmi, hba1c, glucose.
+    """
+    data = np.asarray(rows, dtype=np.float64).reshape(-1, len(INPUT_FIELDS))
+    columns = {field: data[:, i] for i, field in enumerate(INPUT_FIELDS)}
+
+    tinggi_m = columns["tinggi"] / 100
+    columns["bmi"] = np.round(columns["berat"] / (tinggi_m ** 2), 2)
+
+    features = np.column_stack([
+        columns["gender"],
+        columns["age"],
+        columns["hypertension"],
+        columns["heart_disease"],
+        columns["smoking_history"],
+        columns["bmi"],
+        columns["hba1c_level"],
+        columns["blood_glucose"],
+    ])
+    return features, columns
+
+
+def _risk_factors(columns):
+    """Flag faktor risiko dihitung sebagai mask boolean untuk seluruh batch sekaligus."""
+    age = columns["age"]
+    hba1c = columns["hba1c_level"]
+    glucose = columns["blood_glucose"]
+    bmi = columns["bmi"]
+
+    rules = [
+        (hba1c >= 6.5, lambda i: {"feature": "HbA1c", "value": f"{float(hba1c[i])}%", "status": "Tinggi"}),
+        (hba1c < 4.0, lambda i: {"feature": "HbA1c", "value": f"{float(hba1c[i])}%", "status": "Rendah"}),
+        (glucose >= 140, lambda i: {"feature": "Glukosa", "value": f"{float(glucose[i])} mg/dL", "status": "Tinggi"}),
+        (glucose < 70, lambda i: {"feature": "Glukosa", "value": f"{float(glucose[i])} mg/dL", "status": "Rendah"}),
+        (bmi >= 25, lambda i: {"feature": "BMI", "value": f"{float(bmi[i])}", "status": "Overweight"}),
+        (bmi < 18.5, lambda i: {"feature": "BMI", "value": f"{float(bmi[i])}", "status": "Kurus"}),
+        (age >= 45, lambda i: {"feature": "Usia", "value": f"{int(age[i])} tahun", "status": "Risiko usia"}),
+        (columns["hypertension"] == 1, lambda i: {"feature": "Hipertensi", "value": "Ya", "status": "Berisiko"}),
+        (columns["heart_disease"] == 1, lambda i: {"feature": "Penyakit Jantung", "value": "Ya", "status": "Berisiko"}),
+        (columns["smoking_history"] == 1, lambda i: {"feature": "Riwayat Merokok", "value": "Ya", "status": "Risiko tambahan"}),
+    ]
+
+    factors = [[] for _ in range(len(age))]
+    # Urutan aturan dipertahankan agar daftar faktor sama dengan versi satu pasien
+    for mask, build in rules:
+        for i in np.flatnonzero(mask):
+            factors[i].append(build(i))
+    return factors
+
+
+def predict_with_probability(model, scaled_data):
+    """
+    Kelas prediksi dan probabilitas kelas positif (1) dari predict_proba.
+    Kelas diambil dari argmax probabilitas, sama seperti predict() sklearn.
+    """
+    proba = model.predict_proba(scaled_data)
+    predictions = model.classes_.take(np.argmax(proba, axis=1), axis=0)
+    positive = np.flatnonzero(model.classes_ == 1)
+    if len(positive):
+        probabilities = proba[:, positive[0]]
+    else:
+        probabilities = np.zeros(len(proba))
+    return predictions, probabilities
+
+
+def predict_features(model, scaler, features):
+    """(kelas, probabilitas) untuk matriks fitur hasil build_features."""
+    with timed_stage('scaler_transform', 'risk_rf'):
+        scaled_data = scaler.transform(features)
+    with timed_stage('predict', 'risk_rf'):
+        return predict_with_probability(model, scaled_data)
+
+
+def score_rows(model, scaler, rows):
+    """Menghitung hasil prediksi untuk sekumpulan baris dalam satu panggilan scaler dan model."""
+    return score_rows_with(lambda features: predict_features(model, scaler, features), rows)
+
+
+def score_rows_with(predict, rows):
+    """
+    Seperti score_rows, tetapi prediksi dikerjakan predict(features) -> (kelas,
+    probabilitas), mis. lewat pool inferensi; fitur dan faktor risiko tetap
+    dihitung di pemanggil.
+    """
+    if not rows:
+        return []
+
+    features, columns = build_features(rows)
+    predictions, probabilities = predict(features)
+    factors = _risk_factors(columns)
+
+    results = []
+    for prediction, probability, risk_factors in zip(predictions, probabilities, factors):
+        results.append({
+            "prediction_code": int(prediction),
+            "result": "Risiko Tinggi" if prediction == 1 else "Risiko Rendah",
+            "message": "Prediksi berhasil dihitung.",
+            "risk_factors": risk_factors,
+            "probability": round(float(probability) * 100, 2)
+        })
+    return results
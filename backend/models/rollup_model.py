@@ -0,0 +1,173 @@
+# File: models/rollup_model.py
+#
+# Rollup time-series per pasien (menit, jam, hari) untuk tabel monitoring.
+# Diperbarui secara inkremental setiap kali baris monitoring baru disimpan,
+# sehingga grafik tidak perlu menarik seluruh riwayat mentah.
+
+from datetime import datetime, timedelta
+
+from monitoring_archive import monitoring_archive
+
+# Resolusi yang disimpan beserta panjang bucket-nya (detik)
+RESOLUTIONS = {
+    "minute": 60,
+    "hour": 3600,
+    "day": 86400,
+}
+
+# Format DATE_FORMAT MySQL untuk awal bucket (tanda % di-escape karena query berparameter)
+_BUCKET_SQL = {
+    "minute": "DATE_FORMAT(timestamp, '%%Y-%%m-%%d %%H:%%i:00')",
+    "hour": "DATE_FORMAT(timestamp, '%%Y-%%m-%%d %%H:00:00')",
+    "day": "DATE_FORMAT(timestamp, '%%Y-%%m-%%d 00:00:00')",
+}
+
+
+def _to_datetime(value):
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+def bucket_start(timestamp, resolution):
+    """Awal bucket untuk sebuah timestamp pada resolusi tertentu."""
+    ts = _to_datetime(timestamp)
+    if resolution == "minute":
+        return ts.replace(second=0, microsecond=0)
+    if resolution == "hour":
+        return ts.replace(minute=0, second=0, microsecond=0)
+    return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def aggregate_records(records):
+    """
+    Pra-agregasi satu batch catatan (user_id, glucose, heart_rate, timestamp)
+    menjadi baris rollup, agar satu batch hanya butuh satu upsert per bucket.
+    """
+    buckets = {}
+    for user_id, glucose, heart_rate, timestamp in records:
+        glucose = float(glucose)
+        heart_rate = float(heart_rate)
+        for resolution in RESOLUTIONS:
+            key = (user_id, resolution, bucket_start(timestamp, resolution))
+            agg = buckets.get(key)
+            if agg is None:
+                buckets[key] = [1, glucose, glucose, glucose, heart_rate, heart_rate, heart_rate]
+            else:
+                agg[0] += 1
+                agg[1] = min(agg[1], glucose)
+                agg[2] = max(agg[2], glucose)
+                agg[3] += glucose
+                agg[4] = min(agg[4], heart_rate)
+                agg[5] = max(agg[5], heart_rate)
+                agg[6] += heart_rate
+    return [key + tuple(agg) for key, agg in buckets.items()]
+
+
+def upsert_rollups_model(cursor, rows):
+    """Menggabungkan baris hasil aggregate_records ke tabel monitoring_rollup."""
+    if not rows:
+        return 0
+    query = """
+        INSERT INTO monitoring_rollup
+            (user_id, resolution, bucket_start, sample_count,
+             glucose_min, glucose_max, glucose_sum,
+             heart_rate_min, heart_rate_max, heart_rate_sum)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            sample_count = sample_count + VALUES(sample_count),
+            glucose_min = LEAST(glucose_min, VALUES(glucose_min)),
+            glucose_max = GREATEST(glucose_max, VALUES(glucose_max)),
+            glucose_sum = glucose_sum + VALUES(glucose_sum),
+            heart_rate_min = LEAST(heart_rate_min, VALUES(heart_rate_min)),
+            heart_rate_max = GREATEST(heart_rate_max, VALUES(heart_rate_max)),
+            heart_rate_sum = heart_rate_sum + VALUES(heart_rate_sum)
+    """
+    cursor.executemany(query, rows)
+    return cursor.rowcount
+
+
+def record_rollups_model(cursor, records):
+    """Hook writer: memperbarui rollup dalam transaksi yang sama dengan INSERT monitoring."""
+    return upsert_rollups_model(cursor, aggregate_records(records))
+
+
+def _rebuild_range(cursor, user_id, resolution, start, end):
+    cursor.execute(
+        """
+        DELETE FROM monitoring_rollup
+        WHERE user_id = %s AND resolution = %s AND bucket_start >= %s AND bucket_start < %s
+        """,
+        (user_id, resolution, start, end)
+    )
+    cursor.execute(
+        f"""
+        INSERT INTO monitoring_rollup
+            (user_id, resolution, bucket_start, sample_count,
+             glucose_min, glucose_max, glucose_sum,
+             heart_rate_min, heart_rate_max, heart_rate_sum)
+        SELECT user_id, %s, {_BUCKET_SQL[resolution]} AS bucket, COUNT(*),
+               MIN(glucose_level), MAX(glucose_level), SUM(glucose_level),
+               MIN(heart_rate), MAX(heart_rate), SUM(heart_rate)
+        FROM monitoring
+        WHERE user_id = %s AND timestamp >= %s AND timestamp < %s
+        GROUP BY user_id, bucket
+        """,
+        (resolution, user_id, start, end)
+    )
+    # Baris yang sudah diarsipkan (partisi di-drop) ikut dihitung dari file arsip
+    until = monitoring_archive.archived_until()
+    if until is not None and start < until:
+        archived = monitoring_archive.records(user_id, start, end)
+        upsert_rollups_model(cursor, [row for row in aggregate_records(archived) if row[1] == resolution])
+
+
+def rebuild_rollup_buckets_model(cursor, user_id, timestamp):
+    """Menghitung ulang bucket yang memuat timestamp (dipakai setelah DELETE monitoring)."""
+    for resolution, seconds in RESOLUTIONS.items():
+        start = bucket_start(timestamp, resolution)
+        _rebuild_range(cursor, user_id, resolution, start, start + timedelta(seconds=seconds))
+
+
+def backfill_rollups_model(cursor, user_id):
+    """Membangun ulang seluruh rollup seorang pasien dari data mentah."""
+    for resolution in RESOLUTIONS:
+        _rebuild_range(cursor, user_id, resolution, datetime(1970, 1, 1), datetime(9999, 12, 31))
+
+
+def get_rollup_series_model(cursor, user_id, resolution, start, end):
+    """Mengambil bucket rollup dalam rentang waktu, urut naik."""
+    query = """
+        SELECT bucket_start, sample_count,
+               glucose_min, glucose_max, glucose_sum,
+               heart_rate_min, heart_rate_max, heart_rate_sum
+        FROM monitoring_rollup
+        WHERE user_id = %s AND resolution = %s AND bucket_start >= %s AND bucket_start < %s
+        ORDER BY bucket_start
+    """
+    cursor.execute(query, (user_id, resolution, start, end))
+    return cursor.fetchall()
+
+
+if __name__ == '__main__':
+    # Backfill: python -m models.rollup_model [user_id ...] (dijalankan dari folder backend)
+    import sys
+    from db import get_connection
+
+    conn = get_connection()
+    if conn is None:
+        print("ERROR: Koneksi database gagal")
+        sys.exit(1)
+    cursor = conn.cursor()
+    try:
+        if len(sys.argv) > 1:
+            user_ids = [int(arg) for arg in sys.argv[1:]]
+        else:
+            cursor.execute("SELECT DISTINCT user_id FROM monitoring")
+            user_ids = [row[0] for row in cursor.fetchall()]
+        for uid in user_ids:
+            backfill_rollups_model(cursor, uid)
+            conn.commit()
+            print(f"SUCCESS: Rollup user {uid} dibangun ulang.")
+    finally:
+        cursor.close()
+        conn.close()
@@ -1,4 +1,13 @@
 from mysql.connector import Error  # Tetap dipakai untuk menangani error database
+from cache import cache
+from conditional import versioned_key
+from models.version_model import bump_versions_model, monitoring_scope
+from monitoring_archive import monitoring_archive
+
+PATIENTS_CACHE_KEY = "patients:all"
+
+def _user_cache_key(user_id):
+    return f"user:{int(user_id)}"
 
 def get_all_users_model(conn):
     cursor = conn.cursor(dictionary=True)
@@ -8,11 +17,26 @@ def get_all_users_model(conn):
     return users
 
 def get_user_by_id_model(conn, user_id):
+    """
+    Satu user berdasarkan ID, langsung dari database. Dipakai untuk cek
+    otorisasi (admin_required) dan sebelum penulisan, yang tidak boleh memakai
+    data cache yang bisa tertinggal sampai CACHE_TTL.
+    """
     cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT id, name, age, email, gender, address, role FROM users WHERE id = %s", (user_id,))
-    user = cursor.fetchone()
-    cursor.close()
-    return user
+    try:
+        cursor.execute("SELECT id, name, age, email, gender, address, role FROM users WHERE id = %s", (user_id,))
+        return cursor.fetchone()
+    finally:
+        cursor.close()
+
+def get_user_by_id_cached_model(conn, user_id):
+    """Seperti get_user_by_id_model lewat read-through cache; hanya untuk tampilan (GET /users/<id>)."""
+    return cache.read_through(_user_cache_key(user_id), lambda: get_user_by_id_model(conn, user_id))
+
+def is_patient_model(cursor, user_id):
+    """True jika user_id adalah pasien yang terdaftar (dibaca langsung dari database, tanpa cache)."""
+    cursor.execute("SELECT 1 FROM users WHERE id = %s AND role = 'patient'", (user_id,))
+    return cursor.fetchone() is not None
 
 def get_user_by_email_for_login_model(conn, email):
     """Mengambil user berdasarkan email, termasuk password untuk verifikasi login."""
@@ -39,8 +63,12 @@ def add_user_model(conn, user_data):
             user_data.get('password'),  # langsung disimpan
             user_data.get('role')
         ))
+        new_id = cursor.lastrowid
+        bump_versions_model(cursor, ["users"])
         conn.commit()
-        return cursor.lastrowid
+        # Daftar pasien tidak perlu di-invalidasi: key-nya ikut versi 'users'
+        cache.invalidate(_user_cache_key(new_id))
+        return new_id
     except Error as e:
         conn.rollback()
         raise e
@@ -84,8 +112,13 @@ def update_user_model(conn, user_id, user_data):
 
     try:
         cursor.execute(sql, tuple(params))
+        affected_rows = cursor.rowcount
+        if affected_rows:
+            bump_versions_model(cursor, ["users"])
         conn.commit()
-        return cursor.rowcount
+        if affected_rows:
+            cache.invalidate(_user_cache_key(user_id))
+        return affected_rows
     except Error as e:
         conn.rollback()
         raise e
@@ -96,8 +129,16 @@ def delete_user_model(conn, user_id):
     cursor = conn.cursor()
     try:
         cursor.execute("DELETE FROM users WHERE id = %s", (user_id,))
+        affected_rows = cursor.rowcount
+        if affected_rows:
+            # Tabel monitoring berpartisi tidak punya foreign key, jadi dihapus eksplisit
+            cursor.execute("DELETE FROM monitoring WHERE user_id = %s", (user_id,))
+            bump_versions_model(cursor, ["users", "monitoring", monitoring_scope(user_id)])
         conn.commit()
-        return cursor.rowcount
+        if affected_rows:
+            cache.invalidate(_user_cache_key(user_id))
+            monitoring_archive.purge_user(user_id)
+        return affected_rows
     except Error as e:
         conn.rollback()
         raise e
@@ -113,16 +154,19 @@ def get_patients_model(conn):
 
 # File: models/user_model.py
 
-def get_patients_model(conn):
-    cursor = conn.cursor(dictionary=True)
-    # --- PERBAIKAN DI SINI ---
-    # Tambahkan kolom 'created_at' ke dalam query SELECT
-    query = """
-        SELECT id, name, email, age, created_at 
-        FROM users 
-        WHERE role = 'patient'
-    """
-    cursor.execute(query)
-    patients = cursor.fetchall()
-    cursor.close()
-    return patients
\ No newline at end of file
+def get_patients_model(conn, versions):
+    """Daftar pasien (read-through cache, key memuat versi 'users' dari ETag)."""
+    def load():
+        cursor = conn.cursor(dictionary=True)
+        # --- PERBAIKAN DI SINI ---
+        # Tambahkan kolom 'created_at' ke dalam query SELECT
+        query = """
+            SELECT id, name, email, age, created_at 
+            FROM users 
+            WHERE role = 'patient'
+        """
+        cursor.execute(query)
+        patients = cursor.fetchall()
+        cursor.close()
+        return patients
+    return cache.read_through(versioned_key(PATIENTS_CACHE_KEY, versions, "users"), load)
\ No newline at end of file
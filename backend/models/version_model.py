@@ -0,0 +1,38 @@
+# File: models/version_model.py
+#
+# Penghitung versi per cakupan (tabel atau per pasien) untuk conditional GET.
+
+
+def monitoring_scope(user_id):
+    return f"monitoring:user:{user_id}"
+
+
+def bump_versions_model(cursor, scopes):
+    """
+    Menaikkan versi cakupan-cakupan di dalam transaksi penulisan yang sedang berjalan.
+    Diurutkan agar row lock selalu diambil dengan urutan yang sama (menghindari deadlock).
+    """
+    scopes = sorted(set(scopes))
+    if not scopes:
+        return
+    query = """
+        INSERT INTO table_versions (scope, version, updated_at)
+        VALUES (%s, 1, NOW(6))
+        ON DUPLICATE KEY UPDATE version = version + 1, updated_at = NOW(6)
+    """
+    cursor.executemany(query, [(scope,) for scope in scopes])
+
+
+def get_versions_model(cursor, scopes):
+    """{scope: (version, updated_at)}; cakupan yang belum pernah ditulis tidak ada di hasil."""
+    placeholders = ", ".join(["%s"] * len(scopes))
+    cursor.execute(
+        f"SELECT scope, version, updated_at FROM table_versions WHERE scope IN ({placeholders})",
+        tuple(scopes)
+    )
+    return {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+
+
+def record_monitoring_versions_model(cursor, records):
+    """Hook writer: menaikkan versi monitoring global dan per pasien untuk batch yang disimpan."""
+    bump_versions_model(cursor, ["monitoring"] + [monitoring_scope(record[0]) for record in records])
@@ -0,0 +1,586 @@
+"""
+Partisi bulanan dan arsip kolumnar untuk tabel monitoring.
+
+Tabel monitoring dipartisi per bulan pada kolom timestamp (lihat
+migrations/0007_partition_monitoring.py dan models/partition_model.py). Job pemeliharaan:
+1. membuat partisi bulan-bulan berikutnya (MONITORING_PARTITION_AHEAD bulan),
+2. mengekspor partisi yang lebih tua dari MONITORING_RETENTION_MONTHS ke file
+   kolumnar terkompresi (np.savez_compressed) di MONITORING_ARCHIVE_DIR, lalu
+   men-DROP partisi tersebut setelah jumlah baris dan checksum id cocok.
+
+Baca yang menjangkau rentang terarsip (get_monitoring_page_model,
+get_latest_readings_model, rebuild rollup) digabung otomatis dengan isi arsip
+lewat monitoring_archive.read(), sehingga tabel panas tetap kecil tanpa
+mengubah respons API.
+
+File arsip tidak diubah kecuali untuk menghapus baris (DELETE satu catatan
+atau penghapusan user), yang menulis ulang file bulan itu secara atomik di bawah
+lock file .lock pendampingnya (fcntl.flock, atau msvcrt.locking di Windows),
+sehingga worker lain tidak menimpa hasilnya.
+
+Job pemeliharaan di background tidak berjalan kecuali diaktifkan:
+MONITORING_MAINTENANCE_INTERVAL > 0 membuat partisi secara berkala, dan
+pengarsipan (yang men-DROP partisi) hanya ikut jika MONITORING_ARCHIVE_ENABLED=1.
+
+CLI (dari folder backend):
+    python monitoring_archive.py            # buat partisi + arsipkan
+    python monitoring_archive.py --ensure   # hanya buat partisi
+"""
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+from mysql.connector import Error
+
+from models.partition_model import (
+    FUTURE_PARTITION,
+    add_month_partitions_model,
+    add_months,
+    drop_partition_model,
+    get_oldest_timestamp_model,
+    get_partition_checksum_model,
+    get_partitions_model,
+    iter_partition_rows_model,
+    month_start,
+    partition_month,
+)
+
+MONITORING_ARCHIVE_DIR = os.getenv(
+    'MONITORING_ARCHIVE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'archive', 'monitoring')
+)
+MONITORING_RETENTION_MONTHS = int(os.getenv('MONITORING_RETENTION_MONTHS', '6'))
+MONITORING_PARTITION_AHEAD = int(os.getenv('MONITORING_PARTITION_AHEAD', '3'))
+# Jumlah file bulan yang disimpan terdekompresi di memori (satu bulan bisa ratusan MB)
+MONITORING_ARCHIVE_CACHE_MONTHS = int(os.getenv('MONITORING_ARCHIVE_CACHE_MONTHS', '2'))
+# Interval job pemeliharaan di background (detik); 0 (default) = hanya lewat CLI
+MONITORING_MAINTENANCE_INTERVAL = float(os.getenv('MONITORING_MAINTENANCE_INTERVAL', '0'))
+# Job background ikut mengarsipkan dan men-DROP partisi lama hanya jika diaktifkan eksplisit
+MONITORING_ARCHIVE_ENABLED = os.getenv('MONITORING_ARCHIVE_ENABLED', '0') == '1'
+
+_PREFIX = "monitoring_"
+_SUFFIX = ".npz"
+_PENDING = ".pending"
+_LOCK = ".lock"
+_COLUMNS = ("id", "user_id", "glucose", "heart_rate", "ts")
+_DTYPES = (np.int64, np.int32, np.float32, np.float32, 'datetime64[s]')
+
+
+def _to_seconds(value):
+    return int(np.datetime64(value, 's').astype(np.int64))
+
+def _from_seconds(values):
+    return np.asarray(values, dtype='datetime64[s]').astype(datetime).tolist()
+
+@contextmanager
+def _file_lock(path):
+    """
+    Lock eksklusif antar proses/worker pada file .lock terpisah (file arsip
+    sendiri diganti lewat os.replace). fcntl.flock di POSIX, msvcrt.locking di Windows.
+    """
+    with open(path + _LOCK, 'a+b') as handle:
+        if os.name == 'nt':
+            import msvcrt
+            handle.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK menyerah setelah ~10 detik; terus menunggu seperti flock
+                    continue
+            try:
+                yield
+            finally:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+def _with_id_range(arrays):
+    """Menambahkan kolom kecil id_range [min, max] agar delete_row bisa melewati file tanpa membuka kolom id."""
+    ids = arrays["id"]
+    arrays["id_range"] = np.array([ids.min(), ids.max()] if len(ids) else [0, -1], dtype=np.int64)
+    return arrays
+
+
+class MonitoringArchive:
+    """File arsip per partisi: kolom id, user_id, glucose, heart_rate, ts (urut user_id, ts, id)."""
+
+    def __init__(self, directory, cache_months):
+        self.directory = directory
+        self.cache_months = max(1, cache_months)
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()    # path -> (mtime_ns, arrays)
+        self._id_ranges = {}           # path -> (mtime_ns, (id_min, id_max))
+        self._stats = {"reads": 0, "rows_served": 0, "loads": 0, "rewrites": 0}
+
+    # --- Penulisan --------------------------------------------------------
+
+    def _path(self, name):
+        return os.path.join(self.directory, f"{_PREFIX}{name}{_SUFFIX}")
+
+    def write_pending(self, name, batches):
+        """
+        Menulis baris partisi ke file .pending (belum terlihat oleh pembaca).
+        Mengembalikan (jumlah baris, jumlah id) untuk dicocokkan sebelum DROP.
+        """
+        # Setiap batch fetchmany langsung menjadi array bertipe; list Python
+        # hanya hidup selama satu batch, bukan untuk seluruh partisi.
+        # Kolom MySQL berjenis FLOAT, jadi float32 menyimpan nilai yang sama persis.
+        chunks = {key: [] for key in _COLUMNS}
+        for rows in batches:
+            for key, dtype, values in zip(_COLUMNS, _DTYPES, zip(*rows)):
+                chunks[key].append(np.asarray(values, dtype=dtype))
+        arrays = {
+            key: np.concatenate(chunks[key]) if chunks[key] else np.empty(0, dtype=dtype)
+            for key, dtype in zip(_COLUMNS, _DTYPES)
+        }
+        del chunks
+        arrays["ts"] = arrays["ts"].astype(np.int64)
+        _with_id_range(arrays)
+        os.makedirs(self.directory, exist_ok=True)
+        pending = self._path(name) + _PENDING
+        with open(pending, 'wb') as f:
+            np.savez_compressed(f, **arrays)
+            f.flush()
+            os.fsync(f.fileno())
+        with np.load(pending) as check:
+            return len(check["id"]), int(check["id"].sum())
+
+    def publish(self, name):
+        """Membuat file .pending terlihat oleh pembaca (dipanggil setelah partisi di-DROP)."""
+        os.replace(self._path(name) + _PENDING, self._path(name))
+
+    def discard_pending(self, name):
+        try:
+            os.remove(self._path(name) + _PENDING)
+        except FileNotFoundError:
+            pass
+
+    def pending_names(self):
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            entry[len(_PREFIX):-len(_SUFFIX + _PENDING)]
+            for entry in os.listdir(self.directory)
+            if entry.startswith(_PREFIX) and entry.endswith(_SUFFIX + _PENDING)
+        )
+
+    # --- Pembacaan --------------------------------------------------------
+
+    def _files(self):
+        """
+        (path, batas_atas) semua file arsip urut naik. Batas atas diturunkan dari
+        nama partisi (awal bulan berikutnya), jadi tidak perlu membuka file.
+        Partisi pertama juga memuat baris yang lebih tua dari bulannya.
+        """
+        if not os.path.isdir(self.directory):
+            return []
+        files = []
+        for entry in sorted(os.listdir(self.directory)):
+            if entry.startswith(_PREFIX) and entry.endswith(_SUFFIX):
+                name = entry[len(_PREFIX):-len(_SUFFIX)]
+                upper = add_months(partition_month(name), 1)
+                files.append((os.path.join(self.directory, entry), upper))
+        return files
+
+    def _load(self, path):
+        mtime = os.stat(path).st_mtime_ns
+        with self._lock:
+            cached = self._cache.get(path)
+            if cached is not None and cached[0] == mtime:
+                self._cache.move_to_end(path)
+                return cached[1]
+        with np.load(path) as data:
+            arrays = {key: data[key] for key in data.files}
+        arrays["ts_min"] = int(arrays["ts"].min()) if len(arrays["ts"]) else None
+        with self._lock:
+            self._cache[path] = (mtime, arrays)
+            self._cache.move_to_end(path)
+            while len(self._cache) > self.cache_months:
+                self._cache.popitem(last=False)
+            self._stats["loads"] += 1
+        return arrays
+
+    def _months(self, start=None):
+        """(path, arrays) dari file terbaru; file dibuka saat diiterasi, file yang seluruhnya sebelum start dilewati."""
+        for path, upper in reversed(self._files()):
+            if start is not None and upper <= start:
+                continue
+            yield path, self._load(path)
+
+    def archived_until(self):
+        """Batas atas rentang terarsip (semua baris arsip lebih tua), atau None jika arsip kosong."""
+        files = self._files()
+        return files[-1][1] if files else None
+
+    def read(self, user_id=None, start=None, end=None, min_glucose=None, max_glucose=None,
+             after=None, limit=None, with_user=True):
+        """
+        Baris arsip yang cocok dengan filter, urut (timestamp, id) menurun seperti
+        get_monitoring_page_model. 'after' = (timestamp, id) keyset halaman sebelumnya.
+        """
+        start_s = _to_seconds(start) if start is not None else None
+        end_s = _to_seconds(end) if end is not None else None
+        after_s = (_to_seconds(after[0]), int(after[1])) if after is not None else None
+
+        picked = []
+        remaining = limit
+        for _, arrays in self._months(start):
+            if arrays["ts_min"] is None:
+                continue
+            if end_s is not None and arrays["ts_min"] >= end_s:
+                continue
+            if after_s is not None and arrays["ts_min"] > after_s[0]:
+                continue
+
+            lo, hi = 0, len(arrays["id"])
+            if user_id is not None:
+                lo = int(np.searchsorted(arrays["user_id"], user_id, side='left'))
+                hi = int(np.searchsorted(arrays["user_id"], user_id, side='right'))
+                if lo == hi:
+                    continue
+            ts = arrays["ts"][lo:hi]
+            ids = arrays["id"][lo:hi]
+            glucose = arrays["glucose"][lo:hi]
+            mask = np.ones(hi - lo, dtype=bool)
+            if start_s is not None:
+                mask &= ts >= start_s
+            if end_s is not None:
+                mask &= ts < end_s
+            if min_glucose is not None:
+                mask &= glucose >= np.float32(min_glucose)
+            if max_glucose is not None:
+                mask &= glucose <= np.float32(max_glucose)
+            if after_s is not None:
+                mask &= (ts < after_s[0]) | ((ts == after_s[0]) & (ids < after_s[1]))
+            index = np.flatnonzero(mask) + lo
+            if not len(index):
+                continue
+            order = np.lexsort((-arrays["id"][index], -arrays["ts"][index]))
+            index = index[order]
+            if remaining is not None:
+                index = index[:remaining]
+                remaining -= len(index)
+            picked.append((arrays, index))
+            if remaining == 0:
+                break
+
+        rows = []
+        for arrays, index in picked:
+            timestamps = _from_seconds(arrays["ts"][index])
+            for i, timestamp in zip(index, timestamps):
+                row = {
+                    "id": int(arrays["id"][i]),
+                    # str() float32 memberi representasi terpendek, sama seperti nilai dari MySQL
+                    "heart_rate": float(str(arrays["heart_rate"][i])),
+                    "glucose_level": float(str(arrays["glucose"][i])),
+                    "timestamp": timestamp,
+                }
+                if with_user:
+                    row["user_id"] = int(arrays["user_id"][i])
+                rows.append(row)
+        with self._lock:
+            self._stats["reads"] += 1
+            self._stats["rows_served"] += len(rows)
+        return rows
+
+    def iter_export(self, user_id=None, start=None, end=None, batch_size=50000):
+        """
+        Baris arsip untuk ekspor sebagai batch tuple (id, user_id, glucose_level,
+        heart_rate, timestamp), urut naik (timestamp, id). File dibaca satu per
+        satu tanpa lewat cache agar ekspor besar tidak mengusir bulan yang sering dibaca.
+        """
+        start_s = _to_seconds(start) if start is not None else None
+        end_s = _to_seconds(end) if end is not None else None
+        for path, upper in self._files():
+            if start is not None and upper <= start:
+                continue
+            with np.load(path) as data:
+                arrays = {key: data[key] for key in data.files}
+            lo, hi = 0, len(arrays["id"])
+            if user_id is not None:
+                lo = int(np.searchsorted(arrays["user_id"], user_id, side='left'))
+                hi = int(np.searchsorted(arrays["user_id"], user_id, side='right'))
+            ts = arrays["ts"][lo:hi]
+            mask = np.ones(hi - lo, dtype=bool)
+            if start_s is not None:
+                mask &= ts >= start_s
+            if end_s is not None:
+                mask &= ts < end_s
+            index = np.flatnonzero(mask) + lo
+            index = index[np.lexsort((arrays["id"][index], arrays["ts"][index]))]
+            for offset in range(0, len(index), batch_size):
+                part = index[offset:offset + batch_size]
+                yield list(zip(
+                    arrays["id"][part].tolist(),
+                    arrays["user_id"][part].tolist(),
+                    # str() float32 memberi representasi terpendek, sama seperti nilai dari MySQL
+                    [float(value) for value in arrays["glucose"][part].astype(str)],
+                    [float(value) for value in arrays["heart_rate"][part].astype(str)],
+                    _from_seconds(arrays["ts"][part]),
+                ))
+            del arrays
+
+    def records(self, user_id, start, end):
+        """Baris arsip seorang pasien dalam [start, end) sebagai tuple (user_id, glucose, heart_rate, timestamp)."""
+        rows = self.read(user_id=user_id, start=start, end=end)
+        return [(user_id, row["glucose_level"], row["heart_rate"], row["timestamp"]) for row in rows]
+
+    # --- Penghapusan ------------------------------------------------------
+
+    def _rewrite(self, path, select):
+        """
+        Menulis ulang satu file arsip. Isi file dibaca ulang dari disk di bawah
+        lock (bukan dari cache), lalu select(arrays) mengembalikan (mask baris
+        yang dipertahankan, hasil) atau None jika tidak ada yang dihapus.
+        """
+        with _file_lock(path):
+            if not os.path.exists(path):
+                return None
+            with np.load(path) as data:
+                arrays = {key: data[key] for key in _COLUMNS}
+            selected = select(arrays)
+            if selected is None:
+                return None
+            keep, result = selected
+            kept = _with_id_range({key: arrays[key][keep] for key in _COLUMNS})
+            tmp = path + ".tmp"
+            with open(tmp, 'wb') as f:
+                np.savez_compressed(f, **kept)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+        with self._lock:
+            self._cache.pop(path, None)
+            self._id_ranges.pop(path, None)
+            self._stats["rewrites"] += 1
+        return result
+
+    def _id_range(self, path):
+        """(id_min, id_max) file arsip; hanya kolom kecil id_range yang didekompresi."""
+        mtime = os.stat(path).st_mtime_ns
+        with self._lock:
+            cached = self._id_ranges.get(path)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+        with np.load(path) as data:
+            if "id_range" in data.files:
+                bounds = tuple(int(value) for value in data["id_range"])
+            else:
+                # File dari versi sebelum id_range ada
+                ids = data["id"]
+                bounds = (int(ids.min()), int(ids.max())) if len(ids) else (0, -1)
+        with self._lock:
+            self._id_ranges[path] = (mtime, bounds)
+        return bounds
+
+    def delete_row(self, row_id):
+        """Menghapus satu baris arsip; mengembalikan (user_id, timestamp) atau None jika tidak ada."""
+        def select(arrays):
+            hits = np.flatnonzero(arrays["id"] == row_id)
+            if not len(hits):
+                return None
+            i = int(hits[0])
+            keep = np.ones(len(arrays["id"]), dtype=bool)
+            keep[i] = False
+            return keep, (int(arrays["user_id"][i]), _from_seconds([arrays["ts"][i]])[0])
+
+        for path, _ in reversed(self._files()):
+            id_min, id_max = self._id_range(path)
+            if not id_min <= row_id <= id_max:
+                continue
+            found = self._rewrite(path, select)
+            if found is not None:
+                return found
+        return None
+
+    def purge_user(self, user_id):
+        """Menghapus semua baris arsip milik user (dipanggil setelah user dihapus)."""
+        def select(arrays):
+            lo = int(np.searchsorted(arrays["user_id"], user_id, side='left'))
+            hi = int(np.searchsorted(arrays["user_id"], user_id, side='right'))
+            if lo == hi:
+                return None
+            keep = np.ones(len(arrays["id"]), dtype=bool)
+            keep[lo:hi] = False
+            return keep, hi - lo
+
+        removed = 0
+        for path, arrays in self._months():
+            # Pengecekan cepat dari cache; penghapusan sebenarnya dihitung ulang di bawah lock
+            i = int(np.searchsorted(arrays["user_id"], user_id, side='left'))
+            if i == len(arrays["user_id"]) or arrays["user_id"][i] != user_id:
+                continue
+            removed += self._rewrite(path, select) or 0
+        return removed
+
+    def stats(self):
+        with self._lock:
+            data = dict(self._stats)
+            data["cached_months"] = len(self._cache)
+        files = self._files()
+        data["files"] = len(files)
+        data["bytes"] = sum(os.path.getsize(path) for path, _ in files)
+        until = self.archived_until()
+        data["archived_until"] = until.isoformat(sep=' ') if until else None
+        return data
+
+
+monitoring_archive = MonitoringArchive(MONITORING_ARCHIVE_DIR, MONITORING_ARCHIVE_CACHE_MONTHS)
+
+
+def merge_archived(rows, limit, **filters):
+    """
+    Melengkapi baris dari tabel panas (urut menurun) dengan baris arsip jika
+    halaman belum penuh atau sudah menyentuh rentang terarsip.
+    """
+    until = monitoring_archive.archived_until()
+    if until is None:
+        return rows
+    start = filters.get("start")
+    if start is not None and start >= until:
+        return rows
+    full = limit is not None and len(rows) >= limit
+    if full and rows[-1]["timestamp"] >= until:
+        return rows
+    archived = monitoring_archive.read(limit=limit, **filters)
+    if not archived:
+        return rows
+    merged = rows + archived
+    merged.sort(key=lambda row: (row["timestamp"], row["id"]), reverse=True)
+    return merged[:limit] if limit is not None else merged
+
+
+# --- Job pemeliharaan -----------------------------------------------------
+
+def ensure_partitions(cursor, ahead=MONITORING_PARTITION_AHEAD, now=None, since=None):
+    """
+    Menambah partisi bulanan sampai `ahead` bulan ke depan. Partisi pertama
+    dimulai dari bulan `since` atau bulan data tertua. Mengembalikan daftar
+    partisi baru, atau None jika tabel monitoring belum dipartisi.
+    """
+    partitions = get_partitions_model(cursor)
+    if not partitions:
+        return None
+    current = month_start(now or datetime.now())
+    monthly = [name for name, _ in partitions if name != FUTURE_PARTITION]
+    if monthly:
+        first = add_months(partition_month(monthly[-1]), 1)
+    else:
+        oldest = since or get_oldest_timestamp_model(cursor)
+        first = min(month_start(oldest), current) if oldest else current
+    months = []
+    month = first
+    while month <= add_months(current, ahead):
+        months.append(month)
+        month = add_months(month, 1)
+    add_month_partitions_model(cursor, months)
+    return [f"p{month:%Y%m}" for month in months]
+
+
+def archive_expired(conn, cursor, retention_months=MONITORING_RETENTION_MONTHS, now=None):
+    """Mengarsipkan dan men-DROP partisi yang seluruhnya lebih tua dari masa retensi."""
+    # File .pending dari run yang terputus: partisi sudah hilang berarti DROP
+    # berhasil dan tinggal dipublikasikan; jika belum, ekspor diulang.
+    existing = {name for name, _ in get_partitions_model(cursor)}
+    for name in monitoring_archive.pending_names():
+        if name in existing:
+            monitoring_archive.discard_pending(name)
+        else:
+            monitoring_archive.publish(name)
+            print(f"INFO: Arsip {name} dari run sebelumnya dipublikasikan.")
+
+    cutoff = add_months(month_start(now or datetime.now()), -retention_months)
+    archived = []
+    for name, upper in get_partitions_model(cursor):
+        if name == FUTURE_PARTITION or upper is None or upper > cutoff:
+            continue
+        count, id_sum = monitoring_archive.write_pending(name, iter_partition_rows_model(cursor, name))
+        # Kunci tabel agar tidak ada baris baru masuk ke partisi di antara cek dan DROP
+        cursor.execute("LOCK TABLES monitoring WRITE")
+        try:
+            if get_partition_checksum_model(cursor, name) != (count, id_sum):
+                monitoring_archive.discard_pending(name)
+                print(f"WARNING: Partisi {name} berubah selama ekspor, diarsipkan pada run berikutnya.")
+                continue
+            drop_partition_model(cursor, name)
+        finally:
+            cursor.execute("UNLOCK TABLES")
+        monitoring_archive.publish(name)
+        archived.append((name, count))
+        print(f"SUCCESS: Partisi {name} ({count} baris) diarsipkan dan di-drop.")
+    conn.commit()
+    return archived
+
+
+def run_maintenance(archive=True):
+    """Satu putaran pemeliharaan; GET_LOCK memastikan hanya satu worker yang menjalankannya."""
+    from db import get_connection
+
+    conn = get_connection()
+    if conn is None:
+        print("ERROR: Pemeliharaan monitoring gagal: koneksi database gagal")
+        return None
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT GET_LOCK('monitoring_maintenance', 0)")
+        if cursor.fetchone()[0] != 1:
+            return None
+        try:
+            created = ensure_partitions(cursor)
+            if created is None:
+                print("INFO: Tabel monitoring belum dipartisi (jalankan python migrate.py).")
+                return None
+            if created:
+                print(f"SUCCESS: Partisi monitoring baru: {', '.join(created)}")
+            archived = archive_expired(conn, cursor) if archive else []
+            return {"created": created, "archived": archived}
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK('monitoring_maintenance')")
+            cursor.fetchone()
+    except Error as e:
+        print(f"ERROR: Pemeliharaan monitoring gagal: {e}")
+        return None
+    finally:
+        cursor.close()
+        conn.close()
+
+
+_maintenance_thread = None
+
+def start_maintenance_thread(interval=MONITORING_MAINTENANCE_INTERVAL, archive=MONITORING_ARCHIVE_ENABLED):
+    """
+    Menjalankan run_maintenance() berkala di thread daemon (sekali per proses).
+    Tidak melakukan apa pun kecuali MONITORING_MAINTENANCE_INTERVAL diatur; DROP
+    partisi lama hanya jika MONITORING_ARCHIVE_ENABLED=1.
+    """
+    global _maintenance_thread
+    # Proses anak (mis. worker pool inferensi) ikut meng-import app.py; cukup proses utama yang menjalankan
+    if interval <= 0 or _maintenance_thread is not None or multiprocessing.parent_process() is not None:
+        return
+
+    def loop():
+        while True:
+            run_maintenance(archive=archive)
+            time.sleep(interval)
+
+    _maintenance_thread = threading.Thread(target=loop, name="monitoring-maintenance", daemon=True)
+    _maintenance_thread.start()
+
+
+if __name__ == '__main__':
+    result = run_maintenance(archive='--ensure' not in sys.argv[1:])
+    sys.exit(0 if result is not None else 1)
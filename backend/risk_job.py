@@ -0,0 +1,163 @@
+"""
+Job penilaian risiko populasi.
+
+Menjalankan pipeline RF (scaler + model) atas input tersimpan seluruh pasien
+per chunk tervektor, lalu menyimpan hasilnya di risk_scores beserta versi model
+dan waktu penilaian. Run berikutnya hanya menilai ulang pasien yang inputnya
+berubah atau yang dinilai oleh versi model lain; input yang tidak valid ditandai
+dan dilewati sampai diperbarui.
+
+CLI (dari folder backend):
+    python risk_job.py [--full]
+"""
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+from mysql.connector import Error
+
+from db import get_connection
+from models.risk_model import (
+    clear_risk_inputs_invalid_model,
+    get_inputs_to_score_model,
+    mark_risk_inputs_invalid_model,
+    upsert_risk_scores_model,
+)
+from models.risk_scoring import parse_record, score_rows
+
+RISK_JOB_CHUNK_SIZE = int(os.getenv('RISK_JOB_CHUNK_SIZE', '1000'))
+
+
+class RiskScoringJob:
+    """Satu job per proses; run kedua ditolak selama run pertama masih berjalan."""
+
+    def __init__(self, chunk_size):
+        self.chunk_size = chunk_size
+        self._lock = threading.Lock()
+        self._status = {"running": False, "last_run": None}
+
+    def run(self, model, scaler, model_version, full=False):
+        """
+        Menilai semua pasien yang perlu dinilai. Mengembalikan ringkasan run,
+        atau None jika job lain sedang berjalan.
+        """
+        if not self._lock.acquire(blocking=False):
+            return None
+        return self._run_locked(model, scaler, model_version, full)
+
+    def _run_locked(self, model, scaler, model_version, full):
+        """Isi run(); pemanggil sudah memegang self._lock dan lock dilepas di sini."""
+        started = time.monotonic()
+        summary = {
+            "mode": "full" if full else "incremental",
+            "model_version": model_version,
+            "started_at": datetime.now(),
+            "finished_at": None,
+            "scored": 0,
+            "invalid": 0,
+            "chunks": 0,
+            "duration": None,
+            "error": None,
+        }
+        self._status = {"running": True, "last_run": summary}
+        try:
+            self._score_all(model, scaler, model_version, full, summary)
+        except Exception as e:
+            # Chunk yang sudah di-commit tetap tersimpan; sisanya dinilai pada run berikutnya
+            summary["error"] = str(e)
+            print(f"Error saat menjalankan job skor risiko: {e}")
+        finally:
+            summary["finished_at"] = datetime.now()
+            summary["duration"] = round(time.monotonic() - started, 3)
+            self._status = {"running": False, "last_run": summary}
+            self._lock.release()
+        print(f"INFO: Job skor risiko selesai: {summary['scored']} pasien dinilai "
+              f"({summary['mode']}, model {model_version}) dalam {summary['duration']} detik.")
+        return summary
+
+    def _score_all(self, model, scaler, model_version, full, summary):
+        conn = get_connection()
+        if conn is None:
+            raise Error(msg="Koneksi database gagal")
+        cursor = conn.cursor(dictionary=True)
+        try:
+            after_user_id = 0
+            while True:
+                records = get_inputs_to_score_model(cursor, model_version, after_user_id, self.chunk_size, full)
+                if not records:
+                    break
+                after_user_id = records[-1]['user_id']
+
+                valid, rows, invalid = [], [], []
+                for record in records:
+                    try:
+                        rows.append(parse_record(record))
+                        valid.append(record)
+                    except (KeyError, ValueError, TypeError):
+                        invalid.append((record['user_id'], record['updated_at']))
+                summary["invalid"] += len(invalid)
+                if invalid:
+                    mark_risk_inputs_invalid_model(cursor, invalid)
+                revalidated = [record['user_id'] for record in valid if record.get('invalid_updated_at') is not None]
+                if revalidated:
+                    clear_risk_inputs_invalid_model(cursor, revalidated)
+
+                results = score_rows(model, scaler, rows)
+                upsert_risk_scores_model(cursor, [
+                    (
+                        record['user_id'],
+                        result['prediction_code'],
+                        result['probability'],
+                        json.dumps(result['risk_factors']),
+                        model_version,
+                        record['updated_at'],
+                    )
+                    for record, result in zip(valid, results)
+                ])
+                conn.commit()
+                summary["scored"] += len(results)
+                summary["chunks"] += 1
+        finally:
+            cursor.close()
+            conn.close()
+
+    def start_background(self, model, scaler, model_version, full=False):
+        """
+        Menjalankan run di thread terpisah; False jika job sedang berjalan.
+        Lock diambil di sini lalu diserahkan ke thread, jadi dua permintaan
+        serentak tidak bisa sama-sama mendapat True.
+        """
+        if not self._lock.acquire(blocking=False):
+            return False
+        thread = threading.Thread(
+            target=self._run_locked, args=(model, scaler, model_version, full),
+            name="risk-scoring-job", daemon=True
+        )
+        try:
+            thread.start()
+        except RuntimeError:
+            self._lock.release()
+            raise
+        return True
+
+    def status(self):
+        return dict(self._status)
+
+
+risk_job = RiskScoringJob(RISK_JOB_CHUNK_SIZE)
+
+
+if __name__ == '__main__':
+    from model_registry import model_registry
+    import routes.ml_routes  # noqa: F401  (mendaftarkan loader 'risk_rf')
+
+    loaded = model_registry.get('risk_rf')
+    if loaded is None:
+        print("ERROR: Model prediksi risiko tidak tersedia")
+        sys.exit(1)
+    result = risk_job.run(loaded[0], loaded[1], model_registry.version or 'local', full='--full' in sys.argv[1:])
+    if result is None or result["error"]:
+        sys.exit(1)
@@ -3,7 +3,8 @@ import datetime
 from functools import wraps
 from flask import Blueprint, request, jsonify
 from db import get_connection
-from models.user_model import get_user_by_email_for_login_model
+from metrics import timed_stage
+from models.user_model import get_user_by_email_for_login_model, get_user_by_id_model
 
 auth_bp = Blueprint('auth_bp', __name__)
 
@@ -23,6 +24,8 @@ def login():
     conn = None
     try:
         conn = get_connection()
+        if conn is None:
+            return jsonify({"message": "Koneksi database gagal"}), 503
         user = get_user_by_email_for_login_model(conn, email)
 
         # Debugging
@@ -88,7 +91,8 @@ def token_required(f):
             return jsonify({'message': 'Token tidak ditemukan!'}), 401
 
         try:
-            decoded = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
+            with timed_stage('jwt_decode'):
+                decoded = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
             current_user_id = decoded['user_id']
         except jwt.ExpiredSignatureError:
             return jsonify({'message': 'Token sudah kedaluwarsa!'}), 401
@@ -98,3 +102,33 @@ def token_required(f):
         return f(current_user_id, *args, **kwargs)
 
     return decorated
+
+def optional_user_id():
+    """user_id dari token Authorization jika ada dan valid, selain itu None (untuk endpoint publik)."""
+    parts = request.headers.get('Authorization', '').split(" ")
+    if len(parts) != 2:
+        return None
+    try:
+        with timed_stage('jwt_decode'):
+            return jwt.decode(parts[1], SECRET_KEY, algorithms=["HS256"])['user_id']
+    except (jwt.InvalidTokenError, KeyError):
+        return None
+
+def admin_required(f):
+    """Dipasang di bawah @token_required: menolak pengguna yang role-nya bukan 'admin'."""
+    @wraps(f)
+    def decorated(current_user_id, *args, **kwargs):
+        conn = get_connection()
+        if conn is None:
+            return jsonify({'message': 'Koneksi database gagal'}), 503
+        try:
+            user = get_user_by_id_model(conn, current_user_id)
+        finally:
+            conn.close()
+
+        if not user or user['role'] != 'admin':
+            return jsonify({'message': 'Hanya admin yang boleh mengakses endpoint ini!'}), 403
+
+        return f(current_user_id, *args, **kwargs)
+
+    return decorated
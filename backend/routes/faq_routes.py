@@ -1,5 +1,6 @@
 from flask import Blueprint, jsonify, request
 from db import get_connection
+from conditional import conditional_get
 from models.faq_model import (
     get_all_faqs_model,
     add_faq_model,
@@ -15,8 +16,9 @@ def get_faqs():
     conn = None
     try:
         conn = get_connection()
-        faqs = get_all_faqs_model(conn)
-        return jsonify(faqs)
+        if conn is None:
+            return jsonify({"error": "Koneksi database gagal"}), 503
+        return conditional_get(conn, ["faq"], lambda versions: jsonify(get_all_faqs_model(conn, versions)))
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     finally:
@@ -33,6 +35,8 @@ def add_faq():
             return jsonify({"error": "Data tidak lengkap"}), 400
         
         conn = get_connection()
+        if conn is None:
+            return jsonify({"error": "Koneksi database gagal"}), 503
         new_faq_id = add_faq_model(conn, data)
         return jsonify({"message": "FAQ berhasil ditambahkan", "id": new_faq_id}), 201
     except Exception as e:
@@ -51,6 +55,8 @@ def update_faq(faq_id):
             return jsonify({"error": "Data tidak lengkap"}), 400
 
         conn = get_connection()
+        if conn is None:
+            return jsonify({"error": "Koneksi database gagal"}), 503
         affected_rows = update_faq_model(conn, faq_id, data)
         if affected_rows == 0:
             return jsonify({"error": "FAQ tidak ditemukan"}), 404
@@ -67,6 +73,8 @@ def delete_faq(faq_id):
     conn = None
     try:
         conn = get_connection()
+        if conn is None:
+            return jsonify({"error": "Koneksi database gagal"}), 503
         affected_rows = delete_faq_model(conn, faq_id)
         if affected_rows == 0:
             return jsonify({"error": "FAQ tidak ditemukan"}), 404
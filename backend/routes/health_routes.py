@@ -0,0 +1,64 @@
+from flask import Blueprint, jsonify
+from db import get_pool_stats, get_replica_stats
+from inference_batcher import get_batcher_stats
+from inference_pool import inference_pool
+from broadcaster import sensor_broadcaster
+from ingest import monitoring_writer
+from model_registry import model_registry
+from cache import cache
+from monitoring_archive import monitoring_archive
+from routes.lstm_predict_routes import trend_cache, trend_stream
+
+health_bp = Blueprint('health_bp', __name__)
+
+# GET /api/health/db
+@health_bp.route('/db', methods=['GET'])
+def get_db_pool_stats():
+    """Statistik connection pool database (in-use, waits, wait time)."""
+    return jsonify(get_pool_stats()), 200
+
+# GET /api/health/replicas
+@health_bp.route('/replicas', methods=['GET'])
+def get_db_replica_stats():
+    """Status read replica: sehat/dilewati, jumlah baca, failover, dan baca yang diarahkan ke primary."""
+    return jsonify(get_replica_stats()), 200
+
+# GET /api/health/inference
+@health_bp.route('/inference', methods=['GET'])
+def get_inference_stats():
+    """Statistik micro-batching, pool proses inferensi, cache prediksi tren, dan state LSTM streaming."""
+    return jsonify({
+        **get_batcher_stats(),
+        "pool": inference_pool.stats(),
+        "trend_cache": trend_cache.stats(),
+        "trend_stream": trend_stream.stats()
+    }), 200
+
+# GET /api/health/streams
+@health_bp.route('/streams', methods=['GET'])
+def get_stream_stats():
+    """Jumlah subscriber SSE dan event yang sudah disiarkan."""
+    return jsonify({"sensors": sensor_broadcaster.stats()}), 200
+
+# GET /api/health/ingest
+@health_bp.route('/ingest', methods=['GET'])
+def get_ingest_stats():
+    """Statistik writer monitoring: kedalaman antrean, batch, dan kegagalan."""
+    return jsonify(monitoring_writer.stats()), 200
+
+# GET /api/health/models
+@health_bp.route('/models', methods=['GET'])
+def get_model_stats():
+    """Status model di registry: sudah dimuat atau belum, waktu muat, dan memori."""
+    return jsonify(model_registry.stats()), 200
+
+# GET /api/health/cache
+@health_bp.route('/cache', methods=['GET'])
+def get_cache_stats():
+    """Statistik cache read-through: hit, miss, eviksi, dan invalidasi."""
+    return jsonify(cache.stats()), 200
+
+@health_bp.route('/archive', methods=['GET'])
+def get_archive_stats():
+    """Statistik arsip monitoring: jumlah file, ukuran, batas rentang terarsip, dan pembacaan."""
+    return jsonify(monitoring_archive.stats()), 200
@@ -1,74 +1,297 @@
 from flask import Blueprint, request, jsonify
 import numpy as np
-from tensorflow.keras.models import load_model
-from tensorflow.keras.losses import MeanSquaredError # <-- 1. WAJIB TAMBAHKAN IMPOR INI
-from sklearn.preprocessing import StandardScaler
-import joblib
 import os
+import threading
+from collections import OrderedDict
+from db import get_connection, get_read_connection
+from models.lstm_engine import LSTMEngine, ArrayScaler
+from models.monitoring_model import get_latest_readings_model
+from inference_batcher import MicroBatcher
+from inference_pool import inference_pool, ModelUnavailable
+from ingest import monitoring_writer
+from trend_stream import StreamingTrend, LSTM_STREAM_ENABLED, LSTM_STREAM_MAX_USERS
+from model_registry import model_registry
+from metrics import timed_stage
+import model_store
+from .auth_routes import token_required
 
 # Definisikan Blueprint
 lstm_predict_bp = Blueprint('lstm_predict_bp', __name__)
 
-# --- Muat Model dan Scaler ---
-model = None
-scaler = None
+# 'numpy' (default) memakai LSTMEngine tanpa TensorFlow; 'keras' memakai tensorflow.keras
+LSTM_BACKEND = os.getenv('LSTM_BACKEND', 'numpy').lower()
+
+# Micro-batching: permintaan yang datang bersamaan digabung menjadi satu predict
+LSTM_BATCH_MAX_SIZE = int(os.getenv('LSTM_BATCH_MAX_SIZE', '64'))
+LSTM_BATCH_MAX_WAIT_MS = float(os.getenv('LSTM_BATCH_MAX_WAIT_MS', '2'))
+LSTM_BATCH_TIMEOUT = float(os.getenv('LSTM_BATCH_TIMEOUT', '5'))
+WINDOW_SIZE = 3
+
+# Jumlah pasien yang hasil prediksinya disimpan di memori (LRU)
+TREND_CACHE_SIZE = int(os.getenv('TREND_CACHE_SIZE', '1024'))
+
+
+def _load_keras_model(model_path):
+    """Fallback opsional: memuat model dengan TensorFlow/Keras."""
+    from tensorflow.keras.models import load_model
+    from tensorflow.keras.losses import MeanSquaredError
+    # Tambahkan custom_objects untuk membantu Keras mengenali 'mse'
+    return load_model(model_path, custom_objects={'mse': MeanSquaredError()})
+
+
+# --- Muat Model dan Scaler (lazy, lewat model_registry) ---
+def _load_lstm(use_store=True):
+    """
+    Loader registry: pasangan (model, scaler), atau None jika file model tidak ada.
+    Versi aktif di model store diutamakan; file di folder models/ menjadi fallback.
+    """
+    if use_store and LSTM_BACKEND != 'keras':
+        loaded = model_store.load_model('lstm_glucose_trend')
+        if loaded is not None:
+            return loaded
 
-try:
     base_dir = os.path.dirname(os.path.abspath(__file__))
     model_path = os.path.join(base_dir, '..', 'models', 'model_lstm.h5')
     scaler_path = os.path.join(base_dir, '..', 'models', 'scaler.joblib')
 
-    if os.path.exists(model_path):
-        # --- 2. WAJIB UBAH BARIS INI ---
-        # Tambahkan custom_objects untuk membantu Keras mengenali 'mse'
-        model = load_model(model_path, custom_objects={'mse': MeanSquaredError()})
-        print("SUCCESS: Model LSTM berhasil dimuat.")
+    if not os.path.exists(model_path):
+        print("WARNING: File model_lstm.h5 tidak ditemukan.")
+        return None
 
-        if os.path.exists(scaler_path):
-            scaler = joblib.load(scaler_path)
-            print("SUCCESS: Scaler berhasil dimuat dari file.")
-        else:
-            # Fallback jika file scaler.joblib tidak ada
-            scaler = StandardScaler()
-            plausible_glucose_range = np.array(range(40, 400)).reshape(-1, 1)
-            scaler.fit(plausible_glucose_range)
-            print("WARNING: Menggunakan scaler estimasi.")
+    if LSTM_BACKEND == 'keras':
+        model = _load_keras_model(model_path)
+        print("SUCCESS: Model LSTM berhasil dimuat (Keras).")
     else:
-        print("WARNING: File model_lstm.h5 tidak ditemukan.")
+        try:
+            model = LSTMEngine.from_h5(model_path)
+            print("SUCCESS: Model LSTM berhasil dimuat (NumPy).")
+        except Exception as e:
+            print(f"WARNING: LSTMEngine gagal memuat model ({e}), mencoba Keras.")
+            model = _load_keras_model(model_path)
+            print("SUCCESS: Model LSTM berhasil dimuat (Keras).")
+
+    if os.path.exists(scaler_path):
+        import joblib
+        scaler = joblib.load(scaler_path)
+        print("SUCCESS: Scaler berhasil dimuat dari file.")
+    else:
+        # Fallback jika file scaler.joblib tidak ada
+        plausible_glucose_range = np.array(range(40, 400)).reshape(-1, 1)
+        scaler = ArrayScaler.fit(plausible_glucose_range)
+        print("WARNING: Menggunakan scaler estimasi.")
+    return model, scaler
 
-except Exception as e:
-    print(f"ERROR: Gagal memuat model atau scaler: {e}")
+model_registry.register('lstm_glucose_trend', _load_lstm)
+
+def _get_lstm():
+    return model_registry.get('lstm_glucose_trend')
 # ----------------------------------------------------
 
 
+def _predict_trend_batch(windows):
+    """Satu kali transform / predict / inverse_transform untuk semua jendela dalam batch."""
+    model, scaler = _get_lstm()
+    X = np.asarray(windows, dtype=np.float64)
+    with timed_stage('scaler_transform', 'lstm_glucose_trend'):
+        scaled_input = scaler.transform(X.reshape(-1, 1))
+    X_new = scaled_input.reshape(len(windows), WINDOW_SIZE, 1)
+
+    with timed_stage('predict', 'lstm_glucose_trend'):
+        predicted_scaled = model.predict(X_new, verbose=0)
+    with timed_stage('inverse_transform', 'lstm_glucose_trend'):
+        return scaler.inverse_transform(predicted_scaled)
+
+def trend_kernel(windows):
+    """Kernel pool inferensi (berjalan di proses worker): matriks jendela -> prediksi."""
+    if _get_lstm() is None:
+        raise ModelUnavailable("Model tren glukosa tidak tersedia")
+    return np.asarray(_predict_trend_batch(windows), dtype=np.float64)
+
+# Batch yang dikumpulkan batcher dikirim sekaligus ke pool inferensi
+trend_batcher = MicroBatcher(
+    'lstm_glucose_trend',
+    lambda windows: inference_pool.run('lstm_glucose_trend', np.asarray(windows, dtype=np.float64)),
+    max_batch_size=LSTM_BATCH_MAX_SIZE,
+    max_wait_ms=LSTM_BATCH_MAX_WAIT_MS
+)
+
+# State LSTM per pasien: dimajukan satu langkah setiap ada pembacaan baru
+trend_stream = StreamingTrend(WINDOW_SIZE, LSTM_STREAM_MAX_USERS)
+
+def _stream_new_readings(records):
+    """Listener commit writer: memajukan state streaming untuk pembacaan yang baru tersimpan."""
+    loaded = _get_lstm()
+    if loaded is None or not trend_stream.bind(*loaded):
+        return
+
+    by_user = {}
+    for user_id, glucose, _, timestamp in records:
+        by_user.setdefault(user_id, []).append((timestamp, glucose))
+
+    # Pasien tanpa state (baru, ter-evict, atau setelah restart) diisi ulang dari
+    # WINDOW_SIZE pembacaan terakhir di database, yang sudah memuat batch ini
+    cold = [uid for uid in by_user if not trend_stream.has_user(uid)]
+    if cold:
+        conn = get_connection()
+        if conn is None:
+            for uid in cold:
+                del by_user[uid]
+        else:
+            cursor = conn.cursor(dictionary=True)
+            try:
+                for uid in cold:
+                    history = get_latest_readings_model(cursor, uid, WINDOW_SIZE)
+                    by_user[uid] = [(row['timestamp'], row['glucose_level']) for row in history]
+            finally:
+                cursor.close()
+                conn.close()
+
+    trend_stream.advance(by_user)
+
+if LSTM_STREAM_ENABLED and LSTM_BACKEND != 'keras':
+    monitoring_writer.add_commit_listener(_stream_new_readings)
+
+
+class _TrendCache:
+    """
+    Cache prediksi per pasien. Kuncinya adalah id baris-baris jendela input,
+    sehingga entri otomatis tidak berlaku lagi begitu ada pembacaan baru
+    (atau pembacaan dalam jendela dihapus), dari jalur tulis mana pun.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id, window_key):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] == window_key:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def put(self, user_id, window_key, result):
+        with self._lock:
+            self._entries[user_id] = (window_key, result)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+trend_cache = _TrendCache(TREND_CACHE_SIZE)
+
+
+def _trend_response(predicted_glucose):
+    return {
+        "message": "Prediksi tren glukosa untuk 5 hari ke depan berhasil.",
+        "predictions": [round(float(val), 2) for val in predicted_glucose],
+        "average_prediction": round(float(np.mean(predicted_glucose)), 2)
+    }
+
+
 @lstm_predict_bp.route('/glucose-trend', methods=['POST'])
 def predict_glucose_trend():
-    # Sisa kode di bawah ini tidak perlu diubah
-    if model is None or scaler is None:
+    if not inference_pool.available('lstm_glucose_trend'):
         return jsonify({"error": "Layanan prediksi tren glukosa tidak tersedia di server."}), 503
 
     try:
         data = request.json
         glucose_readings = data.get('glucose_readings')
 
-        if not glucose_readings or len(glucose_readings) != 3:
+        if not glucose_readings or len(glucose_readings) != WINDOW_SIZE:
             return jsonify({"error": "Input tidak valid. Harap berikan 3 nilai glukosa terakhir."}), 400
 
-        input_data = np.array(glucose_readings).reshape(-1, 1)
-        scaled_input = scaler.transform(input_data)
-        X_new = scaled_input.reshape(1, 3, 1)
+        # Validasi di sini agar satu input buruk tidak menggagalkan seluruh batch
+        try:
+            window = [float(val) for val in glucose_readings]
+        except (TypeError, ValueError):
+            return jsonify({"error": "Input tidak valid. Nilai glukosa harus berupa angka."}), 400
 
-        predicted_scaled = model.predict(X_new)
-        predicted_glucose = scaler.inverse_transform(predicted_scaled)[0]
+        predicted_glucose = trend_batcher.predict(window, timeout=LSTM_BATCH_TIMEOUT)
 
-        response_data = {
-            "message": "Prediksi tren glukosa untuk 5 hari ke depan berhasil.",
-            "predictions": [round(float(val), 2) for val in predicted_glucose],
-            "average_prediction": round(float(np.mean(predicted_glucose)), 2)
-        }
-        
-        return jsonify(response_data), 200
+        return jsonify(_trend_response(predicted_glucose)), 200
 
+    except ModelUnavailable:
+        return jsonify({"error": "Layanan prediksi tren glukosa tidak tersedia di server."}), 503
+    except TimeoutError:
+        print("Error saat prediksi tren glukosa: antrean inferensi melewati batas waktu")
+        return jsonify({"error": "Layanan prediksi sedang sibuk, silakan coba lagi."}), 503
     except Exception as e:
         print(f"Error saat prediksi tren glukosa: {e}")
-        return jsonify({"error": "Terjadi kesalahan internal saat melakukan prediksi."}), 500
\ No newline at end of file
+        return jsonify({"error": "Terjadi kesalahan internal saat melakukan prediksi."}), 500
+
+
+@lstm_predict_bp.route('/glucose-trend/me', methods=['GET'])
+@token_required
+def predict_my_glucose_trend(current_user_id):
+    """
+    Prediksi tren dari riwayat tersimpan milik pengguna yang login.
+    Hanya WINDOW_SIZE pembacaan terakhir yang dibaca dari database; hasil
+    prediksi di-cache sampai ada pembacaan baru untuk pengguna tersebut.
+    """
+    conn = None
+    cursor = None
+    try:
+        conn = get_read_connection(current_user_id)
+        if conn is None:
+            return jsonify({"error": "Koneksi database gagal"}), 503
+        cursor = conn.cursor(dictionary=True)
+        history = get_latest_readings_model(cursor, current_user_id, WINDOW_SIZE)
+    except Exception as e:
+        print(f"Error saat mengambil riwayat untuk prediksi tren: {e}")
+        return jsonify({"error": "Gagal memuat data riwayat."}), 500
+    finally:
+        if cursor:
+            cursor.close()
+        if conn and conn.is_connected():
+            conn.close()
+
+    if len(history) < WINDOW_SIZE:
+        return jsonify({
+            "error": f"Minimal {WINDOW_SIZE} data pemeriksaan diperlukan untuk prediksi tren.",
+            "history": history
+        }), 400
+
+    # Versi model ikut menjadi kunci agar cache tidak menyajikan hasil model lama
+    # (model dimuat di worker inferensi, jadi versinya diperiksa di sini)
+    model_registry.refresh()
+    window_key = (model_registry.version,) + tuple(row['id'] for row in history)
+    result = trend_cache.get(current_user_id, window_key)
+    if result is None:
+        # Prediksi yang sudah dihitung saat ingest dipakai jika jendelanya sama persis
+        streamed = trend_stream.get(current_user_id, history)
+        if streamed is not None:
+            result = _trend_response(streamed)
+            trend_cache.put(current_user_id, window_key, result)
+    cached = result is not None
+    if not cached:
+        if not inference_pool.available('lstm_glucose_trend'):
+            return jsonify({"error": "Layanan prediksi tren glukosa tidak tersedia di server."}), 503
+        try:
+            window = [float(row['glucose_level']) for row in history]
+            result = _trend_response(trend_batcher.predict(window, timeout=LSTM_BATCH_TIMEOUT))
+        except ModelUnavailable:
+            return jsonify({"error": "Layanan prediksi tren glukosa tidak tersedia di server."}), 503
+        except TimeoutError:
+            print("Error saat prediksi tren glukosa: antrean inferensi melewati batas waktu")
+            return jsonify({"error": "Layanan prediksi sedang sibuk, silakan coba lagi."}), 503
+        except Exception as e:
+            print(f"Error saat prediksi tren glukosa: {e}")
+            return jsonify({"error": "Terjadi kesalahan internal saat melakukan prediksi."}), 500
+        trend_cache.put(current_user_id, window_key, result)
+
+    return jsonify({**result, "history": history, "cached": cached}), 200
@@ -1,103 +1,264 @@
 # File: routes/ml_routes.py
 
-from flask import Blueprint, request, jsonify
-import joblib
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+import csv
 import numpy as np
+import io
+import json
 import os # Pastikan 'os' sudah diimpor
+from db import get_connection, get_read_connection
+from models.risk_scoring import parse_record, predict_features, score_rows_with
+from models.risk_model import upsert_risk_inputs_model, get_population_summary_model
+from models.user_model import get_user_by_id_model, is_patient_model
+from risk_job import risk_job
+from models.forest_engine import FlatForest
+from models.lstm_engine import ArrayScaler
+from model_registry import model_registry
+from inference_pool import inference_pool, ModelUnavailable
+import model_store
+from .auth_routes import token_required, admin_required, optional_user_id
 
 ml_bp = Blueprint("ml", __name__)
 
-# --- Gunakan kode ini untuk memuat model ---
-try:
+# Jumlah baris yang dinilai sekaligus pada mode batch
+ML_BATCH_CHUNK_SIZE = int(os.getenv('ML_BATCH_CHUNK_SIZE', '512'))
+
+# --- Gunakan kode ini untuk memuat model (lazy, lewat model_registry) ---
+def _load_risk_model(use_store=True):
+    """
+    Loader registry: pasangan (model, scaler), atau None jika file tidak ditemukan.
+    Versi aktif di model store diutamakan; file di folder models/ menjadi fallback.
+    """
+    if use_store:
+        loaded = model_store.load_model('risk_rf')
+        if loaded is not None:
+            return loaded
+
+    import joblib
+
     # Mendapatkan path absolut dari direktori tempat file ini berada (/routes)
     base_dir = os.path.dirname(os.path.abspath(__file__))
-    
+
     # Membangun path ke file model ('..' naik satu direktori, lalu masuk ke /models/)
     # Pastikan nama folder adalah 'models' (dengan 's')
     model_path = os.path.join(base_dir, '..', 'models', 'best_rf_model.pkl')
+    flat_model_path = os.path.join(base_dir, '..', 'models', 'best_rf_model.npz')
     scaler_path = os.path.join(base_dir, '..', 'models', 'scaler.pkl')
 
-    # Memuat file menggunakan path absolut
-    model = joblib.load(model_path)
-    scaler = joblib.load(scaler_path)
+    try:
+        # Memuat file menggunakan path absolut.
+        # Forest hasil ekspor (python -m models.forest_engine export) dipakai jika ada;
+        # jika belum, pkl sklearn diratakan saat dimuat.
+        if os.path.exists(flat_model_path):
+            model = FlatForest.load(flat_model_path)
+        else:
+            model = joblib.load(model_path)
+            try:
+                model = FlatForest.from_sklearn(model)
+            except (AttributeError, ValueError) as e:
+                print(f"WARNING: Model tidak bisa diratakan ({e}), memakai evaluator sklearn.")
+        scaler = joblib.load(scaler_path)
+    except FileNotFoundError:
+        print("WARNING: Gagal memuat model atau scaler. Periksa kembali path dan nama file.")
+        return None
+
+    if type(scaler).__name__ == 'StandardScaler':
+        # Hindari validasi sklearn per panggilan; hasilnya identik
+        scaler = ArrayScaler(
+            scaler.mean_ if scaler.with_mean else 0.0,
+            scaler.scale_ if scaler.with_std else 1.0
+        )
     print("SUCCESS: Model dan scaler prediksi berhasil dimuat.")
+    return model, scaler
 
-except FileNotFoundError:
-    model = None
-    scaler = None
-    print("WARNING: Gagal memuat model atau scaler. Periksa kembali path dan nama file.")
+model_registry.register('risk_rf', _load_risk_model)
 # --- Akhir bagian pemuatan model ---
 
 
+def risk_kernel(features):
+    """Kernel pool inferensi (berjalan di proses worker): matriks fitur -> (kelas, probabilitas)."""
+    loaded = model_registry.get('risk_rf')
+    if loaded is None:
+        raise ModelUnavailable("Model prediksi risiko tidak tersedia")
+    predictions, probabilities = predict_features(loaded[0], loaded[1], features)
+    return np.asarray(predictions), np.asarray(probabilities, dtype=np.float64)
+
+def _predict_risk(features):
+    return inference_pool.run('risk_rf', features)
+
+
 @ml_bp.route("/predict", methods=["POST"])
 def predict():
-    if model is None or scaler is None:
+    """
+    Prediksi risiko satu pasien. Jika pemanggil login, input disimpan untuk job
+    skor populasi: milik pasien itu sendiri, atau milik pasien "user_id" di body
+    saat admin melakukan skrining.
+    """
+    if not inference_pool.available('risk_rf'):
         return jsonify({"error": "Model prediksi tidak tersedia di server"}), 503
 
     try:
         data_json = request.json
-        
-        gender = int(data_json["gender"])
-        age = int(data_json["age"])
-        hypertension = int(data_json["hypertension"])
-        heart_disease = int(data_json["heart_disease"])
-        smoking_history = int(data_json["smoking_history"])
-        berat = float(data_json["berat"])
-        tinggi = float(data_json["tinggi"])
-        hba1c = float(data_json["hba1c_level"])
-        glucose = float(data_json["blood_glucose"])
-
-        tinggi_m = tinggi / 100
-        bmi = round(berat / (tinggi_m ** 2), 2)
-
-        data_to_predict = np.array([[gender, age, hypertension, heart_disease, smoking_history, bmi, hba1c, glucose]])
-        scaled_data = scaler.transform(data_to_predict)
-        prediction = model.predict(scaled_data)[0]
-
-        risk_factors = []
-        if hba1c >= 6.5:
-            risk_factors.append({"feature": "HbA1c", "value": f"{hba1c}%", "status": "Tinggi"})
-        elif hba1c < 4.0:
-            risk_factors.append({"feature": "HbA1c", "value": f"{hba1c}%", "status": "Rendah"})
-
-        if glucose >= 140:
-            risk_factors.append({"feature": "Glukosa", "value": f"{glucose} mg/dL", "status": "Tinggi"})
-        elif glucose < 70:
-            risk_factors.append({"feature": "Glukosa", "value": f"{glucose} mg/dL", "status": "Rendah"})
-
-        if bmi >= 25:
-            risk_factors.append({"feature": "BMI", "value": f"{bmi}", "status": "Overweight"})
-        elif bmi < 18.5:
-            risk_factors.append({"feature": "BMI", "value": f"{bmi}", "status": "Kurus"})
-
-        if age >= 45:
-            risk_factors.append({"feature": "Usia", "value": f"{age} tahun", "status": "Risiko usia"})
-
-        if hypertension == 1:
-            risk_factors.append({"feature": "Hipertensi", "value": "Ya", "status": "Berisiko"})
-        if heart_disease == 1:
-            risk_factors.append({"feature": "Penyakit Jantung", "value": "Ya", "status": "Berisiko"})
-
-        if smoking_history == 1:
-            risk_factors.append({"feature": "Riwayat Merokok", "value": "Ya", "status": "Risiko tambahan"})
-
-        hasil_prediksi = {
-            "prediction_code": int(prediction),
-            "result": "Risiko Tinggi" if prediction == 1 else "Risiko Rendah",
-            "message": "Prediksi berhasil dihitung.",
-            "risk_factors": risk_factors,
-            "probability": 100 if prediction == 1 else 0
-        }
-
+        row = parse_record(data_json)
+        patient_id = data_json.get('user_id')
+        patient_id = int(patient_id) if patient_id is not None else None
+        hasil_prediksi = score_rows_with(_predict_risk, [row])[0]
+        current_user_id = optional_user_id()
+        if current_user_id is not None:
+            _save_risk_inputs(current_user_id, patient_id, row)
         return jsonify(hasil_prediksi), 200
 
-    except Exception as e:
-        print(f"Terjadi kesalahan saat prediksi: {str(e)}")
-        return jsonify({"error": f"Kesalahan internal server: {str(e)}"}), 500
     except KeyError as e:
         return jsonify({"error": f"Data input tidak lengkap, field '{str(e)}' tidak ditemukan."}), 400
     except (ValueError, TypeError) as e:
         return jsonify({"error": f"Tipe data salah: {str(e)}"}), 400
+    except ModelUnavailable:
+        return jsonify({"error": "Model prediksi tidak tersedia di server"}), 503
+    except TimeoutError:
+        print("Error saat prediksi: pool inferensi melewati batas waktu")
+        return jsonify({"error": "Layanan prediksi sedang sibuk, silakan coba lagi."}), 503
     except Exception as e:
         print(f"Terjadi kesalahan saat prediksi: {str(e)}")
-        return jsonify({"error": f"Terjadi kesalahan internal di server: {str(e)}"}), 500
\ No newline at end of file
+        return jsonify({"error": f"Terjadi kesalahan internal di server: {str(e)}"}), 500
+
+
+def _save_risk_inputs(current_user_id, patient_id, row):
+    """
+    Menyimpan input terakhir pasien untuk job skor populasi; gagal simpan tidak
+    menggagalkan prediksi. Input disimpan di bawah pasien yang dinilai, bukan di
+    bawah pemanggil: patient_id lain hanya boleh dipakai admin, dan target harus
+    pasien terdaftar (admin tanpa patient_id tidak menyimpan apa pun).
+    """
+    user_id = patient_id if patient_id is not None else current_user_id
+    conn = get_connection()
+    if conn is None:
+        return
+    cursor = conn.cursor()
+    try:
+        if user_id != current_user_id:
+            caller = get_user_by_id_model(conn, current_user_id)
+            if not caller or caller['role'] != 'admin':
+                print(f"WARNING: User {current_user_id} bukan admin, input risiko user {user_id} tidak disimpan.")
+                return
+        if not is_patient_model(cursor, user_id):
+            return
+        upsert_risk_inputs_model(cursor, user_id, row)
+        conn.commit()
+    except Exception as e:
+        print(f"Gagal menyimpan input risiko user {user_id}: {e}")
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def _iter_batch_records():
+    """
+    Membaca record dari body request secara bertahap.
+    - application/json: array of object
+    - text/csv atau multipart (field 'file'): dibaca baris per baris dari stream
+    """
+    if request.files.get("file") is not None:
+        stream = io.TextIOWrapper(request.files["file"].stream, encoding="utf-8-sig", newline="")
+        yield from csv.DictReader(stream)
+    elif request.mimetype == "text/csv":
+        stream = io.TextIOWrapper(request.stream, encoding="utf-8-sig", newline="")
+        yield from csv.DictReader(stream)
+    else:
+        records = request.get_json(silent=True)
+        if not isinstance(records, list):
+            raise ValueError("Body harus berupa array JSON atau file CSV.")
+        yield from records
+
+
+def _score_chunk(chunk):
+    """Menilai satu chunk; baris yang tidak valid dilaporkan tanpa menggagalkan chunk."""
+    valid_rows = []
+    valid_index = []
+    output = {}
+    for index, record in chunk:
+        try:
+            valid_rows.append(parse_record(record))
+            valid_index.append(index)
+        except KeyError as e:
+            output[index] = {"row": index, "error": f"Data input tidak lengkap, field '{str(e)}' tidak ditemukan."}
+        except (ValueError, TypeError, AttributeError) as e:
+            output[index] = {"row": index, "error": f"Tipe data salah: {str(e)}"}
+
+    for index, result in zip(valid_index, score_rows_with(_predict_risk, valid_rows)):
+        output[index] = {"row": index, **result}
+
+    for index, _ in chunk:
+        yield output[index]
+
+
+@ml_bp.route("/predict/batch", methods=["POST"])
+def predict_batch():
+    """
+    Prediksi banyak pasien sekaligus (array JSON atau upload CSV).
+    Data diproses per chunk agar memori tetap datar, dan hasil dikirim
+    sebagai NDJSON (satu objek JSON per baris) segera setelah tiap chunk selesai.
+    """
+    if not inference_pool.available('risk_rf'):
+        return jsonify({"error": "Model prediksi tidak tersedia di server"}), 503
+
+    def generate():
+        chunk = []
+        try:
+            for index, record in enumerate(_iter_batch_records()):
+                chunk.append((index, record))
+                if len(chunk) >= ML_BATCH_CHUNK_SIZE:
+                    for result in _score_chunk(chunk):
+                        yield json.dumps(result) + "\n"
+                    chunk = []
+            if chunk:
+                for result in _score_chunk(chunk):
+                    yield json.dumps(result) + "\n"
+        except Exception as e:
+            print(f"Terjadi kesalahan saat prediksi batch: {str(e)}")
+            yield json.dumps({"error": f"Prediksi batch dihentikan: {str(e)}"}) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+@ml_bp.route("/population", methods=["GET"])
+@token_required
+@admin_required
+def get_population_risk(current_user_id):
+    """Distribusi risiko seluruh pasien dari skor prakomputasi (tanpa inferensi)."""
+    conn = None
+    cursor = None
+    try:
+        conn = get_read_connection(current_user_id)
+        if conn is None:
+            return jsonify({"error": "Koneksi database gagal"}), 503
+        cursor = conn.cursor(dictionary=True)
+        summary = get_population_summary_model(cursor)
+        summary["job"] = risk_job.status()
+        return jsonify(summary), 200
+    except Exception as e:
+        print(f"Error saat mengambil distribusi risiko: {e}")
+        return jsonify({"error": "Gagal mengambil distribusi risiko"}), 500
+    finally:
+        if cursor:
+            cursor.close()
+        if conn and conn.is_connected():
+            conn.close()
+
+
+@ml_bp.route("/population/score", methods=["POST"])
+@token_required
+@admin_required
+def score_population(current_user_id):
+    """
+    Menjalankan job skor risiko di latar belakang.
+    Body opsional {"full": true} untuk menilai ulang semua pasien.
+    """
+    loaded = model_registry.get('risk_rf')
+    if loaded is None:
+        return jsonify({"error": "Model prediksi tidak tersedia di server"}), 503
+    model, scaler = loaded
+
+    full = bool((request.get_json(silent=True) or {}).get("full", False))
+    if not risk_job.start_background(model, scaler, model_registry.version or 'local', full=full):
+        return jsonify({"error": "Job skor risiko sedang berjalan", "job": risk_job.status()}), 409
+    return jsonify({"message": "Job skor risiko dimulai.", "full": full}), 202
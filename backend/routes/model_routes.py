@@ -0,0 +1,43 @@
+from flask import Blueprint, jsonify, request
+import model_store
+from model_registry import model_registry
+from .auth_routes import token_required, admin_required
+
+model_bp = Blueprint('model_bp', __name__)
+
+# GET /api/models/versions
+@model_bp.route('/versions', methods=['GET'])
+@token_required
+@admin_required
+def get_model_versions(current_user_id):
+    """Daftar versi di model store beserta versi yang sedang aktif."""
+    return jsonify({
+        "active_version": model_store.active_version(),
+        "versions": model_store.list_versions()
+    }), 200
+
+# POST /api/models/activate
+@model_bp.route('/activate', methods=['POST'])
+@token_required
+@admin_required
+def activate_model_version(current_user_id):
+    """
+    Mengganti versi model aktif secara atomik. Permintaan yang sedang berjalan
+    selesai dengan model lama; worker lain mengikuti dalam MODEL_VERSION_CHECK_INTERVAL.
+    """
+    data = request.get_json(silent=True) or {}
+    version = data.get('version')
+    if not version:
+        return jsonify({"error": "Field 'version' diperlukan"}), 400
+
+    try:
+        model_store.activate(version)
+    except model_store.ModelStoreError as e:
+        return jsonify({"error": str(e)}), 400
+    except OSError as e:
+        print(f"Error saat mengaktifkan versi model: {e}")
+        return jsonify({"error": "Gagal menulis versi aktif"}), 500
+
+    # Proses ini langsung memakai versi baru; model dimuat saat dipakai berikutnya
+    model_registry.refresh(force=True)
+    return jsonify({"message": f"Versi model '{version}' diaktifkan.", "active_version": version}), 200
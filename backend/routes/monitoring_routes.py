@@ -1,31 +1,263 @@
-from flask import Blueprint, jsonify, request
-from db import get_connection
-from datetime import datetime
-from .auth_routes import token_required
+from flask import Blueprint, Response, jsonify, request
+from werkzeug.exceptions import RequestEntityTooLarge
+from db import get_connection, get_read_connection, mark_write
+from datetime import datetime, timedelta
+import base64
+import os
+import time
+from models.monitoring_model import (
+    add_monitoring_records_model,
+    get_existing_timestamps_model,
+    get_monitoring_page_model,
+    iter_monitoring_export_model,
+)
+from models.rollup_model import RESOLUTIONS, get_rollup_series_model, rebuild_rollup_buckets_model, upsert_rollups_model
+from models.user_model import get_user_by_id_model
+from downsample import lttb
+from models.version_model import bump_versions_model, monitoring_scope
+from conditional import conditional_get
+from ingest import monitoring_writer, IngestQueueFull, validate_reading
+from monitoring_archive import monitoring_archive
+from export import EXPORT_FORMATS, csv_chunks, parquet_available, parquet_chunks
+import bulk_import
+from .auth_routes import token_required, admin_required
 
 monitoring_bp = Blueprint('monitoring_bp', __name__)
 
+# Batas ukuran halaman untuk keyset pagination
+MONITORING_DEFAULT_LIMIT = int(os.getenv('MONITORING_DEFAULT_LIMIT', '100'))
+MONITORING_MAX_LIMIT = int(os.getenv('MONITORING_MAX_LIMIT', '1000'))
+
+# Anggaran titik untuk endpoint series (grafik)
+SERIES_DEFAULT_POINTS = int(os.getenv('SERIES_DEFAULT_POINTS', '300'))
+SERIES_MAX_POINTS = int(os.getenv('SERIES_MAX_POINTS', '5000'))
+SERIES_RAW_MAX_ROWS = int(os.getenv('SERIES_RAW_MAX_ROWS', '20000'))
+SERIES_DEFAULT_DAYS = int(os.getenv('SERIES_DEFAULT_DAYS', '7'))
+
+# Batas waktu menunggu commit batch saat menyimpan monitoring (detik)
+INGEST_COMMIT_TIMEOUT = float(os.getenv('INGEST_COMMIT_TIMEOUT', '5'))
+
+# Jumlah baris per batch ekspor (satu chunk CSV / satu row group Parquet)
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '5000'))
+
+# Jumlah baris per INSERT multi-baris saat impor massal
+IMPORT_CHUNK_ROWS = int(os.getenv('IMPORT_CHUNK_ROWS', '5000'))
+
+
+def _encode_cursor(row):
+    """Membuat cursor opaque dari (timestamp, id) baris terakhir."""
+    ts = row['timestamp']
+    ts_str = ts.isoformat(sep=' ') if isinstance(ts, datetime) else str(ts)
+    raw = f"{ts_str}|{row['id']}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def _decode_cursor(value):
+    padded = value + '=' * (-len(value) % 4)
+    ts_str, row_id = base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+    return datetime.fromisoformat(ts_str), int(row_id)
+
+def _parse_datetime(value, is_end=False):
+    """Menerima 'YYYY-MM-DD' atau ISO datetime. Tanggal saja pada 'end' berarti sampai akhir hari itu."""
+    parsed = datetime.fromisoformat(value)
+    if is_end and len(value) == 10:
+        parsed += timedelta(days=1)
+    return parsed
+
+def _parse_monitoring_query(args, allow_user_filter):
+    """
+    Membaca query string pagination dan filter.
+    Melempar ValueError dengan pesan yang bisa dikirim ke klien.
+    """
+    filters = {}
+    try:
+        if args.get('start'):
+            filters['start'] = _parse_datetime(args['start'])
+        if args.get('end'):
+            filters['end'] = _parse_datetime(args['end'], is_end=True)
+    except ValueError:
+        raise ValueError("Format tanggal tidak valid, gunakan YYYY-MM-DD atau ISO datetime.")
+
+    try:
+        if args.get('min_glucose'):
+            filters['min_glucose'] = float(args['min_glucose'])
+        if args.get('max_glucose'):
+            filters['max_glucose'] = float(args['max_glucose'])
+    except ValueError:
+        raise ValueError("Filter glukosa harus berupa angka.")
+
+    if allow_user_filter and args.get('user_id'):
+        try:
+            filters['user_id'] = int(args['user_id'])
+        except ValueError:
+            raise ValueError("user_id harus berupa angka.")
+
+    if args.get('cursor'):
+        try:
+            filters['after'] = _decode_cursor(args['cursor'])
+        except (ValueError, UnicodeDecodeError):
+            raise ValueError("Cursor tidak valid.")
+
+    # Tanpa 'limit' dan 'cursor' perilaku lama dipertahankan (seluruh riwayat).
+    limit = None
+    if args.get('limit'):
+        try:
+            limit = int(args['limit'])
+        except ValueError:
+            raise ValueError("limit harus berupa angka.")
+        if limit < 1:
+            raise ValueError("limit minimal 1.")
+        limit = min(limit, MONITORING_MAX_LIMIT)
+    elif 'after' in filters:
+        limit = MONITORING_DEFAULT_LIMIT
+
+    return filters, limit
+
+def _parse_series_query(args):
+    """Membaca rentang waktu, anggaran titik, resolusi, dan metode downsampling."""
+    try:
+        end = _parse_datetime(args['end'], is_end=True) if args.get('end') else datetime.now()
+        start = _parse_datetime(args['start']) if args.get('start') else end - timedelta(days=SERIES_DEFAULT_DAYS)
+    except ValueError:
+        raise ValueError("Format tanggal tidak valid, gunakan YYYY-MM-DD atau ISO datetime.")
+    if start >= end:
+        raise ValueError("start harus lebih awal dari end.")
+
+    try:
+        points = int(args.get('points', SERIES_DEFAULT_POINTS))
+    except ValueError:
+        raise ValueError("points harus berupa angka.")
+    points = max(3, min(points, SERIES_MAX_POINTS))
+
+    resolution = args.get('resolution', 'auto')
+    if resolution not in ('auto', 'raw') and resolution not in RESOLUTIONS:
+        raise ValueError("resolution harus salah satu dari auto, raw, minute, hour, day.")
+    method = args.get('downsample', 'lttb')
+    if method not in ('lttb', 'none'):
+        raise ValueError("downsample harus 'lttb' atau 'none'.")
+    return start, end, points, resolution, method
+
+def _pick_resolution(start, end, points):
+    """Resolusi rollup paling halus yang jumlah bucket-nya masih muat dalam anggaran titik."""
+    span = (end - start).total_seconds()
+    for name, seconds in sorted(RESOLUTIONS.items(), key=lambda item: item[1]):
+        if span / seconds <= points:
+            return name
+    return 'day'
+
+def _series_from_rollups(rows):
+    series = []
+    for row in rows:
+        count = row['sample_count']
+        series.append({
+            "timestamp": row['bucket_start'],
+            "count": count,
+            "glucose_mean": round(row['glucose_sum'] / count, 2),
+            "glucose_min": row['glucose_min'],
+            "glucose_max": row['glucose_max'],
+            "heart_rate_mean": round(row['heart_rate_sum'] / count, 2),
+            "heart_rate_min": row['heart_rate_min'],
+            "heart_rate_max": row['heart_rate_max'],
+        })
+    return series
+
+def _series_from_raw(rows):
+    series = []
+    # Query keyset mengembalikan urutan menurun; grafik butuh urutan naik
+    for row in reversed(rows):
+        glucose = float(row['glucose_level'])
+        heart_rate = float(row['heart_rate'])
+        series.append({
+            "timestamp": row['timestamp'],
+            "count": 1,
+            "glucose_mean": glucose,
+            "glucose_min": glucose,
+            "glucose_max": glucose,
+            "heart_rate_mean": heart_rate,
+            "heart_rate_min": heart_rate,
+            "heart_rate_max": heart_rate,
+        })
+    return series
+
+def _build_series(cursor, user_id, args):
+    """
+    Memilih resolusi sesuai rentang dan anggaran titik, lalu (opsional) LTTB
+    jika jumlah titik masih melebihi anggaran.
+    """
+    start, end, points, resolution, method = _parse_series_query(args)
+
+    series = None
+    if resolution == 'raw':
+        rows = get_monitoring_page_model(cursor, user_id=user_id, start=start, end=end,
+                                         limit=SERIES_RAW_MAX_ROWS + 1)
+        if len(rows) <= SERIES_RAW_MAX_ROWS:
+            series = _series_from_raw(rows)
+        else:
+            resolution = 'auto'
+    if series is None:
+        if resolution == 'auto':
+            resolution = _pick_resolution(start, end, points)
+        rows = get_rollup_series_model(cursor, user_id, resolution, start, end)
+        series = _series_from_rollups(rows)
+
+    downsampled = False
+    if method == 'lttb' and len(series) > points:
+        x = [item['timestamp'].timestamp() for item in series]
+        y = [item['glucose_mean'] for item in series]
+        series = [series[i] for i in lttb(x, y, points)]
+        downsampled = True
+
+    return {
+        "user_id": user_id,
+        "start": start,
+        "end": end,
+        "resolution": resolution,
+        "downsampled": downsampled,
+        "points": series,
+    }
+
+def _paginated_response(rows, limit):
+    """Memotong baris ekstra dan mengirim cursor halaman berikutnya lewat header X-Next-Cursor."""
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1])
+    response = jsonify(rows)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
 @monitoring_bp.route('/monitoring', methods=['GET'])
 @token_required  # <-- DILINDUNGI
 def get_monitoring(current_user_id): # <-- TAMBAH current_user_id
     """
-    Mengambil SEMUA data monitoring.
+    Mengambil data monitoring semua pasien.
     Endpoint ini sekarang dilindungi. 
     (Idealnya, ini hanya untuk 'admin', tapi sekarang setidaknya butuh login)
+    Query opsional: limit, cursor, start, end, user_id, min_glucose, max_glucose.
     """
+    try:
+        filters, limit = _parse_monitoring_query(request.args, allow_user_filter=True)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     conn = None
     try:
-        conn = get_connection()
+        conn = get_read_connection(current_user_id)
+        if conn is None:
+            return jsonify({"error": "Koneksi database gagal"}), 503
         cursor = conn.cursor(dictionary=True)
-        query = """
-            SELECT m.id, m.user_id, u.name AS namaPasien, m.heart_rate, m.glucose_level, m.timestamp
-            FROM monitoring m
-            JOIN users u ON m.user_id = u.id
-            ORDER BY m.timestamp DESC
-        """
-        cursor.execute(query)
-        data = cursor.fetchall()
-        return jsonify(data)
+
+        def build(versions):
+            data = get_monitoring_page_model(
+                cursor,
+                limit=limit + 1 if limit is not None else None,
+                with_name=True,
+                **filters
+            )
+            return _paginated_response(data, limit)
+
+        # namaPasien ikut berubah saat data user diperbarui, jadi cakupan 'users' disertakan
+        return conditional_get(conn, ["monitoring", "users"], build)
     except Exception as e:
         print(f"Error fetching all monitoring data: {e}")
         return jsonify({"error": "Gagal mengambil data"}), 500
@@ -47,9 +279,9 @@ def save_monitoring(current_user_id): # <-- TAMBAH current_user_id
     """
     Menyimpan data monitoring baru untuk pengguna yang sedang login.
     Data 'user_id' diambil dari token, bukan dari JSON body.
+    Penyimpanan lewat writer ber-antrean (group commit); respons dikirim
+    setelah batch yang memuat catatan ini di-commit.
     """
-    conn = None
-    cursor = None
     try:
         data = request.json
         # 'name' TIDAK diperlukan lagi dari JSON
@@ -58,31 +290,31 @@ def save_monitoring(current_user_id): # <-- TAMBAH current_user_id
 
         if not all([glucose_level, heart_rate]):
             return jsonify({"error": "Data glucose_level dan heart_rate diperlukan"}), 400
-
-        conn = get_connection()
-        cursor = conn.cursor()
+        try:
+            # Nilai bukan angka, NaN/inf, atau di luar rentang ditolak sebelum masuk antrean writer
+            glucose_level, heart_rate = validate_reading(glucose_level, heart_rate)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
         # <-- DIUBAH: Kita tidak perlu mencari user berdasarkan nama.
         # Kita sudah punya ID pengguna dari token.
         user_id = current_user_id 
-        
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-        cursor.execute("""
-            INSERT INTO monitoring (user_id, glucose_level, heart_rate, timestamp)
-            VALUES (%s, %s, %s, %s)
-        """, (user_id, glucose_level, heart_rate, timestamp))
 
-        conn.commit()
+        # Baca riwayat berikutnya dari primary sampai replika menyusul
+        mark_write(user_id)
+        future = monitoring_writer.submit(user_id, glucose_level, heart_rate)
+        future.result(timeout=INGEST_COMMIT_TIMEOUT)
         return jsonify({"message": "Hasil pemeriksaan berhasil disimpan"}), 201
+    except IngestQueueFull:
+        response = jsonify({"error": "Server sedang sibuk, silakan coba lagi."})
+        response.headers['Retry-After'] = '1'
+        return response, 503
+    except TimeoutError:
+        # Catatan sudah di antrean dan tetap akan disimpan oleh writer
+        return jsonify({"message": "Hasil pemeriksaan diterima dan sedang disimpan"}), 202
     except Exception as e:
         print(f"Error saving monitoring data: {e}")
         return jsonify({"error": "Gagal menyimpan data"}), 500
-    finally:
-        if cursor:
-            cursor.close()
-        if conn and conn.is_connected():
-            conn.close()
 
 @monitoring_bp.route('/monitoring/me', methods=['GET'])
 @token_required
@@ -90,21 +322,32 @@ def get_my_monitoring(current_user_id):
     """
     Mengambil riwayat monitoring PRIBADI untuk pengguna yang login.
     (Kode ini sudah benar dan aman)
+    Query opsional: limit, cursor, start, end, min_glucose, max_glucose.
     """
+    try:
+        filters, limit = _parse_monitoring_query(request.args, allow_user_filter=False)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     conn = None
     cursor = None
     try:
-        conn = get_connection()
+        conn = get_read_connection(current_user_id)
+        if conn is None:
+            return jsonify({"error": "Koneksi database gagal"}), 503
         cursor = conn.cursor(dictionary=True)
-        query = """
-            SELECT id, user_id, heart_rate, glucose_level, timestamp
-            FROM monitoring
-            WHERE user_id = %s
-            ORDER BY timestamp DESC
-        """
-        cursor.execute(query, (current_user_id,))
-        data = cursor.fetchall()
-        return jsonify(data)
+
+        def build(versions):
+            data = get_monitoring_page_model(
+                cursor,
+                user_id=current_user_id,
+                limit=limit + 1 if limit is not None else None,
+                **filters
+            )
+            return _paginated_response(data, limit)
+
+        # Polling tanpa data baru dijawab 304 hanya dengan satu lookup table_versions
+        return conditional_get(conn, [monitoring_scope(current_user_id)], build, private=True)
     except Exception as e:
         print(f"Error fetching personal monitoring data: {e}")
         return jsonify({"error": "Gagal mengambil riwayat pribadi"}), 500
@@ -114,6 +357,204 @@ def get_my_monitoring(current_user_id):
         if conn and conn.is_connected():
             conn.close()
 
+def _series_endpoint(user_id):
+    try:
+        _parse_series_query(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    conn = None
+    cursor = None
+    try:
+        conn = get_read_connection(user_id)
+        if conn is None:
+            return jsonify({"error": "Koneksi database gagal"}), 503
+        cursor = conn.cursor(dictionary=True)
+        return jsonify(_build_series(cursor, user_id, request.args))
+    except Exception as e:
+        print(f"Error fetching monitoring series: {e}")
+        return jsonify({"error": "Gagal mengambil data grafik"}), 500
+    finally:
+        if cursor:
+            cursor.close()
+        if conn and conn.is_connected():
+            conn.close()
+
+@monitoring_bp.route('/monitoring/me/series', methods=['GET'])
+@token_required
+def get_my_monitoring_series(current_user_id):
+    """
+    Riwayat glukosa dan detak jantung PRIBADI dalam bentuk time-series ringkas.
+    Query opsional: start, end, points, resolution (auto/raw/minute/hour/day), downsample (lttb/none).
+    """
+    return _series_endpoint(current_user_id)
+
+@monitoring_bp.route('/monitoring/series', methods=['GET'])
+@token_required
+@admin_required
+def get_monitoring_series(current_user_id):
+    """
+    Time-series ringkas untuk satu pasien (admin). Wajib query user_id.
+    Pasien membaca series miliknya sendiri lewat /monitoring/me/series.
+    """
+    try:
+        user_id = int(request.args['user_id'])
+    except (KeyError, ValueError):
+        return jsonify({"error": "Query user_id (angka) diperlukan"}), 400
+    return _series_endpoint(user_id)
+
+@monitoring_bp.route('/monitoring/export', methods=['GET'])
+@token_required
+@admin_required
+def export_monitoring(current_user_id):
+    """
+    Ekspor data pemeriksaan sebagai file CSV (default) atau Parquet.
+    Query opsional: format (csv|parquet), start, end, user_id.
+    Baris dikirim bertahap dari cursor unbuffered, jadi memori tetap datar
+    berapa pun jumlah barisnya.
+    """
+    export_format = request.args.get('format', 'csv').lower()
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({"error": "format harus 'csv' atau 'parquet'."}), 400
+    if export_format == 'parquet' and not parquet_available():
+        return jsonify({"error": "Ekspor Parquet butuh paket pyarrow di server."}), 501
+
+    try:
+        filters, _ = _parse_monitoring_query(
+            {key: request.args[key] for key in ('start', 'end', 'user_id') if key in request.args},
+            allow_user_filter=True
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    conn = get_read_connection(current_user_id)
+    if conn is None:
+        return jsonify({"error": "Koneksi database gagal"}), 503
+
+    def generate():
+        cursor = conn.cursor()
+        started = time.perf_counter()
+        exported = 0
+        finished = False
+
+        def batches():
+            nonlocal exported
+            for rows in iter_monitoring_export_model(cursor, batch_size=EXPORT_BATCH_SIZE, **filters):
+                exported += len(rows)
+                yield rows
+
+        chunks = parquet_chunks if export_format == 'parquet' else csv_chunks
+        try:
+            yield from chunks(batches())
+            finished = True
+            print(f"INFO: Ekspor monitoring selesai: {exported} baris dalam {time.perf_counter() - started:.1f} detik.")
+        except Exception as e:
+            # Status 200 sudah terkirim; file yang terpotong tidak punya footer/baris akhir yang lengkap
+            print(f"Error saat ekspor monitoring setelah {exported} baris: {e}")
+        finally:
+            if finished:
+                cursor.close()
+                conn.close()
+            else:
+                # Hasil unbuffered yang belum habis dibaca membuat koneksi tidak bisa dipakai ulang
+                conn.discard()
+
+    content_type, extension = EXPORT_FORMATS[export_format]
+    response = Response(generate(), content_type=content_type)
+    # Klien yang putus sebelum chunk pertama: generator tidak pernah berjalan, koneksi dilepas di sini
+    response.call_on_close(conn.discard)
+    response.headers['Content-Disposition'] = (
+        f'attachment; filename="monitoring_{datetime.now():%Y%m%d_%H%M%S}.{extension}"'
+    )
+    return response
+
+def _import_endpoint(current_user_id, user_id):
+    """
+    Impor massal riwayat CGM untuk user_id dari upload CSV / JSON-lines
+    (field multipart 'file', atau body mentah text/csv / application/x-ndjson).
+    Kolom: timestamp, glucose (atau glucose_level), heart_rate.
+    Baris tidak valid dan duplikat dilewati lalu dilaporkan; sisanya disimpan
+    dalam satu transaksi beserta rollup-nya.
+    """
+    started = time.perf_counter()
+    # Berlaku juga untuk body chunked tanpa Content-Length: Werkzeug berhenti membaca di batas ini
+    request.max_content_length = bulk_import.IMPORT_MAX_BYTES
+    try:
+        upload = request.files.get('file')
+        if upload is not None:
+            stream = upload.stream
+            file_format = bulk_import.detect_format(upload.filename, upload.mimetype)
+        else:
+            stream = request.stream
+            file_format = bulk_import.detect_format(None, request.mimetype)
+        data, report = bulk_import.validate(bulk_import.read_upload(stream, file_format), datetime.now())
+    except RequestEntityTooLarge:
+        return jsonify({"error": f"Ukuran file melebihi {bulk_import.IMPORT_MAX_BYTES} byte"}), 413
+    except bulk_import.ImportFormatError as e:
+        return jsonify({"error": str(e)}), 400
+
+    conn = None
+    cursor = None
+    try:
+        conn = get_connection()
+        if conn is None:
+            return jsonify({"error": "Koneksi database gagal"}), 503
+        if user_id != current_user_id and not get_user_by_id_model(conn, user_id):
+            return jsonify({"error": "User tidak ditemukan"}), 404
+        cursor = conn.cursor()
+
+        existing = 0
+        if len(data):
+            stored = get_existing_timestamps_model(
+                cursor, user_id, data["ts"].iloc[0].to_pydatetime(), data["ts"].iloc[-1].to_pydatetime()
+            )
+            data, existing = bulk_import.drop_existing(data, stored)
+
+        if len(data):
+            records = bulk_import.records(user_id, data)
+            for offset in range(0, len(records), IMPORT_CHUNK_ROWS):
+                # executemany menulis ulang INSERT ... VALUES menjadi satu INSERT multi-baris per chunk
+                add_monitoring_records_model(cursor, records[offset:offset + IMPORT_CHUNK_ROWS])
+            upsert_rollups_model(cursor, bulk_import.rollup_rows(user_id, data))
+            bump_versions_model(cursor, ["monitoring", monitoring_scope(user_id)])
+            conn.commit()
+            mark_write(user_id)
+    except Exception as e:
+        if conn is not None:
+            conn.rollback()
+        print(f"Error saat impor massal monitoring user {user_id}: {e}")
+        return jsonify({"error": "Gagal mengimpor data"}), 500
+    finally:
+        if cursor:
+            cursor.close()
+        if conn and conn.is_connected():
+            conn.close()
+
+    duration = time.perf_counter() - started
+    imported = len(data)
+    print(f"INFO: Impor massal user {user_id}: {imported} baris dalam {duration:.2f} detik.")
+    return jsonify({
+        **report,
+        "user_id": user_id,
+        "imported": imported,
+        "duplicates_existing": existing,
+        "duration_seconds": round(duration, 3),
+        "rows_per_second": round(report["received"] / duration, 1) if duration > 0 else None,
+    }), 201 if imported else 200
+
+@monitoring_bp.route('/monitoring/import', methods=['POST'])
+@token_required
+def import_my_monitoring(current_user_id):
+    """Impor massal riwayat pengukuran milik pengguna yang login (lihat _import_endpoint)."""
+    return _import_endpoint(current_user_id, current_user_id)
+
+@monitoring_bp.route('/monitoring/import/<int:user_id>', methods=['POST'])
+@token_required
+@admin_required
+def import_monitoring(current_user_id, user_id):
+    """Impor massal riwayat pengukuran seorang pasien oleh admin."""
+    return _import_endpoint(current_user_id, user_id)
+
 @monitoring_bp.route('/monitoring/<int:monitoring_id>', methods=['DELETE'])
 @token_required # <-- DILINDUNGI
 def delete_monitoring(current_user_id, monitoring_id): # <-- TAMBAH current_user_id
@@ -125,6 +566,8 @@ def delete_monitoring(current_user_id, monitoring_id): # <-- TAMBAH current_user
     cursor = None
     try:
         conn = get_connection()
+        if conn is None:
+            return jsonify({"error": "Koneksi database gagal"}), 503
         cursor = conn.cursor()
         
         # --- LANGKAH OTORISASI (Disarankan) ---
@@ -138,10 +581,26 @@ def delete_monitoring(current_user_id, monitoring_id): # <-- TAMBAH current_user
         #     return jsonify({"error": "Akses ditolak"}), 403
         # --- Akhir Otorisasi ---
 
+        cursor.execute("SELECT user_id, timestamp FROM monitoring WHERE id = %s", (monitoring_id,))
+        record = cursor.fetchone()
+
         cursor.execute("DELETE FROM monitoring WHERE id = %s", (monitoring_id,))
+        deleted = cursor.rowcount
+        if deleted == 0:
+            # Catatan lama mungkin sudah dipindahkan ke arsip
+            record = monitoring_archive.delete_row(monitoring_id)
+            deleted = 1 if record else 0
+        if deleted > 0 and record:
+            # Bucket rollup yang memuat baris ini dihitung ulang dari data mentah
+            rebuild_rollup_buckets_model(cursor, record[0], record[1])
+            bump_versions_model(cursor, ["monitoring", monitoring_scope(record[0])])
         conn.commit()
+        if deleted > 0:
+            mark_write(current_user_id)
+            if record:
+                mark_write(record[0])
 
-        if cursor.rowcount > 0:
+        if deleted > 0:
             return jsonify({"message": "Data pemeriksaan berhasil dihapus"}), 200
         else:
             # Ini mungkin terjadi jika cek otorisasi di atas tidak ada
@@ -1,19 +1,89 @@
-from flask import Blueprint, request, jsonify
-from db import db_connection  # Dekorator koneksi database
+from flask import Blueprint, request, jsonify, Response
+import json
+import os
+import threading
+from db import db_connection, db_read_connection, get_connection, after_commit, mark_write  # Dekorator koneksi database
+from broadcaster import sensor_broadcaster, format_sse
+from ingest import monitoring_writer, IngestQueueFull
 from models.sensor_model import (
     update_sensor_value_model,
     update_batch_sensors_model,
     get_current_sensor_values_model
 )
+from models.user_model import is_patient_model
 
 # Definisi blueprint
 sensor_bp = Blueprint('sensor_bp', __name__)
 
+# Interval heartbeat SSE (detik) dan jeda reconnect yang disarankan ke klien (ms)
+SSE_HEARTBEAT_SECONDS = float(os.getenv('SSE_HEARTBEAT_SECONDS', '15'))
+SSE_RETRY_MS = int(os.getenv('SSE_RETRY_MS', '3000'))
+
+# Pasien pemilik pembacaan sensor. Endpoint update tidak berautentikasi, jadi
+# pasien hanya diambil dari konfigurasi server, tidak pernah dari payload.
+SENSOR_USER_ID = int(os.getenv('SENSOR_USER_ID', '0')) or None
+
+# ID sensor di tabel 'sensors' dan nama field-nya di payload
+SENSOR_FIELDS = {1: "glucose", 2: "heart_rate"}
+
+_prime_lock = threading.Lock()
+
+
+def _as_number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return value
+
+def _publish_sensor_values(values):
+    """Menggabungkan nilai baru ke state terakhir lalu menyiarkannya ke subscriber SSE."""
+    sensor_broadcaster.publish_merge(
+        'sensor',
+        {key: _as_number(value) for key, value in values.items()},
+        complete=len(values) == len(SENSOR_FIELDS)
+    )
+
+def _record_reading(user_id, glucose, heart_rate):
+    """Memasukkan pembacaan sensor ke antrean riwayat monitoring (tanpa menunggu commit)."""
+    try:
+        monitoring_writer.submit(user_id, glucose, heart_rate)
+    except ValueError as e:
+        # Bukan angka, NaN/inf, atau di luar rentang: ditolak sebelum masuk antrean writer
+        print(f"WARNING: Pembacaan sensor user {user_id} tidak dicatat: {e}.")
+    except IngestQueueFull:
+        print(f"WARNING: Pembacaan sensor user {user_id} tidak tercatat, antrean penuh.")
+
+def _ensure_sensor_snapshot():
+    """Membaca database sekali saja jika belum ada state sensor di broadcaster."""
+    if sensor_broadcaster.latest is not None:
+        return
+    with _prime_lock:
+        if sensor_broadcaster.latest is not None:
+            return
+        conn = get_connection()
+        if conn is None:
+            return
+        cursor = conn.cursor(dictionary=True)
+        try:
+            sensor_values = get_current_sensor_values_model(cursor)
+            sensor_broadcaster.prime({
+                field: _as_number(sensor_values.get(sensor_id, 0))
+                for sensor_id, field in SENSOR_FIELDS.items()
+            })
+        finally:
+            cursor.close()
+            conn.close()
+
 # PATCH /api/sensors/update
 @sensor_bp.route('/update', methods=['PATCH'])
 @db_connection
 def update_batch_sensors(cursor):
-    """Update nilai glukosa dan detak jantung sekaligus."""
+    """
+    Update nilai glukosa dan detak jantung sekaligus.
+    Jika SENSOR_USER_ID diatur dan merupakan pasien yang ada, pembacaan juga
+    disimpan sebagai riwayat monitoring lewat writer ber-antrean. 'user_id' di
+    payload diabaikan.
+    """
     data = request.json
     glucose_value = data.get('glucose')
     heart_rate_value = data.get('heart_rate')
@@ -21,7 +91,23 @@ def update_batch_sensors(cursor):
     if glucose_value is None or heart_rate_value is None:
         return jsonify({"error": "Payload harus berisi 'glucose' dan 'heart_rate'"}), 400
 
+    user_id = SENSOR_USER_ID
+    if user_id and not is_patient_model(cursor, user_id):
+        print(f"WARNING: SENSOR_USER_ID {user_id} bukan pasien yang terdaftar, pembacaan tidak dicatat.")
+        user_id = None
+
+    # Backpressure: tolak lebih awal jika antrean riwayat sudah penuh
+    if user_id and monitoring_writer.is_full():
+        response = jsonify({"error": "Antrean penyimpanan penuh, silakan kirim ulang."})
+        response.headers['Retry-After'] = '1'
+        return response, 503
+
     affected_rows = update_batch_sensors_model(cursor, glucose_value, heart_rate_value)
+    after_commit(lambda: _publish_sensor_values({"glucose": glucose_value, "heart_rate": heart_rate_value}))
+    if user_id:
+        mark_write(user_id)
+        after_commit(lambda: _record_reading(user_id, glucose_value, heart_rate_value))
+
     if affected_rows < 2:
         return jsonify({"warning": f"Hanya {affected_rows} sensor yang diperbarui."}), 200
 
@@ -29,7 +115,7 @@ def update_batch_sensors(cursor):
 
 # GET /api/sensors/latest
 @sensor_bp.route('/latest', methods=['GET'])
-@db_connection
+@db_read_connection
 def get_latest_sensor_values(cursor):
     """Mengambil nilai sensor terbaru (glukosa dan detak jantung)."""
     sensor_values = get_current_sensor_values_model(cursor)
@@ -39,6 +125,57 @@ def get_latest_sensor_values(cursor):
     }
     return jsonify(response_data), 200
 
+SSE_HEARTBEAT = ": heartbeat\n\n"
+
+def sse_message(item):
+    event_id, event, data = item
+    return format_sse(event_id, event, json.dumps(data))
+
+def sse_opening(replay):
+    """Pesan pembuka stream: jeda retry, lalu snapshot terakhir atau event replay."""
+    messages = [f"retry: {SSE_RETRY_MS}\n\n"]
+    if replay is None:
+        latest_id, latest = sensor_broadcaster.snapshot()
+        if latest is not None:
+            messages.append(format_sse(latest_id, 'sensor', json.dumps(latest)))
+    else:
+        messages.extend(sse_message(item) for item in replay)
+    return messages
+
+# GET /api/sensors/stream
+# (Dalam mode ASGI, asgi.py melayani URL ini langsung di event loop.)
+@sensor_bp.route('/stream', methods=['GET'])
+def stream_sensor_values():
+    """
+    Server-Sent Events: nilai sensor dikirim begitu ada PATCH, tanpa polling.
+    Mendukung reconnect dengan header Last-Event-ID (atau query last_event_id).
+    """
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    subscription, replay = sensor_broadcaster.subscribe(last_event_id)
+    if subscription is None:
+        return jsonify({"error": "Jumlah koneksi stream sensor sudah mencapai batas"}), 503
+
+    try:
+        if replay is None:
+            _ensure_sensor_snapshot()
+    except Exception as e:
+        print(f"Error saat mengambil snapshot sensor: {e}")
+
+    def generate():
+        try:
+            yield from sse_opening(replay)
+            while True:
+                item = subscription.get(timeout=SSE_HEARTBEAT_SECONDS)
+                yield SSE_HEARTBEAT if item is None else sse_message(item)
+        finally:
+            sensor_broadcaster.unsubscribe(subscription)
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    response = Response(generate(), mimetype='text/event-stream', headers=headers)
+    # Pastikan slot subscriber dilepas walaupun generator tidak pernah dijalankan
+    response.call_on_close(lambda: sensor_broadcaster.unsubscribe(subscription))
+    return response
+
 # PATCH /api/sensors/<int:sensor_id>
 @sensor_bp.route('/<int:sensor_id>', methods=['PATCH'])
 @db_connection
@@ -53,4 +190,7 @@ def update_sensor_value(cursor, sensor_id):
     if affected_rows == 0:
         return jsonify({"error": f"Sensor dengan ID {sensor_id} tidak ditemukan"}), 404
 
+    if sensor_id in SENSOR_FIELDS:
+        after_commit(lambda: _publish_sensor_values({SENSOR_FIELDS[sensor_id]: new_value}))
+
     return jsonify({"message": f"Nilai sensor {sensor_id} berhasil diperbarui"}), 200
@@ -1,8 +1,9 @@
 from flask import Blueprint, request, jsonify
-from db import get_connection
+from db import get_connection, get_read_connection, mark_write
 from models.user_model import (
     get_all_users_model,
     get_user_by_id_model,
+    get_user_by_id_cached_model,
     get_user_by_email_for_login_model,
     add_user_model,
     update_user_model,
@@ -10,6 +11,7 @@ from models.user_model import (
     get_patients_model
 )
 from mysql.connector import Error as MySQLError
+from conditional import conditional_get
 
 # <-- TAMBAH: Impor decorator dari file auth Anda
 # (Asumsikan file Anda bernama 'auth_bp.py' atau 'auth_routes.py'
@@ -29,12 +31,11 @@ def get_users(current_user_id): # <-- TAMBAH 'current_user_id'
     
     conn = None
     try:
-        conn = get_connection()
+        conn = get_read_connection(current_user_id)
         if conn is None:
             return jsonify({"message": "Database connection failed"}), 503
         
-        users = get_all_users_model(conn)
-        return jsonify(users)
+        return conditional_get(conn, ["users"], lambda versions: jsonify(get_all_users_model(conn)), private=True)
     except MySQLError as e:
         print(f"Database error getting users: {e}")
         return jsonify({"message": "Could not retrieve users", "error": str(e)}), 500
@@ -59,7 +60,7 @@ def get_user(current_user_id, user_id): # <-- TAMBAH 'current_user_id'
         if conn is None:
             return jsonify({"message": "Database connection failed"}), 503
             
-        user = get_user_by_id_model(conn, user_id)
+        user = get_user_by_id_cached_model(conn, user_id)
         if user:
             return jsonify(user)
         else:
@@ -151,6 +152,7 @@ def update_user(current_user_id, user_id): # <-- TAMBAH 'current_user_id'
                 return jsonify({"message": "New email is already in use by another account"}), 409
 
         affected_rows = update_user_model(conn, user_id, data)
+        mark_write(current_user_id)
         if affected_rows > 0:
             return jsonify({"message": "User updated successfully"})
         else:
@@ -190,6 +192,7 @@ def delete_user(current_user_id, user_id): # <-- TAMBAH 'current_user_id'
             return jsonify({"message": "User not found"}), 404
             
         affected_rows = delete_user_model(conn, user_id)
+        mark_write(current_user_id)
         if affected_rows > 0:
             return jsonify({"message": "User deleted successfully"})
         else:
@@ -224,8 +227,7 @@ def get_patients(current_user_id): # <-- TAMBAH 'current_user_id'
         if conn is None:
             return jsonify({"message": "Database connection failed"}), 503
             
-        patients = get_patients_model(conn)
-        return jsonify(patients)
+        return conditional_get(conn, ["users"], lambda versions: jsonify(get_patients_model(conn, versions)), private=True)
     except MySQLError as e:
         print(f"Database error getting patients: {e}")
         return jsonify({"message": "Could not retrieve patients", "error": str(e)}), 500
@@ -0,0 +1,247 @@
+"""
+Uji regresi rencana query: menjalankan endpoint utama lewat Flask test client,
+merekam setiap query yang dikirim fungsi di models/ dan routes/, lalu
+menjalankan EXPLAIN untuk masing-masing.
+
+Penggunaan (dari folder backend, database benchmark sudah diisi bench.seed
+dan migrasi terbaru sudah diterapkan):
+    python scripts/check_query_plans.py [--verbose]
+
+Query dianggap regresi jika EXPLAIN menunjukkan full table/index scan
+(type ALL atau index) dengan perkiraan baris di atas PLAN_CHECK_MAX_ROWS, atau
+Extra berisi "Using filesort". Keluar dengan kode 1 jika ada regresi di luar
+ALLOWLIST. Data yang ditulis selama pengecekan dihapus kembali.
+
+Logika pembersihan, penyaringan query, dan penilaian rencana diuji tanpa MySQL
+di tests/test_check_query_plans.py; EXPLAIN sendiri tetap butuh database.
+"""
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Cache dan job latar dimatikan agar setiap request benar-benar mengirim query
+os.environ.setdefault('CACHE_BACKEND', 'none')
+os.environ.setdefault('MONITORING_MAINTENANCE_INTERVAL', '0')
+# PATCH /api/sensors/update tidak boleh menulis baris monitoring untuk pasien sensor
+os.environ['SENSOR_USER_ID'] = '0'
+
+PLAN_CHECK_MAX_ROWS = int(os.getenv('PLAN_CHECK_MAX_ROWS', '1000'))
+
+# Fungsi (qualname) yang memang membaca seluruh tabel, beserta alasannya
+ALLOWLIST = {
+    'get_all_users_model': "daftar semua user untuk admin, tanpa filter",
+    'get_population_summary_model': "agregat populasi risk_scores",
+}
+
+_SOURCE_DIRS = tuple(os.path.join(BACKEND_DIR, name) + os.sep for name in ('models', 'routes'))
+_EXPLAINABLE = ('SELECT', 'UPDATE', 'DELETE', 'INSERT')
+_SKIPPED = ('INFORMATION_SCHEMA', 'GET_LOCK', 'RELEASE_LOCK')
+
+
+class RecordingCursor:
+    """Pembungkus cursor yang mencatat (fungsi, file, sql, params) setiap execute dari models/ atau routes/."""
+
+    def __init__(self, cursor, log):
+        self._cursor = cursor
+        self._log = log
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        frame = sys._getframe(1)
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if filename.startswith(_SOURCE_DIRS):
+            self._log.append((frame.f_code.co_qualname, os.path.relpath(filename, BACKEND_DIR), operation, params))
+        return self._cursor.execute(operation, params, *args, **kwargs)
+
+
+def install_recorder(log):
+    import db
+
+    original = db.PooledConnection.cursor
+
+    def cursor(self, *args, **kwargs):
+        return RecordingCursor(original(self, *args, **kwargs), log)
+
+    db.PooledConnection.cursor = cursor
+
+
+def _login(client, email, password):
+    response = client.post('/api/auth/login', json={"email": email, "password": password})
+    if response.status_code != 200:
+        raise SystemExit(f"ERROR: Login {email} gagal ({response.status_code}); sudah menjalankan bench.seed?")
+    body = response.get_json()
+    return {"Authorization": f"Bearer {body['token']}"}, body["user"]["id"]
+
+
+def run_workload(client):
+    """Request yang mewakili pola query aplikasi; data tulis dibersihkan di akhir."""
+    from bench.seed import ADMIN_EMAIL
+    from bench.synthetic import BENCH_PASSWORD
+
+    admin, _ = _login(client, ADMIN_EMAIL, BENCH_PASSWORD)
+    patient, patient_id = _login(client, 'bench.patient1@example.com', BENCH_PASSWORD)
+    since = time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(time.time() - 7 * 86400))
+
+    reads = [
+        ('/api/faq', None),
+        ('/api/users', admin),
+        (f'/api/users/{patient_id}', admin),
+        ('/api/patients', admin),
+        ('/api/monitoring?limit=100', admin),
+        (f'/api/monitoring?limit=100&user_id={patient_id}', admin),
+        (f'/api/monitoring?limit=100&start={since}&min_glucose=70&max_glucose=180', admin),
+        ('/api/monitoring/me?limit=100', patient),
+        (f'/api/monitoring/me?limit=100&start={since}', patient),
+        ('/api/monitoring/me/series?points=300', patient),
+        ('/api/monitoring/me/series?resolution=raw&points=300', patient),
+        (f'/api/monitoring/series?user_id={patient_id}&points=300', admin),
+        ('/api/predict/glucose-trend/me', patient),
+        ('/api/sensors/latest', None),
+        ('/api/ml/population', admin),
+    ]
+    for path, headers in reads:
+        response = client.get(path, headers=headers)
+        if response.status_code >= 400:
+            print(f"WARNING: GET {path} -> {response.status_code}")
+        # Halaman kedua lewat keyset cursor
+        next_cursor = response.headers.get('X-Next-Cursor')
+        if next_cursor and path.startswith('/api/monitoring?'):
+            client.get(f"{path}&cursor={next_cursor}", headers=headers)
+
+    # Tulis monitoring lalu hapus lagi hanya baris yang dibuat di sini. Endpoint
+    # save tidak mengembalikan id, jadi id baru dikenali dari id terakhir sebelum
+    # penulisan; tanpa 201 (belum di-commit) tidak ada yang dihapus.
+    before = client.get('/api/monitoring/me?limit=1', headers=patient).get_json() or []
+    before_id = before[0]['id'] if before else 0
+    saved = client.post('/api/monitoring/save', json={"glucose_level": 123.4, "heart_rate": 77}, headers=patient)
+    if saved.status_code == 201:
+        latest = client.get('/api/monitoring/me?limit=1', headers=patient).get_json() or []
+        if latest and latest[0]['id'] > before_id and abs(latest[0]['glucose_level'] - 123.4) < 0.01:
+            client.delete(f"/api/monitoring/{latest[0]['id']}", headers=patient)
+        else:
+            print("WARNING: Baris monitoring plan-check tidak ditemukan, tidak ada yang dihapus.")
+    else:
+        print(f"WARNING: POST /api/monitoring/save -> {saved.status_code}, tidak ada yang dihapus.")
+
+    # Sensor diperbarui dengan nilai yang sama agar keadaan tidak berubah;
+    # SENSOR_USER_ID dimatikan di atas, jadi tidak ada baris monitoring tambahan
+    sensors = client.get('/api/sensors/latest').get_json() or {}
+    client.patch('/api/sensors/update', json={
+        "glucose": sensors.get("glucose", 0), "heart_rate": sensors.get("heart_rate", 0),
+    })
+
+    created = client.post('/api/faq', json={"judul": "plan-check", "deskripsi": "plan-check"}).get_json() or {}
+    if created.get('id'):
+        client.put(f"/api/faq/{created['id']}", json={"judul": "plan-check", "deskripsi": "diubah"})
+        client.delete(f"/api/faq/{created['id']}")
+
+    created = client.post('/api/users', json={
+        "name": "Plan Check", "email": "bench.plancheck@example.com", "password": "plan-check", "role": "patient",
+    }).get_json() or {}
+    if created.get('id'):
+        client.put(f"/api/users/{created['id']}", json={"name": "Plan Check 2"}, headers=admin)
+        client.delete(f"/api/users/{created['id']}", headers=admin)
+    return patient_id
+
+
+def run_backfill(user_id):
+    """Backfill rollup satu pasien (query rollup yang tidak lewat endpoint)."""
+    from db import get_connection
+    from models.rollup_model import backfill_rollups_model
+
+    conn = get_connection()
+    if conn is None:
+        raise SystemExit("ERROR: Koneksi database gagal")
+    cursor = conn.cursor()
+    try:
+        backfill_rollups_model(cursor, user_id)
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def _explainable(sql):
+    text = ' '.join(sql.split()).upper()
+    if any(marker in text for marker in _SKIPPED):
+        return False
+    if text.startswith('INSERT'):
+        return ' SELECT ' in text
+    return text.startswith(_EXPLAINABLE)
+
+
+def _problems(plan):
+    problems = []
+    for row in plan:
+        rows = row.get('rows') or 0
+        if row.get('type') in ('ALL', 'index') and rows > PLAN_CHECK_MAX_ROWS:
+            problems.append(f"full scan {row.get('table')} ({row.get('type')}, ~{rows} baris)")
+        if 'Using filesort' in (row.get('Extra') or ''):
+            problems.append(f"filesort pada {row.get('table')}")
+    return problems
+
+
+def explain_all(log, verbose=False):
+    """EXPLAIN untuk setiap query unik di log; mengembalikan daftar (fungsi, file, sql, masalah)."""
+    from db import get_connection
+
+    conn = get_connection()
+    if conn is None:
+        raise SystemExit("ERROR: Koneksi database gagal")
+    seen = set()
+    violations = []
+    cursor = conn.cursor(dictionary=True)
+    try:
+        for qualname, filename, sql, params in log:
+            key = (qualname, sql)
+            if key in seen or not _explainable(sql):
+                continue
+            seen.add(key)
+            cursor.execute("EXPLAIN " + sql, params)
+            plan = cursor.fetchall()
+            problems = _problems(plan)
+            if verbose:
+                print(f"{qualname} ({filename})")
+                for row in plan:
+                    print(f"    {row.get('table')}: type={row.get('type')} key={row.get('key')} "
+                          f"rows={row.get('rows')} extra={row.get('Extra')}")
+            if problems:
+                violations.append((qualname, filename, sql, problems))
+        conn.rollback()
+    finally:
+        cursor.close()
+        conn.close()
+    return seen, violations
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    log = []
+    install_recorder(log)
+
+    from app import app
+
+    client = app.test_client()
+    patient_id = run_workload(client)
+    run_backfill(patient_id)
+
+    seen, violations = explain_all(log, verbose='--verbose' in argv)
+    failed = [v for v in violations if v[0].split('.')[0] not in ALLOWLIST]
+    for qualname, filename, sql, problems in violations:
+        level = "ERROR" if qualname.split('.')[0] not in ALLOWLIST else "INFO"
+        print(f"{level}: {qualname} ({filename}): {'; '.join(problems)}")
+        print(f"    {' '.join(sql.split())[:200]}")
+    print(f"INFO: {len(seen)} query unik diperiksa, {len(failed)} regresi.")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
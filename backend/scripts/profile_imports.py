@@ -0,0 +1,78 @@
+"""
+Profil waktu import aplikasi (python -X importtime) untuk menjaga startup tetap cepat.
+
+Penggunaan (dari folder backend):
+    python scripts/profile_imports.py [modul] [--top N]
+
+Keluar dengan kode 1 jika total import melebihi IMPORT_TIME_BUDGET (detik)
+atau jika library ML berat ikut ter-import saat startup.
+"""
+import os
+import subprocess
+import sys
+
+IMPORT_TIME_BUDGET = float(os.getenv('IMPORT_TIME_BUDGET', '1.0'))
+# Library ini hanya boleh dimuat oleh loader model_registry, bukan saat import
+HEAVY_MODULES = ('tensorflow', 'keras', 'sklearn', 'scipy', 'h5py', 'joblib')
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def profile(module):
+    env = dict(os.environ, MODEL_WARMUP='')
+    code = (
+        f"import {module}, sys; "
+        f"print(','.join(sorted(m for m in sys.modules if m.split('.')[0] in {HEAVY_MODULES!r})))"
+    )
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        print(result.stderr)
+        raise SystemExit(f"ERROR: Gagal meng-import {module}")
+
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_part, cumulative_part, name = line.split('|', 2)
+        entries.append((int(cumulative_part), int(self_part.split(':')[1]), name.rstrip()))
+    # Baris terakhir stdout berisi modul berat yang ter-import (output aplikasi bisa ada di atasnya)
+    lines = result.stdout.strip().splitlines()
+    heavy = [m for m in lines[-1].split(',') if m] if lines else []
+    return entries, heavy
+
+
+def main():
+    args = sys.argv[1:]
+    top = 15
+    if '--top' in args:
+        index = args.index('--top')
+        top = int(args[index + 1])
+        del args[index:index + 2]
+    module = args[0] if args else 'app'
+
+    entries, heavy = profile(module)
+    total = next((cum for cum, _, name in entries if name.strip() == module), 0) / 1e6
+
+    print(f"{'kumulatif (ms)':>15} {'sendiri (ms)':>13}  modul")
+    for cumulative, self_time, name in sorted(entries, reverse=True)[:top]:
+        print(f"{cumulative / 1000:15.1f} {self_time / 1000:13.1f}  {name}")
+    print(f"\nTotal import '{module}': {total:.3f} detik (budget {IMPORT_TIME_BUDGET:.3f} detik)")
+
+    failed = False
+    if total > IMPORT_TIME_BUDGET:
+        print("FAIL: Waktu import melebihi budget.")
+        failed = True
+    if heavy:
+        roots = sorted({m.split('.')[0] for m in heavy})
+        print(f"FAIL: Library berat ter-import saat startup: {', '.join(roots)}")
+        failed = True
+    if not failed:
+        print("OK")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
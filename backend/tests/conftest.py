@@ -0,0 +1,9 @@
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Tanpa job latar dan warmup model saat modul aplikasi di-import
+os.environ.setdefault('MONITORING_MAINTENANCE_INTERVAL', '0')
+os.environ.setdefault('MODEL_WARMUP', '')
@@ -0,0 +1,71 @@
+import asyncio
+
+from flask import Flask, jsonify, request
+
+from asgi import AsgiApp
+
+app = Flask(__name__)
+
+
+@app.route('/echo', methods=['POST'])
+def echo():
+    total = 0
+    while True:
+        chunk = request.stream.read(100_000)
+        if not chunk:
+            break
+        total += len(chunk)
+    return jsonify({"bytes": total})
+
+
+@app.route('/reject', methods=['POST'])
+def reject():
+    return jsonify({"error": "ditolak"}), 413
+
+
+def _call(path, chunks):
+    received = []
+
+    async def run():
+        pending = list(chunks)
+
+        async def receive():
+            if not pending:
+                return {'type': 'http.disconnect'}
+            body = pending.pop(0)
+            received.append(len(body))
+            return {'type': 'http.request', 'body': body, 'more_body': bool(pending)}
+
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        headers = [
+            (b'content-type', b'application/octet-stream'),
+            (b'content-length', str(sum(map(len, chunks))).encode()),
+        ]
+        scope = {
+            'type': 'http', 'method': 'POST', 'path': path, 'query_string': b'',
+            'headers': headers, 'http_version': '1.1', 'scheme': 'http',
+        }
+        await AsgiApp(app)(scope, receive, send)
+        return sent
+
+    sent = asyncio.run(run())
+    body = b''.join(message.get('body', b'') for message in sent if message['type'] == 'http.response.body')
+    return sent[0]['status'], body, received
+
+
+def test_body_is_streamed_to_wsgi_input():
+    chunks = [b'x' * 300_000] * 4
+    status, body, received = _call('/echo', chunks)
+    assert status == 200
+    assert body == b'{"bytes":1200000}\n'
+    assert received == [300_000] * 4
+
+
+def test_unread_body_is_never_received():
+    status, _, received = _call('/reject', [b'x' * 1000] * 10)
+    assert status == 413
+    assert received == []
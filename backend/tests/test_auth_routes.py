@@ -0,0 +1,63 @@
+from flask import Flask
+
+from cache import cache
+from models.user_model import _user_cache_key, get_user_by_id_cached_model
+from routes import auth_routes
+
+
+class FakeCursor:
+    def __init__(self, row):
+        self.row = row
+
+    def execute(self, query, params=()):
+        pass
+
+    def fetchone(self):
+        return self.row
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, row):
+        self.row = row
+
+    def cursor(self, dictionary=False):
+        return FakeCursor(self.row)
+
+    def close(self):
+        pass
+
+
+def test_admin_check_ignores_cached_role(monkeypatch):
+    user_id = 424242
+    admin = {"id": user_id, "name": "A", "age": 30, "email": "a@example.com",
+             "gender": "f", "address": "", "role": "admin"}
+    # Worker ini masih menyimpan baris lama (admin) di cache
+    cache.invalidate(_user_cache_key(user_id))
+    assert get_user_by_id_cached_model(FakeConnection(admin), user_id)["role"] == "admin"
+
+    demoted = dict(admin, role="patient")
+    monkeypatch.setattr(auth_routes, "get_connection", lambda: FakeConnection(demoted))
+    view = auth_routes.admin_required(lambda current_user_id: ("ok", 200))
+    with Flask(__name__).test_request_context('/'):
+        response = view(user_id)
+    assert response[1] == 403
+    cache.invalidate(_user_cache_key(user_id))
+
+
+def test_patient_cannot_read_another_patients_series(monkeypatch):
+    import jwt
+    from routes import monitoring_routes
+
+    patient = {"id": 7, "name": "P", "age": 30, "email": "p@example.com",
+               "gender": "f", "address": "", "role": "patient"}
+    monkeypatch.setattr(auth_routes, "get_connection", lambda: FakeConnection(patient))
+    monkeypatch.setattr(monitoring_routes, "_series_endpoint", lambda user_id: ("series", 200))
+    app = Flask(__name__)
+    app.register_blueprint(monitoring_routes.monitoring_bp, url_prefix="/api")
+    token = jwt.encode({"user_id": 7}, auth_routes.SECRET_KEY, algorithm="HS256")
+
+    response = app.test_client().get("/api/monitoring/series?user_id=8", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 403
@@ -0,0 +1,43 @@
+import threading
+
+from broadcaster import Broadcaster
+
+
+def test_concurrent_partial_updates_are_all_merged():
+    broadcaster = Broadcaster("test")
+    broadcaster.prime({})
+    fields = [f"sensor_{i}" for i in range(8)]
+    barrier = threading.Barrier(len(fields))
+
+    def update(field):
+        barrier.wait()
+        for value in range(200):
+            broadcaster.publish_merge('sensor', {field: value})
+
+    threads = [threading.Thread(target=update, args=(field,)) for field in fields]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    _, state = broadcaster.snapshot()
+    assert state == {field: 199 for field in fields}
+
+
+def test_partial_update_without_state_is_not_a_snapshot():
+    broadcaster = Broadcaster("test")
+    broadcaster.publish_merge('sensor', {"glucose": 100})
+    assert broadcaster.snapshot() == (None, None)
+
+    broadcaster.publish_merge('sensor', {"glucose": 100, "heart_rate": 70}, complete=True)
+    broadcaster.publish_merge('sensor', {"glucose": 120})
+    assert broadcaster.snapshot()[1] == {"glucose": 120, "heart_rate": 70}
+
+
+def test_subscribers_receive_merged_states_in_order():
+    broadcaster = Broadcaster("test")
+    subscription, _ = broadcaster.subscribe()
+    broadcaster.publish_merge('sensor', {"glucose": 1, "heart_rate": 2}, complete=True)
+    broadcaster.publish_merge('sensor', {"heart_rate": 3})
+    events = [subscription.get(0.1), subscription.get(0.1)]
+    assert [data for _, _, data in events] == [{"glucose": 1, "heart_rate": 2}, {"glucose": 1, "heart_rate": 3}]
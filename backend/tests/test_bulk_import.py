@@ -0,0 +1,99 @@
+import io
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import bulk_import
+from bulk_import import ImportFormatError, read_upload, validate
+
+NOW = datetime(2026, 3, 1, 12, 0, 0)
+
+
+def _frame(rows):
+    return pd.DataFrame(rows, columns=["timestamp", "glucose", "heart_rate"], dtype=object)
+
+
+def _csv(text):
+    return read_upload(io.BytesIO(text.encode("utf-8")), "csv")
+
+
+def test_nan_and_inf_values_are_rejected():
+    frame = _frame([
+        ["2026-02-01 08:00:00", "120", "70"],
+        ["2026-02-01 08:05:00", "nan", "70"],
+        ["2026-02-01 08:10:00", "inf", "70"],
+        ["2026-02-01 08:15:00", "110", "-inf"],
+        ["2026-02-01 08:20:00", None, "70"],
+        ["2026-02-01 08:25:00", "abc", "70"],
+    ])
+    data, report = validate(frame, NOW)
+    assert len(data) == 1
+    assert report["rejected"]["glucose_invalid"] == 4
+    assert report["rejected"]["heart_rate_invalid"] == 1
+    assert [error["row"] for error in report["errors"]] == [2, 3, 4, 5, 6]
+    assert np.isfinite(data["glucose"]).all() and np.isfinite(data["heart_rate"]).all()
+
+
+def test_invalid_and_future_timestamps_are_rejected():
+    frame = _frame([
+        ["bukan tanggal", "120", "70"],
+        ["2026-03-02 00:00:00", "120", "70"],
+        ["2026-02-30 00:00:00", "120", "70"],
+    ])
+    data, report = validate(frame, NOW)
+    assert len(data) == 0
+    assert report["rejected"]["timestamp_invalid"] == 2
+    assert report["rejected"]["timestamp_future"] == 1
+
+
+def test_mixed_time_zones_are_converted_to_local_time():
+    aware = datetime(2026, 2, 1, 1, 0, tzinfo=timezone.utc)
+    local = aware.astimezone().replace(tzinfo=None)
+    frame = _frame([
+        ["2026-02-01T01:00:00Z", "120", "70"],
+        ["2026-02-01T08:00:00+07:00", "121", "71"],
+        ["2026-02-01 09:30:00", "122", "72"],
+    ])
+    data, report = validate(frame, NOW)
+    assert report["rejected_total"] == 0
+    timestamps = data["ts"].dt.to_pydatetime().tolist()
+    # 01:00Z dan 08:00+07:00 adalah instan yang sama: dianggap duplikat
+    assert report["duplicates_in_file"] == 1
+    assert timestamps == sorted([local, datetime(2026, 2, 1, 9, 30)])
+
+
+def test_duplicates_keep_first_row_and_sort_ascending():
+    frame = _frame([
+        ["2026-02-01 08:10:00", "130", "70"],
+        ["2026-02-01 08:00:00", "120", "70"],
+        ["2026-02-01 08:10:00.400", "999", "70"],
+        ["2026-02-01 08:00:00", "125", "70"],
+    ])
+    data, report = validate(frame, NOW)
+    assert report["duplicates_in_file"] == 2
+    assert data["glucose"].tolist() == [120.0, 130.0]
+    assert data["ts"].is_monotonic_increasing
+
+
+def test_read_upload_accepts_aliases_and_jsonl():
+    frame = _csv("Time, glucose_level, HeartRate\n2026-02-01 08:00:00, 120, 70\n")
+    assert list(frame.columns) == ["timestamp", "glucose", "heart_rate"]
+
+    jsonl = b'{"timestamp": "2026-02-01T08:00:00", "glucose": 120, "heart_rate": 70}\n'
+    assert len(read_upload(io.BytesIO(jsonl), "jsonl")) == 1
+
+
+def test_read_upload_rejects_missing_columns():
+    with pytest.raises(ImportFormatError, match="heart_rate"):
+        _csv("timestamp,glucose\n2026-02-01 08:00:00,120\n")
+
+
+def test_read_upload_stops_after_row_limit(monkeypatch):
+    monkeypatch.setattr(bulk_import, "IMPORT_MAX_ROWS", 3)
+    header = "timestamp,glucose,heart_rate\n"
+    _csv(header + "2026-02-01 08:00:00,120,70\n" * 3)
+    with pytest.raises(ImportFormatError, match="lebih dari 3 baris"):
+        # Baris setelah batas tidak pernah di-parse, termasuk baris rusak di akhir
+        _csv(header + "2026-02-01 08:00:00,120,70\n" * 4 + '"tidak ditutup\n')
@@ -0,0 +1,183 @@
+import importlib.util
+import os
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def plans(monkeypatch):
+    # Modul menulis default environment saat di-import; monkeypatch mengembalikannya
+    for name in ('CACHE_BACKEND', 'MONITORING_MAINTENANCE_INTERVAL', 'SENSOR_USER_ID'):
+        monkeypatch.setenv(name, os.environ.get(name, ''))
+    path = os.path.join(BACKEND_DIR, 'scripts', 'check_query_plans.py')
+    spec = importlib.util.spec_from_file_location('check_query_plans', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, body=None, headers=None):
+        self.status_code = status_code
+        self._body = body
+        self.headers = headers or {}
+
+    def get_json(self):
+        return self._body
+
+
+class FakeClient:
+    """Meniru endpoint yang dipakai run_workload; save_status mengatur hasil POST /api/monitoring/save."""
+
+    def __init__(self, save_status=201, concurrent_value=None):
+        self.rows = [{"id": 41, "glucose_level": 99.0}]
+        self.save_status = save_status
+        self.concurrent_value = concurrent_value
+        self.deleted = []
+
+    def get(self, path, headers=None):
+        if path == '/api/monitoring/me?limit=1':
+            return FakeResponse(body=self.rows[-1:])
+        if path == '/api/sensors/latest':
+            return FakeResponse(body={"glucose": 100, "heart_rate": 70})
+        return FakeResponse(body=[])
+
+    def post(self, path, json=None, headers=None):
+        if path == '/api/auth/login':
+            return FakeResponse(body={"token": "t", "user": {"id": 7}})
+        if path == '/api/monitoring/save':
+            if self.save_status == 201:
+                self.rows.append({"id": self.rows[-1]["id"] + 1, "glucose_level": json["glucose_level"]})
+            if self.concurrent_value is not None:
+                self.rows.append({"id": self.rows[-1]["id"] + 1, "glucose_level": self.concurrent_value})
+            return FakeResponse(self.save_status, {})
+        if path == '/api/faq':
+            return FakeResponse(201, {"id": 3})
+        if path == '/api/users':
+            return FakeResponse(201, {"id": 9})
+        raise AssertionError(f"POST tidak dikenal: {path}")
+
+    def put(self, path, json=None, headers=None):
+        return FakeResponse()
+
+    def patch(self, path, json=None, headers=None):
+        return FakeResponse()
+
+    def delete(self, path, headers=None):
+        self.deleted.append(path)
+        return FakeResponse()
+
+
+def test_workload_deletes_only_the_row_it_created(plans):
+    client = FakeClient()
+    assert plans.run_workload(client) == 7
+    assert client.deleted == ['/api/monitoring/42', '/api/faq/3', '/api/users/9']
+
+
+@pytest.mark.parametrize("save_status, concurrent_value", [(202, None), (500, None), (202, 123.4), (201, 150.0)])
+def test_workload_keeps_seeded_rows_when_save_is_not_confirmed(plans, save_status, concurrent_value):
+    client = FakeClient(save_status, concurrent_value)
+    plans.run_workload(client)
+    assert not [path for path in client.deleted if path.startswith('/api/monitoring/')]
+
+
+def test_sensor_update_in_workload_has_no_patient(plans):
+    # Dengan SENSOR_USER_ID=0, PATCH /api/sensors/update tidak menulis baris monitoring
+    assert int(os.environ['SENSOR_USER_ID']) == 0
+
+
+def test_explainable_filters_statements(plans):
+    assert plans._explainable("SELECT * FROM monitoring WHERE user_id = %s")
+    assert plans._explainable("  update monitoring\n SET glucose_level = %s")
+    assert plans._explainable("INSERT INTO risk_scores (user_id) SELECT id FROM users")
+    assert not plans._explainable("INSERT INTO faq (judul) VALUES (%s)")
+    assert not plans._explainable("SELECT GET_LOCK('risk', 0)")
+    assert not plans._explainable("SELECT * FROM INFORMATION_SCHEMA.TABLES")
+    assert not plans._explainable("CREATE TABLE x (id INT)")
+
+
+def test_problems_flags_large_scans_and_filesort(plans):
+    limit = plans.PLAN_CHECK_MAX_ROWS
+    assert plans._problems([{"table": "monitoring", "type": "ref", "rows": limit * 10, "Extra": None}]) == []
+    assert plans._problems([{"table": "faq", "type": "ALL", "rows": limit, "Extra": None}]) == []
+    assert plans._problems([
+        {"table": "monitoring", "type": "ALL", "rows": limit + 1, "Extra": "Using where; Using filesort"},
+    ]) == [f"full scan monitoring (ALL, ~{limit + 1} baris)", "filesort pada monitoring"]
+
+
+class FakeExplainCursor:
+    def __init__(self, plans_by_sql):
+        self.plans_by_sql = plans_by_sql
+        self.executed = []
+        self.plan = []
+
+    def execute(self, sql, params=None):
+        self.executed.append((sql, params))
+        self.plan = self.plans_by_sql[sql[len("EXPLAIN "):]]
+
+    def fetchall(self):
+        return self.plan
+
+    def close(self):
+        pass
+
+
+class FakeExplainConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.rolled_back = False
+
+    def cursor(self, dictionary=False):
+        return self._cursor
+
+    def rollback(self):
+        self.rolled_back = True
+
+    def close(self):
+        pass
+
+
+def test_explain_all_deduplicates_and_reports_violations(plans, monkeypatch):
+    import db
+
+    scan = "SELECT * FROM users"
+    indexed = "SELECT * FROM monitoring WHERE user_id = %s ORDER BY id DESC LIMIT 100"
+    cursor = FakeExplainCursor({
+        scan: [{"table": "users", "type": "ALL", "rows": 5000, "Extra": None}],
+        indexed: [{"table": "monitoring", "type": "ref", "rows": 100, "Extra": "Using where"}],
+    })
+    conn = FakeExplainConnection(cursor)
+    monkeypatch.setattr(db, "get_connection", lambda: conn)
+    log = [
+        ("get_all_users_model", "models/user_model.py", scan, None),
+        ("get_monitoring_model", "models/monitoring_model.py", indexed, (7,)),
+        ("get_monitoring_model", "models/monitoring_model.py", indexed, (8,)),
+        ("add_faq_model", "models/faq_model.py", "INSERT INTO faq (judul) VALUES (%s)", ("x",)),
+    ]
+
+    seen, violations = plans.explain_all(log)
+
+    assert seen == {("get_all_users_model", scan), ("get_monitoring_model", indexed)}
+    assert cursor.executed == [("EXPLAIN " + scan, None), ("EXPLAIN " + indexed, (7,))]
+    assert [(qualname, problems) for qualname, _, _, problems in violations] == [
+        ("get_all_users_model", ["full scan users (ALL, ~5000 baris)"]),
+    ]
+    assert conn.rolled_back
+
+
+def test_recording_cursor_logs_only_models_and_routes(plans):
+    class Cursor:
+        def execute(self, operation, params=None):
+            return operation
+
+    log = []
+    cursor = plans.RecordingCursor(Cursor(), log)
+    cursor.execute("SELECT 1")
+    filename = os.path.join(BACKEND_DIR, 'models', 'fake_model.py')
+    code = compile("def fake_query(cursor):\n    cursor.execute('SELECT 2', (1,))\n", filename, 'exec')
+    namespace = {}
+    exec(code, namespace)
+    namespace['fake_query'](cursor)
+    assert log == [("fake_query", os.path.join('models', 'fake_model.py'), "SELECT 2", (1,))]
@@ -0,0 +1,126 @@
+import copy
+import datetime
+
+import pytest
+from flask import Flask
+
+from cache import cache
+from routes import faq_routes
+from models.faq_model import update_faq_model
+
+
+class FakeDatabase:
+    """Tabel faq dan table_versions di memori; setiap transaksi membaca snapshot-nya sendiri."""
+
+    def __init__(self):
+        self.state = {
+            "faq": [{"id": 1, "judul": "Lama", "deskripsi": "isi lama"}],
+            "versions": {"faq": (1, datetime.datetime(2026, 1, 1))},
+        }
+        # Dipanggil sekali tepat setelah sebuah koneksi membaca tabel faq
+        self.after_faq_read = None
+
+
+class FakeCursor:
+    def __init__(self, connection, dictionary=False):
+        self.connection = connection
+        self.dictionary = dictionary
+        self.rows = []
+        self.rowcount = 0
+
+    def execute(self, query, params=()):
+        state = self.connection.snapshot()
+        if query.startswith("SELECT scope"):
+            self.rows = [(scope, *state["versions"][scope]) for scope in params if scope in state["versions"]]
+        elif query.startswith("SELECT * FROM faq"):
+            self.rows = [dict(row) for row in state["faq"]]
+            hook, self.connection.database.after_faq_read = self.connection.database.after_faq_read, None
+            if hook:
+                hook()
+        elif query.startswith("UPDATE faq"):
+            judul, deskripsi, faq_id = params
+            rows = [row for row in state["faq"] if row["id"] == faq_id]
+            for row in rows:
+                row.update(judul=judul, deskripsi=deskripsi)
+            self.rowcount = len(rows)
+        else:
+            raise AssertionError(f"Query tidak dikenal: {query}")
+
+    def executemany(self, query, params):
+        assert "table_versions" in query
+        state = self.connection.snapshot()
+        for (scope,) in params:
+            version, _ = state["versions"].get(scope, (0, None))
+            state["versions"][scope] = (version + 1, datetime.datetime(2026, 1, 2))
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, database):
+        self.database = database
+        self._snapshot = None
+
+    def snapshot(self):
+        # REPEATABLE READ: snapshot diambil pada pembacaan pertama transaksi
+        if self._snapshot is None:
+            self._snapshot = copy.deepcopy(self.database.state)
+        return self._snapshot
+
+    def cursor(self, dictionary=False):
+        return FakeCursor(self, dictionary)
+
+    def commit(self):
+        self.database.state = self._snapshot
+        self._snapshot = None
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        self._snapshot = None
+
+
+@pytest.fixture
+def client(monkeypatch):
+    database = FakeDatabase()
+    monkeypatch.setattr(faq_routes, "get_connection", lambda: FakeConnection(database))
+    cache.invalidate(*[f"faq:all:v{version}" for version in range(5)])
+    app = Flask(__name__)
+    app.register_blueprint(faq_routes.faq_bp, url_prefix="/api")
+    return app.test_client(), database
+
+
+def test_write_during_cache_fill_does_not_pair_new_etag_with_old_body(client):
+    client, database = client
+
+    def write():
+        update_faq_model(FakeConnection(database), 1, {"judul": "Baru", "deskripsi": "isi baru"})
+
+    # Request pertama membaca versi 1 dan data lama; penulisan commit di antara
+    # query data dan cache.set, sehingga data lama masuk cache setelah penulisan
+    database.after_faq_read = write
+    first = client.get("/api/faq")
+    assert first.get_json()[0]["judul"] == "Lama"
+
+    second = client.get("/api/faq")
+    assert second.headers["ETag"] != first.headers["ETag"]
+    assert second.get_json()[0]["judul"] == "Baru"
+
+    # Klien yang memegang ETag baru mendapat 304, dan isinya memang sudah yang baru
+    third = client.get("/api/faq", headers={"If-None-Match": second.headers["ETag"]})
+    assert third.status_code == 304
+
+
+def test_etag_unchanged_reuses_cached_body(client):
+    client, database = client
+    first = client.get("/api/faq")
+    database.state["faq"][0]["judul"] = "Tanpa bump versi"
+
+    second = client.get("/api/faq")
+    assert second.headers["ETag"] == first.headers["ETag"]
+    assert second.get_json() == first.get_json()
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from models.forest_engine import FlatForest
+
+ensemble = pytest.importorskip("sklearn.ensemble")
+datasets = pytest.importorskip("sklearn.datasets")
+
+
+def _forest(missing=False, seed=0):
+    X, y = datasets.make_classification(
+        n_samples=600, n_features=8, n_informative=5, n_classes=3, random_state=seed
+    )
+    if missing:
+        X[np.random.default_rng(seed).random(X.shape) < 0.1] = np.nan
+    model = ensemble.RandomForestClassifier(n_estimators=25, max_depth=8, random_state=seed).fit(X, y)
+    return model, X
+
+
+def _test_rows(model, flat, seed=0, n=2000):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(scale=2.0, size=(n, model.n_features_in_))
+    # Baris tepat di threshold node menguji perbandingan float32 vs float64
+    split = np.isfinite(flat.threshold)
+    picks = rng.integers(0, split.sum(), size=n)
+    edge = rng.normal(scale=2.0, size=(n, model.n_features_in_))
+    edge[np.arange(n), flat.feature[split][picks]] = flat.threshold[split][picks]
+    return np.vstack([X, edge])
+
+
+def test_flat_forest_matches_sklearn():
+    model, _ = _forest()
+    flat = FlatForest.from_sklearn(model)
+    X = _test_rows(model, flat)
+    assert np.allclose(flat.predict_proba(X), model.predict_proba(X), rtol=0, atol=1e-12)
+    assert np.array_equal(flat.predict(X), model.predict(X))
+
+
+def test_flat_forest_matches_sklearn_with_missing_values():
+    model, _ = _forest(missing=True, seed=1)
+    flat = FlatForest.from_sklearn(model)
+    X = _test_rows(model, flat, seed=1)
+    X[np.random.default_rng(2).random(X.shape) < 0.2] = np.nan
+    assert np.allclose(flat.predict_proba(X), model.predict_proba(X), rtol=0, atol=1e-12)
+    assert np.array_equal(flat.predict(X), model.predict(X))
+
+
+def test_saved_forest_predicts_identically(tmp_path):
+    model, X = _forest(seed=3)
+    flat = FlatForest.from_sklearn(model)
+    path = str(tmp_path / "forest.npz")
+    flat.save(path)
+    assert np.array_equal(FlatForest.load(path).predict_proba(X), flat.predict_proba(X))
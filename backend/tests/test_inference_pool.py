@@ -0,0 +1,91 @@
+import time
+
+import numpy as np
+import pytest
+
+from inference_pool import INFERENCE_TIMEOUT, InferenceError, InferencePool
+from metrics import stage_duration, timed_stage
+from model_registry import model_registry
+
+
+def _load_slow_model():
+    # Lebih lama dari batas waktu permintaan, seperti fallback Keras/TensorFlow
+    time.sleep(INFERENCE_TIMEOUT + 1)
+    return 10.0
+
+
+model_registry.register('slow_model', _load_slow_model)
+
+
+def double_kernel(array):
+    with timed_stage('predict', 'double'):
+        return array * 2
+
+
+def failing_kernel(array):
+    raise ValueError("input rusak")
+
+
+def slow_model_kernel(array):
+    return array + model_registry.get('slow_model')
+
+
+def hanging_kernel(array):
+    time.sleep(60)
+    return array
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = InferencePool(
+        1,
+        {"double": "test_inference_pool:double_kernel", "failing": "test_inference_pool:failing_kernel"},
+        timeout=INFERENCE_TIMEOUT, shm_bytes=1 << 16
+    )
+    yield pool
+    pool.shutdown()
+
+
+def _stage_count(stage, model):
+    prefix = f'stage_duration_seconds_count{{stage="{stage}",model="{model}"}} '
+    return sum(int(line[len(prefix):]) for line in stage_duration.render() if line.startswith(prefix))
+
+
+def test_kernel_stage_timings_are_recorded_in_parent(pool):
+    before = _stage_count("predict", "double")
+    result = pool.run("double", np.arange(4, dtype=np.float32))
+    assert result.tolist() == [0.0, 2.0, 4.0, 6.0]
+    # Stage diukur di worker, tetapi tercatat di registry proses ini
+    assert _stage_count("predict", "double") == before + 1
+
+
+def test_kernel_error_is_reported(pool):
+    with pytest.raises(InferenceError, match="input rusak"):
+        pool.run("failing", np.zeros(2))
+
+
+def test_slow_model_load_uses_start_timeout_not_request_timeout():
+    pool = InferencePool(
+        1, {"slow_model": "test_inference_pool:slow_model_kernel"},
+        timeout=INFERENCE_TIMEOUT, shm_bytes=1 << 16
+    )
+    try:
+        assert pool.run("slow_model", np.ones(2)).tolist() == [11.0, 11.0]
+        assert pool.restarts == 0
+        # Setelah model dimuat, permintaan berikutnya kembali memakai batas waktu biasa
+        started = time.monotonic()
+        assert pool.run("slow_model", np.zeros(1)).tolist() == [10.0]
+        assert time.monotonic() - started < INFERENCE_TIMEOUT
+    finally:
+        pool.shutdown()
+
+
+def test_stuck_kernel_still_hits_request_timeout():
+    pool = InferencePool(1, {"hang": "test_inference_pool:hanging_kernel"}, timeout=1, shm_bytes=1 << 16)
+    try:
+        # Start worker tidak dihitung, tetapi kernel yang macet tetap dibatasi 1 detik
+        with pytest.raises(TimeoutError):
+            pool.run("hang", np.zeros(1))
+        assert pool.restarts >= 1
+    finally:
+        pool.shutdown()
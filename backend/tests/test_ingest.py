@@ -0,0 +1,100 @@
+import math
+from concurrent.futures import Future
+
+import pytest
+from mysql.connector import DataError, OperationalError
+
+import ingest
+from ingest import MonitoringWriter, validate_reading
+
+
+@pytest.mark.parametrize("glucose, heart_rate", [
+    ("abc", 80), (None, 80), (120, "Infinity"), (1e400, 80), (float("nan"), 80), (1e39, 80), (-1, 80), (120, 1000),
+])
+def test_validate_reading_rejects_bad_values(glucose, heart_rate):
+    with pytest.raises(ValueError):
+        validate_reading(glucose, heart_rate)
+
+
+def test_validate_reading_converts_numbers():
+    assert validate_reading("120.5", 80) == (120.5, 80.0)
+
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+        self.rowcount = 0
+
+    def executemany(self, query, records):
+        if any(not math.isfinite(record[1]) or record[1] > 1e6 for record in records):
+            raise DataError(msg="Out of range value for column 'glucose_level'", errno=1264)
+        self.db.pending.extend(records)
+        self.rowcount = len(records)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, db):
+        self.db = db
+
+    def cursor(self, *args, **kwargs):
+        return FakeCursor(self.db)
+
+    def commit(self):
+        self.db.rows.extend(self.db.pending)
+        self.db.pending = []
+
+    def rollback(self):
+        self.db.pending = []
+
+    def close(self):
+        pass
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.rows = []
+        self.pending = []
+
+
+def _batch(*glucose_values):
+    return [((1, glucose, 80.0, "2026-01-01 00:00:00"), Future()) for glucose in glucose_values]
+
+
+def _writer():
+    return MonitoringWriter(queue_size=10, batch_size=10, flush_interval=0.01, put_timeout=0.01)
+
+
+def test_data_error_falls_back_to_row_by_row(monkeypatch):
+    db = FakeDatabase()
+    monkeypatch.setattr(ingest, "get_connection", lambda: FakeConnection(db))
+    batch = _batch(120.0, 1e39, 130.0)
+
+    _writer()._flush_with_retry(batch)
+
+    assert [row[1] for row in db.rows] == [120.0, 130.0]
+    assert batch[0][1].result(0) is True
+    assert isinstance(batch[1][1].exception(0), DataError)
+    assert batch[2][1].result(0) is True
+
+
+def test_only_transient_errors_are_retried(monkeypatch):
+    db = FakeDatabase()
+    attempts = []
+
+    def get_connection():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise OperationalError(msg="Lost connection")
+        return FakeConnection(db)
+
+    monkeypatch.setattr(ingest, "get_connection", get_connection)
+    monkeypatch.setattr(ingest, "INGEST_RETRY_DELAY", 0)
+    batch = _batch(120.0)
+
+    _writer()._flush_with_retry(batch)
+
+    assert len(attempts) == 2
+    assert batch[0][1].result(0) is True
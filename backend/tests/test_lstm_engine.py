@@ -0,0 +1,51 @@
+import os
+
+import numpy as np
+import pytest
+
+from models.lstm_engine import ArrayScaler, LSTMEngine
+
+MODEL_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'models', 'model_lstm.h5')
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return LSTMEngine.from_h5(MODEL_PATH)
+
+
+def _inputs(engine, samples=256, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.normal(size=(samples,) + tuple(engine.input_shape)).astype(np.float32)
+
+
+def test_engine_matches_keras(engine):
+    keras_models = pytest.importorskip("tensorflow.keras.models")
+    from tensorflow.keras.losses import MeanSquaredError
+
+    keras_model = keras_models.load_model(MODEL_PATH, custom_objects={'mse': MeanSquaredError()})
+    X = _inputs(engine)
+    assert np.allclose(engine.predict(X), keras_model.predict(X, verbose=0), rtol=0, atol=1e-4)
+
+
+def test_array_round_trip_is_exact(engine):
+    spec, arrays = engine.to_arrays()
+    restored = LSTMEngine.from_arrays(spec, arrays)
+    X = _inputs(engine, samples=32, seed=1)
+    assert np.array_equal(restored.predict(X), engine.predict(X))
+
+
+def test_step_by_step_matches_full_window(engine):
+    X = _inputs(engine, samples=16, seed=2)
+    states = [
+        (np.zeros((len(X), units), dtype=np.float32), np.zeros((len(X), units), dtype=np.float32))
+        for units in engine.state_units()
+    ]
+    for t in range(X.shape[1]):
+        states, out = engine.step(states, X[:, t, :])
+    assert np.allclose(engine.head(out), engine.predict(X), rtol=0, atol=1e-5)
+
+
+def test_array_scaler_inverts():
+    values = np.array([[60.0], [120.0], [300.0]])
+    scaler = ArrayScaler.fit(values)
+    assert np.allclose(scaler.inverse_transform(scaler.transform(values)), values)
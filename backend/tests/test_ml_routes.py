@@ -0,0 +1,65 @@
+from routes import ml_routes
+
+ROW = (1, 40, 0, 0, 0, 70.0, 170.0, 5.5, 100.0)
+
+
+class FakeCursor:
+    def __init__(self, patients):
+        self.patients = patients
+        self.row = None
+
+    def execute(self, query, params=()):
+        if "FROM users" in query:
+            self.row = (1,) if params[0] in self.patients else None
+
+    def fetchone(self):
+        return self.row
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, patients):
+        self._cursor = FakeCursor(patients)
+
+    def cursor(self, dictionary=False):
+        return self._cursor
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def _save(monkeypatch, current_user_id, patient_id, roles):
+    saved = []
+    patients = {user_id for user_id, role in roles.items() if role == 'patient'}
+    monkeypatch.setattr(ml_routes, "get_connection", lambda: FakeConnection(patients))
+    monkeypatch.setattr(ml_routes, "get_user_by_id_model", lambda conn, user_id: (
+        {"id": user_id, "role": roles[user_id]} if user_id in roles else None
+    ))
+    monkeypatch.setattr(ml_routes, "upsert_risk_inputs_model", lambda cursor, user_id, row: saved.append(user_id))
+    ml_routes._save_risk_inputs(current_user_id, patient_id, ROW)
+    return saved
+
+
+def test_patient_saves_own_inputs(monkeypatch):
+    assert _save(monkeypatch, 7, None, {7: 'patient'}) == [7]
+
+
+def test_admin_screening_saves_under_patient_not_admin(monkeypatch):
+    assert _save(monkeypatch, 1, 7, {1: 'admin', 7: 'patient'}) == [7]
+
+
+def test_admin_without_patient_saves_nothing(monkeypatch):
+    assert _save(monkeypatch, 1, None, {1: 'admin', 7: 'patient'}) == []
+
+
+def test_patient_cannot_save_for_another_patient(monkeypatch):
+    assert _save(monkeypatch, 7, 8, {7: 'patient', 8: 'patient'}) == []
+
+
+def test_admin_cannot_save_under_non_patient(monkeypatch):
+    assert _save(monkeypatch, 1, 2, {1: 'admin', 2: 'admin'}) == []
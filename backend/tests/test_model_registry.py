@@ -0,0 +1,46 @@
+import builtins
+
+import model_registry
+from model_registry import ModelRegistry
+
+
+def _without_platform_memory(monkeypatch):
+    """Seperti Windows tanpa psutil: tidak ada /proc, resource, maupun psutil."""
+    real_import = builtins.__import__
+    real_open = builtins.open
+
+    def fake_import(name, *args, **kwargs):
+        if name in ("resource", "psutil"):
+            raise ModuleNotFoundError(name)
+        return real_import(name, *args, **kwargs)
+
+    def fake_open(path, *args, **kwargs):
+        if str(path).startswith("/proc/"):
+            raise FileNotFoundError(path)
+        return real_open(path, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "__import__", fake_import)
+    monkeypatch.setattr(builtins, "open", fake_open)
+
+
+def test_model_loads_without_memory_probes(monkeypatch):
+    _without_platform_memory(monkeypatch)
+    registry = ModelRegistry(version_source=lambda: None)
+    registry.register("dummy", lambda: "model")
+
+    assert registry.get("dummy") == "model"
+    stats = registry.stats()
+    assert stats["models"]["dummy"]["rss_delta_bytes"] is None
+    assert stats["rss_bytes"] is None
+    assert stats["peak_rss_bytes"] is None
+
+
+def test_peak_rss_units_per_platform(monkeypatch):
+    import resource
+
+    monkeypatch.setattr(resource, "getrusage", lambda who: type("Usage", (), {"ru_maxrss": 2048})())
+    monkeypatch.setattr(model_registry.sys, "platform", "linux")
+    assert model_registry._peak_rss_bytes() == 2048 * 1024
+    # macOS sudah melaporkan byte
+    monkeypatch.setattr(model_registry.sys, "platform", "darwin")
+    assert model_registry._peak_rss_bytes() == 2048
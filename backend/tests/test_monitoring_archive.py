@@ -0,0 +1,88 @@
+import os
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from monitoring_archive import MonitoringArchive
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _rows(first_id, count, month):
+    start = datetime(2025, month, 1)
+    return [
+        (first_id + i, 1 + i % 3, 100.0 + i, 70.0, start + timedelta(minutes=i))
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = MonitoringArchive(str(tmp_path), cache_months=2)
+    for month, first_id in ((1, 1), (2, 1001)):
+        rows = sorted(_rows(first_id, 500, month), key=lambda row: (row[1], row[4], row[0]))
+        name = f"p2025{month:02d}"
+        # Dua batch, seperti fetchmany dari iter_partition_rows_model
+        count, id_sum = archive.write_pending(name, [rows[:200], rows[200:]])
+        assert (count, id_sum) == (500, sum(row[0] for row in rows))
+        archive.publish(name)
+    return archive
+
+
+def test_write_pending_keeps_types_and_order(archive):
+    rows = archive.read(user_id=2, limit=3)
+    assert [row["id"] for row in rows] == [1500, 1497, 1494]
+    assert rows[0]["glucose_level"] == 599.0
+    assert isinstance(rows[0]["timestamp"], datetime)
+
+
+def test_delete_row_skips_files_outside_id_range(archive, tmp_path):
+    fresh = MonitoringArchive(str(tmp_path), cache_months=2)
+    assert fresh.delete_row(999999) is None
+    # Tidak ada file bulan yang didekompresi penuh untuk id di luar semua rentang
+    assert fresh.stats()["loads"] == 0
+    assert fresh.stats()["rewrites"] == 0
+
+    assert fresh.delete_row(42)[0] == 1 + 41 % 3
+    assert fresh.stats()["rewrites"] == 1
+    assert 42 not in {row["id"] for row in fresh.read(user_id=1)}
+
+
+def test_concurrent_deletes_in_same_month_are_not_lost(archive, tmp_path):
+    # Dua "worker" dengan cache masing-masing menghapus baris berbeda di file yang sama
+    workers = [MonitoringArchive(str(tmp_path), cache_months=2) for _ in range(4)]
+    for worker in workers:
+        worker.read(limit=1)
+    targets = [10, 20, 30, 40, 50, 60, 70, 80]
+    threads = [
+        threading.Thread(target=lambda w=workers[i % 4], row_id=row_id: w.delete_row(row_id))
+        for i, row_id in enumerate(targets)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    remaining = {row["id"] for row in MonitoringArchive(str(tmp_path), 2).read()}
+    assert len(remaining) == 1000 - len(targets)
+    assert not remaining & set(targets)
+
+
+def test_purge_user_removes_only_that_user(archive):
+    assert archive.purge_user(2) == 334
+    ids = {row["user_id"] for row in archive.read()}
+    assert ids == {1, 3}
+
+
+def test_module_imports_without_fcntl():
+    import subprocess
+    import sys
+
+    # Windows tidak punya fcntl; import aplikasi tidak boleh bergantung padanya
+    code = (
+        "import sys; sys.modules['fcntl'] = None; import monitoring_archive as m; "
+        "assert not m.MONITORING_ARCHIVE_ENABLED and m.MONITORING_MAINTENANCE_INTERVAL == 0"
+    )
+    env = {key: value for key, value in os.environ.items() if not key.startswith('MONITORING_')}
+    subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, env=env, check=True)
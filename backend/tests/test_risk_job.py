@@ -0,0 +1,125 @@
+import threading
+
+from risk_job import RiskScoringJob
+
+
+def test_concurrent_starts_launch_exactly_one_run(monkeypatch):
+    job = RiskScoringJob(chunk_size=10)
+    started, release = threading.Event(), threading.Event()
+    runs = []
+
+    def score_all(model, scaler, model_version, full, summary):
+        runs.append(model_version)
+        started.set()
+        release.wait(5)
+
+    monkeypatch.setattr(job, "_score_all", score_all)
+    barrier = threading.Barrier(8)
+    results = []
+
+    def start():
+        barrier.wait()
+        results.append(job.start_background(None, None, "v1"))
+
+    threads = [threading.Thread(target=start) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results.count(True) == 1
+    assert started.wait(5)
+    assert job.status()["running"] is True
+    # Run sinkron juga ditolak selama run latar belakang memegang lock
+    assert job.run(None, None, "v1") is None
+
+    release.set()
+    for thread in threading.enumerate():
+        if thread.name == "risk-scoring-job":
+            thread.join(5)
+    assert runs == ["v1"]
+    assert job.status()["running"] is False
+    assert job.start_background(None, None, "v2") is True
+
+
+class FakeInputsCursor:
+    """patient_risk_inputs + risk_scores di memori, cukup untuk satu run incremental."""
+
+    def __init__(self, inputs):
+        self.inputs = inputs
+        self.scores = {}
+        self.rows = []
+        self.rowcount = 0
+
+    def execute(self, query, params=()):
+        after_user_id, model_version, limit = params
+        self.rows = [
+            dict(row) for user_id, row in sorted(self.inputs.items())
+            if user_id > after_user_id
+            and row["invalid_updated_at"] != row["updated_at"]
+            and self.scores.get(user_id) != (row["updated_at"], model_version)
+        ][:limit]
+
+    def executemany(self, query, rows):
+        if query.lstrip().startswith("UPDATE") and "= NULL" in query:
+            for (user_id,) in rows:
+                self.inputs[user_id]["invalid_updated_at"] = None
+        elif query.lstrip().startswith("UPDATE"):
+            for user_id, updated_at in rows:
+                if self.inputs[user_id]["updated_at"] == updated_at:
+                    self.inputs[user_id]["invalid_updated_at"] = updated_at
+        else:
+            for user_id, _, _, _, model_version, updated_at in rows:
+                self.scores[user_id] = (updated_at, model_version)
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+class FakeInputsConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def cursor(self, dictionary=False):
+        return self._cursor
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_invalid_inputs_are_marked_and_skipped_until_updated(monkeypatch):
+    import risk_job as risk_job_module
+
+    def record(user_id, age, updated_at):
+        return {
+            "user_id": user_id, "gender": 1, "age": age, "hypertension": 0, "heart_disease": 0,
+            "smoking_history": 0, "berat": 70.0, "tinggi": 170.0, "hba1c_level": 5.5,
+            "blood_glucose": 100.0, "updated_at": updated_at, "invalid_updated_at": None,
+        }
+
+    cursor = FakeInputsCursor({1: record(1, 40, "t1"), 2: record(2, "bukan angka", "t1")})
+    monkeypatch.setattr(risk_job_module, "get_connection", lambda: FakeInputsConnection(cursor))
+    monkeypatch.setattr(risk_job_module, "score_rows", lambda model, scaler, rows: [
+        {"prediction_code": 0, "probability": 10.0, "risk_factors": []} for _ in rows
+    ])
+    job = RiskScoringJob(chunk_size=10)
+
+    first = job.run(None, None, "v1")
+    assert (first["scored"], first["invalid"]) == (1, 1)
+    assert cursor.inputs[2]["invalid_updated_at"] == "t1"
+
+    # Model baru: pasien 1 dinilai ulang, input tidak valid tidak diambil lagi
+    second = job.run(None, None, "v2")
+    assert (second["scored"], second["invalid"]) == (1, 0)
+
+    # Input diperbarui dan valid: dinilai lagi dan tandanya dihapus
+    cursor.inputs[2].update(age=50, updated_at="t2")
+    third = job.run(None, None, "v2")
+    assert (third["scored"], third["invalid"]) == (1, 0)
+    assert cursor.inputs[2]["invalid_updated_at"] is None
@@ -0,0 +1,48 @@
+from flask import Flask, g
+
+from routes import sensor_routes
+
+
+class FakeCursor:
+    def __init__(self, patients):
+        self.patients = patients
+        self.row = None
+
+    def execute(self, query, params=()):
+        if "FROM users" in query:
+            self.row = {"1": 1} if params[0] in self.patients else None
+
+    def fetchone(self):
+        return self.row
+
+
+def _update(monkeypatch, body, sensor_user_id, patients=(7,)):
+    recorded = []
+    monkeypatch.setattr(sensor_routes, "SENSOR_USER_ID", sensor_user_id)
+    monkeypatch.setattr(sensor_routes, "update_batch_sensors_model", lambda cursor, glucose, heart_rate: 2)
+    monkeypatch.setattr(sensor_routes, "_publish_sensor_values", lambda values: None)
+    monkeypatch.setattr(sensor_routes, "_record_reading", lambda *reading: recorded.append(reading))
+    monkeypatch.setattr(sensor_routes, "mark_write", lambda user_id: None)
+    app = Flask(__name__)
+    with app.test_request_context('/api/sensors/update', method='PATCH', json=body):
+        g._after_commit_callbacks = []
+        response = sensor_routes.update_batch_sensors.__wrapped__(FakeCursor(patients))
+        for callback in g._after_commit_callbacks:
+            callback()
+    return response, recorded
+
+
+def test_body_user_id_is_ignored(monkeypatch):
+    _, recorded = _update(monkeypatch, {"glucose": 110, "heart_rate": 70, "user_id": 7}, None)
+    assert recorded == []
+
+
+def test_reading_is_recorded_for_configured_patient(monkeypatch):
+    _, recorded = _update(monkeypatch, {"glucose": 110, "heart_rate": 70, "user_id": 99}, 7)
+    assert recorded == [(7, 110, 70)]
+
+
+def test_configured_id_that_is_not_a_patient_is_not_recorded(monkeypatch):
+    response, recorded = _update(monkeypatch, {"glucose": 110, "heart_rate": 70}, 8)
+    assert recorded == []
+    assert response[1] == 200
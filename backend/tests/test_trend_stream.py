@@ -0,0 +1,62 @@
+import os
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from models.lstm_engine import ArrayScaler, LSTMEngine
+from trend_stream import StreamingTrend
+
+MODEL_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'models', 'model_lstm.h5')
+WINDOW_SIZE = 3
+
+
+@pytest.fixture(scope="module")
+def model():
+    engine = LSTMEngine.from_h5(MODEL_PATH)
+    scaler = ArrayScaler.fit(np.linspace(40, 400, 100).reshape(-1, 1))
+    return engine, scaler
+
+
+def _history(base, start, values):
+    return [
+        {"timestamp": datetime.fromtimestamp(base + 60 * (start + i)), "glucose_level": value}
+        for i, value in enumerate(values)
+    ]
+
+
+def test_streaming_matches_full_window_recomputation(model):
+    engine, scaler = model
+    n_users, length = 64, 20
+    series = np.random.default_rng(0).uniform(60, 300, size=(n_users, length))
+    stream = StreamingTrend(WINDOW_SIZE, max_users=n_users)
+    assert stream.bind(engine, scaler)
+
+    base = datetime(2024, 1, 1).timestamp()
+    for t in range(length):
+        ts = datetime.fromtimestamp(base + 60 * t)
+        stream.advance({u: [(ts, series[u, t])] for u in range(n_users)})
+        if t + 1 < WINDOW_SIZE:
+            continue
+        window = series[:, t + 1 - WINDOW_SIZE:t + 1]
+        scaled = scaler.transform(window.reshape(-1, 1)).reshape(n_users, WINDOW_SIZE, 1)
+        expected = scaler.inverse_transform(engine.predict(scaled))
+        actual = np.array([
+            stream.get(u, _history(base, t + 1 - WINDOW_SIZE, window[u])) for u in range(n_users)
+        ])
+        # Selisih dalam mg/dL
+        assert np.allclose(actual, expected, rtol=0, atol=1e-4)
+
+
+def test_mismatched_history_falls_back_to_full_window(model):
+    engine, scaler = model
+    stream = StreamingTrend(WINDOW_SIZE, max_users=4)
+    assert stream.bind(engine, scaler)
+    base = datetime(2024, 1, 1).timestamp()
+    for t, value in enumerate([100.0, 110.0, 120.0]):
+        stream.advance({1: [(datetime.fromtimestamp(base + 60 * t), value)]})
+
+    assert stream.get(1, _history(base, 0, [100.0, 110.0, 120.0])) is not None
+    # Nilai di database berbeda (mis. baris dihapus/diimpor): state tidak dipakai
+    assert stream.get(1, _history(base, 0, [100.0, 115.0, 120.0])) is None
+    assert stream.get(2, _history(base, 0, [100.0, 110.0, 120.0])) is None
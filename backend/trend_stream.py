@@ -0,0 +1,184 @@
+"""
+Inferensi LSTM streaming untuk prediksi tren glukosa.
+
+Model dilatih pada jendela tetap WINDOW_SIZE pembacaan yang selalu dimulai dari
+state nol, jadi state satu rangkaian panjang tidak bisa dipakai begitu saja.
+Sebagai gantinya setiap pasien menyimpan WINDOW_SIZE "run" yang saling tumpang
+tindih (run ke-k dimulai pada pembacaan ke-k). Setiap pembacaan baru memajukan
+semua run aktif tepat satu timestep, dan run yang genap WINDOW_SIZE langkah
+menghasilkan prediksi untuk jendela terbaru. Semua pasien dalam satu batch ingest
+dimajukan bersama dengan satu perkalian matriks per layer.
+
+State disimpan dalam array NumPy berukuran tetap (slot per pasien) dengan
+eviksi LRU, sehingga memorinya terbatas.
+"""
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+import numpy as np
+
+from metrics import timed_stage
+
+LSTM_STREAM_ENABLED = os.getenv('LSTM_STREAM_ENABLED', '1') == '1'
+LSTM_STREAM_MAX_USERS = int(os.getenv('LSTM_STREAM_MAX_USERS', '10000'))
+
+
+def _epoch(timestamp):
+    if not isinstance(timestamp, datetime):
+        timestamp = datetime.fromisoformat(str(timestamp))
+    return timestamp.timestamp()
+
+
+class StreamingTrend:
+    """State LSTM per pasien untuk memajukan prediksi satu langkah per pembacaan."""
+
+    def __init__(self, window_size, max_users):
+        self.window_size = window_size
+        self.max_users = max_users
+        self._lock = threading.Lock()
+        self._engine = None
+        self._scaler = None
+        self._stats = {"steps": 0, "readings": 0, "evictions": 0, "hits": 0, "misses": 0, "resets": 0}
+
+    def bind(self, engine, scaler):
+        """
+        Memasang model. Jika model berganti (mis. versi baru diaktifkan) seluruh
+        state dibuang karena tidak berlaku untuk bobot yang berbeda.
+        Mengembalikan False jika model tidak bisa dijalankan per timestep.
+        """
+        with self._lock:
+            if engine is self._engine and scaler is self._scaler:
+                return True
+            try:
+                units = engine.state_units()
+            except (AttributeError, ValueError) as e:
+                print(f"WARNING: Streaming LSTM tidak aktif: {e}")
+                self._engine = None
+                return False
+
+            cap, w = self.max_users, self.window_size
+            self._engine = engine
+            self._scaler = scaler
+            self._h = [np.zeros((cap, w, u), dtype=np.float32) for u in units]
+            self._c = [np.zeros((cap, w, u), dtype=np.float32) for u in units]
+            self._run_steps = np.full((cap, w), -1, dtype=np.int16)   # -1 = run tidak aktif
+            self._count = np.zeros(cap, dtype=np.int64)               # jumlah pembacaan per slot
+            self._window_ts = np.zeros((cap, w), dtype=np.float64)
+            self._window_val = np.zeros((cap, w), dtype=np.float64)
+            self._forecast = None
+            self._forecast_ok = np.zeros(cap, dtype=bool)
+            self._slots = OrderedDict()
+            self._free = list(range(cap - 1, -1, -1))
+            self._stats["resets"] += 1
+            return True
+
+    def _slot_for(self, user_id):
+        slot = self._slots.get(user_id)
+        if slot is not None:
+            self._slots.move_to_end(user_id)
+            return slot
+        if not self._free:
+            _, evicted = self._slots.popitem(last=False)
+            self._free.append(evicted)
+            self._stats["evictions"] += 1
+        slot = self._free.pop()
+        self._slots[user_id] = slot
+        self._run_steps[slot] = -1
+        self._count[slot] = 0
+        self._forecast_ok[slot] = False
+        return slot
+
+    def has_user(self, user_id):
+        with self._lock:
+            return self._engine is not None and user_id in self._slots
+
+    def advance(self, readings_by_user):
+        """
+        readings_by_user: {user_id: [(timestamp, glucose), ...]} urut waktu.
+        Putaran ke-k memajukan pembacaan ke-k dari setiap pasien sekaligus.
+        """
+        with self._lock:
+            if self._engine is None or not readings_by_user:
+                return
+            users = list(readings_by_user)
+            slots = np.array([self._slot_for(uid) for uid in users], dtype=np.int64)
+            rounds = max(len(readings) for readings in readings_by_user.values())
+            for k in range(rounds):
+                present = [i for i, uid in enumerate(users) if k < len(readings_by_user[uid])]
+                values = [readings_by_user[users[i]][k] for i in present]
+                self._advance_round(slots[present], values)
+
+    def _advance_round(self, slots, values):
+        w = self.window_size
+        glucose = np.array([float(g) for _, g in values], dtype=np.float64)
+        timestamps = np.array([_epoch(ts) for ts, _ in values], dtype=np.float64)
+        scaled = self._scaler.transform(glucose.reshape(-1, 1)).astype(np.float32)
+
+        # Run baru (state nol) dimulai pada slot ring count % W
+        start = self._count[slots] % w
+        for layer in range(len(self._h)):
+            self._h[layer][slots, start] = 0.0
+            self._c[layer][slots, start] = 0.0
+        self._run_steps[slots, start] = 0
+
+        # Semua pasangan (pasien, run) yang aktif dimajukan dalam satu step
+        member, run = np.nonzero(self._run_steps[slots] >= 0)
+        pair_slots = slots[member]
+        states = [(self._h[l][pair_slots, run], self._c[l][pair_slots, run]) for l in range(len(self._h))]
+        with timed_stage('stream_step', 'lstm_glucose_trend'):
+            states, out = self._engine.step(states, scaled[member])
+        for l, (h, c) in enumerate(states):
+            self._h[l][pair_slots, run] = h
+            self._c[l][pair_slots, run] = c
+        self._run_steps[pair_slots, run] += 1
+        self._stats["steps"] += 1
+        self._stats["readings"] += len(slots)
+
+        # Jendela berisi W pembacaan terakhir (paling lama di kiri)
+        self._window_ts[slots] = np.roll(self._window_ts[slots], -1, axis=1)
+        self._window_val[slots] = np.roll(self._window_val[slots], -1, axis=1)
+        self._window_ts[slots, -1] = timestamps
+        self._window_val[slots, -1] = glucose
+        self._count[slots] += 1
+
+        done = self._run_steps[pair_slots, run] >= w
+        if done.any():
+            predicted = self._scaler.inverse_transform(self._engine.head(out[done]))
+            done_slots = pair_slots[done]
+            if self._forecast is None:
+                self._forecast = np.zeros((self.max_users, predicted.shape[1]), dtype=np.float64)
+            self._forecast[done_slots] = predicted
+            self._forecast_ok[done_slots] = True
+            self._run_steps[done_slots, run[done]] = -1
+
+    def get(self, user_id, history):
+        """
+        Prediksi dari state, atau None jika state tidak cocok dengan jendela
+        history (baris dari database, urut naik) sehingga perlu dihitung penuh.
+        """
+        with self._lock:
+            slot = self._slots.get(user_id)
+            if (self._engine is None or slot is None or not self._forecast_ok[slot]
+                    or len(history) != self.window_size):
+                self._stats["misses"] += 1
+                return None
+            timestamps = np.array([_epoch(row['timestamp']) for row in history])
+            values = np.array([float(row['glucose_level']) for row in history])
+            # Kolom glukosa bisa FLOAT, jadi nilai dibandingkan dengan toleransi
+            if (not np.array_equal(timestamps, self._window_ts[slot])
+                    or not np.allclose(values, self._window_val[slot], rtol=1e-5, atol=1e-3)):
+                self._stats["misses"] += 1
+                return None
+            self._slots.move_to_end(user_id)
+            self._stats["hits"] += 1
+            return self._forecast[slot].copy()
+
+    def stats(self):
+        with self._lock:
+            data = dict(self._stats)
+            data["users"] = len(self._slots) if self._engine is not None else 0
+            data["max_users"] = self.max_users
+            data["enabled"] = self._engine is not None
+        return data
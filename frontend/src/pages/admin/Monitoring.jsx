@@ -166,26 +166,49 @@ const Monitoring = () => {
 
   // === Fetch real-time sensor data (TANPA PEMBULATAN) ===
   useEffect(() => {
+    const applyValues = ({ glucose, heart_rate }) => {
+      // Gunakan Number() agar desimal tetap terjaga
+      const glucoseVal = Number(glucose) || 0;
+      const heartRateVal = Number(heart_rate) || 0;
+
+      setGlucoseLevel(glucoseVal);
+      setHeartRate(heartRateVal);
+      setLastUpdated(new Date());
+    };
+
     const fetchData = async () => {
       try {
         const res = await apiClient.get('/sensors/latest');
-        const { glucose, heart_rate } = res.data;
-
-        // Gunakan Number() agar desimal tetap terjaga
-        const glucoseVal = Number(glucose) || 0;
-        const heartRateVal = Number(heart_rate) || 0;
-
-        setGlucoseLevel(glucoseVal);
-        setHeartRate(heartRateVal);
-        setLastUpdated(new Date());
+        applyValues(res.data);
       } catch (err) {
         console.error('Gagal mengambil data sensor:', err);
       }
     };
 
-    fetchData();
-    const interval = setInterval(fetchData, 3000);
-    return () => clearInterval(interval);
+    let interval = null;
+    const startPolling = () => {
+      if (interval) return;
+      fetchData();
+      interval = setInterval(fetchData, 3000);
+    };
+
+    // Push via Server-Sent Events; kembali ke polling jika browser/server tidak mendukung
+    let source = null;
+    if (typeof EventSource !== 'undefined') {
+      source = new EventSource(`${import.meta.env.VITE_API_BASE_URL}/sensors/stream`);
+      source.addEventListener('sensor', (event) => applyValues(JSON.parse(event.data)));
+      source.onerror = () => {
+        // EventSource akan reconnect sendiri; polling hanya jika koneksi ditutup permanen
+        if (source.readyState === EventSource.CLOSED) startPolling();
+      };
+    } else {
+      startPolling();
+    }
+
+    return () => {
+      if (source) source.close();
+      if (interval) clearInterval(interval);
+    };
   }, []);
 
   // === Handle Save ===
@@ -32,51 +32,35 @@ const GlucoseDataSkeleton = () => (
 export default function GlucoseTrendPage() {
   const [latestHistory, setLatestHistory] = useState([]);
   const [loadingHistory, setLoadingHistory] = useState(true);
-  const [isLoading, setIsLoading] = useState(false);
+  const [trendResult, setTrendResult] = useState(null);
   const [error, setError] = useState('');
   const [showInfo, setShowInfo] = useState(false);
   const navigate = useNavigate();
 
-  // Ambil 3 data terakhir
+  // Ambil 3 data terakhir beserta prediksinya (dihitung dan di-cache di server)
   useEffect(() => {
-    const fetchLatestHistory = async () => {
+    const fetchTrend = async () => {
       setLoadingHistory(true);
       setError('');
       try {
-        const { data } = await apiClient.get('/monitoring/me');
-        const sorted = data.sort((a, b) => new Date(b.timestamp) - new Date(a.timestamp));
-        
-        if (sorted.length >= 3) {
-          setLatestHistory(sorted.slice(0, 3).reverse());
-        } else {
-          setError('Minimal 3 data pemeriksaan diperlukan untuk prediksi tren.');
-        }
-      } catch {
-        setError('Gagal memuat data riwayat.');
+        const { data } = await apiClient.get('/predict/glucose-trend/me');
+        setLatestHistory(data.history);
+        setTrendResult(data);
+      } catch (err) {
+        setLatestHistory(err.response?.data?.history || []);
+        setError(err.response?.data?.error || 'Gagal memuat data riwayat.');
       } finally {
         setLoadingHistory(false);
       }
     };
 
-    fetchLatestHistory();
+    fetchTrend();
   }, []);
 
-  const handleSubmit = async (e) => {
+  const handleSubmit = (e) => {
     e.preventDefault();
-    if (loadingHistory || error || latestHistory.length < 3) return;
-
-    setIsLoading(true);
-    setError('');
-
-    try {
-      const glucoseReadings = latestHistory.map(item => item.glucose_level);
-      const { data } = await apiClient.post('/predict/glucose-trend', { glucose_readings: glucoseReadings });
-      navigate('/pasien/hasil-tren', { state: { result: data } });
-    } catch (err) {
-      setError(err.response?.data?.error || 'Gagal melakukan prediksi.');
-    } finally {
-      setIsLoading(false);
-    }
+    if (loadingHistory || error || !trendResult) return;
+    navigate('/pasien/hasil-tren', { state: { result: trendResult } });
   };
 
   const formatDate = (timestamp) => {
@@ -191,23 +175,11 @@ export default function GlucoseTrendPage() {
             <form onSubmit={handleSubmit}>
               <button
                 type="submit"
-                disabled={isLoading || loadingHistory || !!error}
+                disabled={loadingHistory || !!error || !trendResult}
                 className="w-full py-3 px-4 bg-primaryBlue hover:bg-blue-600 disabled:bg-mutedGray disabled:cursor-not-allowed text-white rounded-lg font-medium text-sm flex items-center justify-center transition-all duration-200 hover:shadow"
               >
-                {isLoading ? (
-                  <>
-                    <svg className="animate-spin -ml-1 mr-3 h-5 w-5" viewBox="0 0 24 24">
-                      <circle className="opacity-25" cx="12" cy="12" r="10" stroke="currentColor" strokeWidth="4" />
-                      <path className="opacity-75" fill="currentColor" d="M4 12a8 8 0 018-8V0C5.373 0 0 5.373 0 12h4zm2 5.291A7.962 7.962 0 014 12H0c0 3.042 1.135 5.824 3 7.938l3-2.647z" />
-                    </svg>
-                    Memprediksi...
-                  </>
-                ) : (
-                  <>
-                    Lihat Prediksi Tren
-                    <FaArrowRight className="ml-2" />
-                  </>
-                )}
+                Lihat Prediksi Tren
+                <FaArrowRight className="ml-2" />
               </button>
             </form>
           </div>